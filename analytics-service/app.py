@@ -0,0 +1,121 @@
+from flask import Flask, request, jsonify
+import logging
+import os
+import threading
+
+from consumer import consumer_from_env, snapshot_loop
+from engine import AnalyticsEngine, WINDOWS
+
+logging.basicConfig(level=logging.INFO)
+
+app = Flask(__name__)
+
+SNAPSHOT_PATH = os.environ.get('ANALYTICS_SNAPSHOT_PATH')
+SNAPSHOT_INTERVAL = int(os.environ.get('ANALYTICS_SNAPSHOT_INTERVAL', 60))
+TOP_K = int(os.environ.get('ANALYTICS_TOP_K', 10))
+MAX_MINUTES = 24 * 60
+
+ENGINE = AnalyticsEngine.restore(SNAPSHOT_PATH, top_k=TOP_K) if SNAPSHOT_PATH else AnalyticsEngine(top_k=TOP_K)
+CONSUMER = None
+
+
+def int_arg(name, default, maximum):
+    """Целый параметр запроса в пределах [1, maximum]; ValueError при неверном значении"""
+
+    value = int(request.args.get(name, default))
+    if not 1 <= value <= maximum:
+        raise ValueError(name)
+    return value
+
+
+@app.route('/health/', methods=['GET'])
+def health():
+    if CONSUMER is not None and not CONSUMER.alive:
+        # Чтение из Kafka остановилось - агрегаты больше не обновляются
+        return jsonify({'status': 'unhealthy', 'service': 'analytics', 'error': 'Event consumer is not running'}), 503
+    return jsonify({'status': 'healthy', 'service': 'analytics'})
+
+
+@app.route('/stats/posts-per-minute/', methods=['GET'])
+def posts_per_minute():
+    """Созданные и опубликованные посты по минутам, от старых к новым"""
+
+    try:
+        minutes = int_arg('minutes', 60, MAX_MINUTES)
+    except ValueError:
+        return jsonify({'error': f'minutes must be between 1 and {MAX_MINUTES}'}), 400
+
+    return jsonify({
+        'created': ENGINE.per_minute(ENGINE.posts_created, minutes),
+        'published': ENGINE.per_minute(ENGINE.posts_published, minutes),
+    })
+
+
+@app.route('/stats/top-posts/', methods=['GET'])
+def top_posts():
+    """Посты с наибольшим числом новых комментариев за окно (оценка сверху)"""
+
+    window = request.args.get('window', '1h')
+    if window not in WINDOWS:
+        return jsonify({'error': f"window must be one of {', '.join(WINDOWS)}"}), 400
+    try:
+        limit = int_arg('limit', TOP_K, TOP_K)
+    except ValueError:
+        return jsonify({'error': f'limit must be between 1 and {TOP_K}'}), 400
+
+    return jsonify({'window': window, 'results': ENGINE.top(window, limit)})
+
+
+@app.route('/stats/active-authors/', methods=['GET'])
+def active_authors():
+    """Число различных авторов постов и комментариев за окна (оценка HyperLogLog)"""
+
+    return jsonify(ENGINE.authors())
+
+
+@app.route('/stats/summary/', methods=['GET'])
+def summary():
+    return jsonify(ENGINE.summary())
+
+
+@app.route('/internal/events/', methods=['POST'])
+def ingest_events():
+    """Приём событий по HTTP - без Kafka и для загрузки истории"""
+
+    payload = request.get_json(silent=True)
+    events = payload if isinstance(payload, list) else [payload]
+    if not all(isinstance(event, dict) for event in events):
+        return jsonify({'error': 'Expected an event or a list of events'}), 400
+
+    ENGINE.process_many(events)
+    return jsonify({'accepted': len(events)}), 202
+
+
+@app.route('/internal/engine/', methods=['GET'])
+def engine_stats():
+    return jsonify({
+        'engine': ENGINE.stats(),
+        'consumer': CONSUMER.stats() if CONSUMER is not None else None,
+    })
+
+
+def start_background():
+    """Потребитель Kafka или, без неё, периодические снимки"""
+
+    global CONSUMER
+
+    CONSUMER = consumer_from_env(ENGINE)
+    if CONSUMER is not None:
+        CONSUMER.start()
+    elif SNAPSHOT_PATH:
+        threading.Thread(
+            target=snapshot_loop,
+            args=(ENGINE, SNAPSHOT_PATH, SNAPSHOT_INTERVAL, threading.Event()),
+            name='snapshots',
+            daemon=True
+        ).start()
+
+
+if __name__ == '__main__':
+    start_background()
+    app.run(host='0.0.0.0', port=8004, threaded=True)
@@ -0,0 +1,137 @@
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+TOPICS = ['posts', 'comments', 'users']
+
+
+class EventConsumer:
+    """Читает события из Kafka пачками и передаёт их движку.
+
+    Смещения фиксируются вручную и только после снимка состояния: после перезапуска
+    движок восстанавливается из снимка и дочитывает события с зафиксированного места.
+    """
+
+    def __init__(self, engine, bootstrap_servers, group_id='analytics-service', snapshot_path=None,
+                 snapshot_interval=60, max_records=500, topic_prefix=''):
+        self.engine = engine
+        self.bootstrap_servers = bootstrap_servers
+        self.group_id = group_id
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self.max_records = max_records
+        self.topics = [f"{topic_prefix}{topic}" for topic in TOPICS]
+        self.counters = {'batches': 0, 'records': 0, 'decode_errors': 0, 'batch_errors': 0, 'snapshots': 0}
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name='event-consumer', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=10):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def run(self):
+        try:
+            self._consume()
+        except Exception as e:
+            # Поток завершается, но это видно в /health/ и в статистике
+            self.last_error = repr(e)
+            logger.exception('Event consumer stopped')
+
+    def _consume(self):
+        from kafka import KafkaConsumer
+
+        consumer = KafkaConsumer(
+            *self.topics,
+            bootstrap_servers=self.bootstrap_servers,
+            group_id=self.group_id,
+            enable_auto_commit=False,
+            auto_offset_reset='earliest',
+            max_poll_records=self.max_records
+        )
+        last_snapshot = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                self.handle_batch(consumer.poll(timeout_ms=1000))
+
+                if time.monotonic() - last_snapshot >= self.snapshot_interval:
+                    self.checkpoint(consumer)
+                    last_snapshot = time.monotonic()
+            self.checkpoint(consumer)
+        finally:
+            consumer.close(autocommit=False)
+
+    def handle_batch(self, batch):
+        """Передаёт движку пачку из poll(); ошибка пачки считается и не останавливает чтение"""
+
+        events = []
+        for records in batch.values():
+            for record in records:
+                try:
+                    events.append(json.loads(record.value))
+                except ValueError:
+                    self.counters['decode_errors'] += 1
+        if not events:
+            return
+
+        try:
+            self.engine.process_many(events)
+        except Exception as e:
+            self.counters['batch_errors'] += 1
+            self.last_error = repr(e)
+            logger.exception(f"Failed to process a batch of {len(events)} events")
+            return
+        self.counters['batches'] += 1
+        self.counters['records'] += len(events)
+
+    def checkpoint(self, consumer):
+        """Снимок состояния, затем фиксация смещений - события между ними не теряются"""
+
+        if self.snapshot_path:
+            self.engine.snapshot(self.snapshot_path)
+            self.counters['snapshots'] += 1
+        consumer.commit()
+
+    def stats(self):
+        return {**self.counters, 'alive': self.alive, 'last_error': self.last_error}
+
+
+def snapshot_loop(engine, path, interval, stop):
+    """Периодические снимки без Kafka - события приходят через HTTP"""
+
+    while not stop.wait(interval):
+        try:
+            engine.snapshot(path)
+        except OSError as e:
+            logger.error(f"Failed to write snapshot {path}: {e}")
+
+
+def consumer_from_env(engine):
+    """EventConsumer по переменным окружения; None, если Kafka не настроена"""
+
+    servers = os.environ.get('KAFKA_BOOTSTRAP_SERVERS')
+    if not servers:
+        return None
+
+    return EventConsumer(
+        engine,
+        servers.split(','),
+        group_id=os.environ.get('ANALYTICS_GROUP_ID', 'analytics-service'),
+        snapshot_path=os.environ.get('ANALYTICS_SNAPSHOT_PATH'),
+        snapshot_interval=int(os.environ.get('ANALYTICS_SNAPSHOT_INTERVAL', 60)),
+        max_records=int(os.environ.get('ANALYTICS_MAX_POLL_RECORDS', 500)),
+        topic_prefix=os.environ.get('EVENTS_TOPIC_PREFIX', '')
+    )
@@ -0,0 +1,211 @@
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from sketches import RingCounter, SlidingDistinct, SlidingTopK
+
+logger = logging.getLogger(__name__)
+
+# Окна: (длина, число интервалов) - точность окна равна длине интервала
+WINDOWS = {
+    '5m': (300, 5),
+    '1h': (3600, 12),
+    '24h': (86400, 24),
+}
+
+# Поминутные счётчики хранятся за сутки
+MINUTE = 60
+MINUTES_KEPT = 24 * 60
+
+
+class RecentIds:
+    """Последние обработанные id событий - для отсева повторных доставок"""
+
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self._ids = OrderedDict()
+
+    def seen(self, event_id):
+        """True, если id уже встречался; иначе запоминает его"""
+
+        if event_id in self._ids:
+            return True
+        self._ids[event_id] = None
+        if len(self._ids) > self.maxsize:
+            self._ids.popitem(last=False)
+        return False
+
+
+class AnalyticsEngine:
+    """Скользящие агрегаты по событиям постов, комментариев и пользователей.
+
+    Все структуры ограничены по памяти и не зависят от числа событий.
+    Окна считаются по времени события (ts), опоздавшие за пределы окна события отбрасываются.
+    """
+
+    def __init__(self, top_k=10):
+        self.posts_created = RingCounter(MINUTE, MINUTES_KEPT)
+        self.posts_published = RingCounter(MINUTE, MINUTES_KEPT)
+        self.comments = RingCounter(MINUTE, MINUTES_KEPT)
+        self.registrations = RingCounter(MINUTE, MINUTES_KEPT)
+        self.top_posts = {name: SlidingTopK(window, buckets, k=top_k) for name, (window, buckets) in WINDOWS.items()}
+        self.active_authors = {name: SlidingDistinct(window, buckets) for name, (window, buckets) in WINDOWS.items()}
+        self.recent_ids = RecentIds()
+        self.counters = {'processed': 0, 'duplicates': 0, 'late': 0, 'ignored': 0, 'invalid': 0}
+        self.last_event_ts = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def process(self, event):
+        """Учитывает одно событие в формате servicekit: {"type", "key", "ts", "data"[, "id"]}"""
+
+        with self._lock:
+            self._process(event)
+
+    def process_many(self, events):
+        with self._lock:
+            for event in events:
+                self._process(event)
+
+    def _process(self, event):
+        try:
+            event_type = event['type']
+            data = event.get('data') or {}
+            ts = event['ts'] / 1000 if event.get('ts') else time.time()
+        except (KeyError, TypeError, AttributeError):
+            self.counters['invalid'] += 1
+            return
+
+        # id есть у событий из outbox - уникален в пределах типа события
+        if event.get('id') is not None and self.recent_ids.seen((event_type, event['id'])):
+            self.counters['duplicates'] += 1
+            return
+
+        handler = self.HANDLERS.get(event_type)
+        if handler is None:
+            self.counters['ignored'] += 1
+            return
+
+        try:
+            accepted = handler(self, data, ts)
+        except (TypeError, ValueError, AttributeError):
+            # Валидный JSON, но не той формы: например, data - не объект
+            self.counters['invalid'] += 1
+            return
+
+        if accepted:
+            self.counters['processed'] += 1
+            self.last_event_ts = max(self.last_event_ts or ts, ts)
+        else:
+            self.counters['late'] += 1
+
+    def _post_created(self, data, ts):
+        return self.posts_created.add(ts)
+
+    def _post_published(self, data, ts):
+        accepted = self.posts_published.add(ts)
+        self._author_active(data.get('author_id'), ts)
+        return accepted
+
+    def _comment_created(self, data, ts):
+        accepted = self.comments.add(ts)
+        if data.get('post_id') is not None:
+            for top in self.top_posts.values():
+                top.add(data['post_id'], ts)
+        self._author_active(data.get('user_id'), ts)
+        return accepted
+
+    def _user_registered(self, data, ts):
+        return self.registrations.add(ts)
+
+    def _author_active(self, user_id, ts):
+        if user_id is not None:
+            for distinct in self.active_authors.values():
+                distinct.add(user_id, ts)
+
+    HANDLERS = {
+        'post.created': _post_created,
+        'post.published': _post_published,
+        'comment.created': _comment_created,
+        'user.registered': _user_registered,
+    }
+
+    def per_minute(self, counter, minutes=60, now=None):
+        with self._lock:
+            series = counter.series(now or time.time(), minutes)
+        return [{'minute': int(start), 'count': count} for start, count in series]
+
+    def top(self, window='1h', limit=10, now=None):
+        with self._lock:
+            ranked = self.top_posts[window].top(now or time.time(), limit)
+        return [{'post_id': post_id, 'comments': count} for post_id, count in ranked]
+
+    def authors(self, now=None):
+        now = now or time.time()
+        with self._lock:
+            return {name: distinct.count(now) for name, distinct in self.active_authors.items()}
+
+    def summary(self, now=None):
+        now = now or time.time()
+        with self._lock:
+            return {
+                'last_hour': {
+                    'posts_created': self.posts_created.total(now, 60),
+                    'posts_published': self.posts_published.total(now, 60),
+                    'comments': self.comments.total(now, 60),
+                    'registrations': self.registrations.total(now, 60),
+                },
+                'last_day': {
+                    'posts_created': self.posts_created.total(now),
+                    'posts_published': self.posts_published.total(now),
+                    'comments': self.comments.total(now),
+                    'registrations': self.registrations.total(now),
+                },
+                'active_authors': {name: distinct.count(now) for name, distinct in self.active_authors.items()},
+            }
+
+    def stats(self):
+        with self._lock:
+            return {**self.counters, 'last_event_ts': self.last_event_ts}
+
+    def snapshot(self, path):
+        """Сохраняет состояние атомарно: запись во временный файл и переименование"""
+
+        with self._lock:
+            data = pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL)
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def restore(cls, path, **kwargs):
+        """Состояние из снимка; новый движок, если снимка нет или он не читается"""
+
+        try:
+            with open(path, 'rb') as f:
+                engine = pickle.load(f)
+        except FileNotFoundError:
+            return cls(**kwargs)
+        except Exception as e:
+            logger.error(f"Failed to restore snapshot {path}: {e}")
+            return cls(**kwargs)
+
+        if not isinstance(engine, cls):
+            logger.error(f"Snapshot {path} does not contain {cls.__name__}")
+            return cls(**kwargs)
+        return engine
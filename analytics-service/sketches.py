@@ -0,0 +1,212 @@
+"""Компактные структуры для потоковой агрегации.
+
+Все структуры привязаны ко времени события, а не ко времени обработки:
+окно делится на интервалы фиксированной длины, ячейки интервалов лежат в кольце
+и переиспользуются, когда интервал выходит из окна. Память не растёт с числом событий.
+"""
+import math
+from array import array
+from hashlib import blake2b
+
+
+def hash64(key):
+    """Стабильный между процессами 64-битный хэш (hash() рандомизирован и не годится для снимков)"""
+
+    return int.from_bytes(blake2b(str(key).encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class RingCounter:
+    """Число событий по интервалам длиной resolution секунд за последние slots интервалов"""
+
+    def __init__(self, resolution=60, slots=1440):
+        self.resolution = resolution
+        self.slots = slots
+        self.counts = array('q', [0]) * slots
+        self.epochs = array('q', [-1]) * slots  # номер интервала, которому сейчас принадлежит ячейка
+
+    def add(self, ts, count=1):
+        """False, если интервал события уже вышел из окна"""
+
+        epoch = int(ts // self.resolution)
+        index = epoch % self.slots
+        if self.epochs[index] != epoch:
+            if self.epochs[index] > epoch:
+                return False
+            self.epochs[index] = epoch
+            self.counts[index] = 0
+        self.counts[index] += count
+        return True
+
+    def series(self, now, intervals=None):
+        """[(начало интервала, число событий)] за последние intervals интервалов, от старых к новым"""
+
+        current = int(now // self.resolution)
+        intervals = min(intervals or self.slots, self.slots)
+        result = []
+        for epoch in range(current - intervals + 1, current + 1):
+            index = epoch % self.slots
+            result.append((epoch * self.resolution, self.counts[index] if self.epochs[index] == epoch else 0))
+        return result
+
+    def total(self, now, intervals=None):
+        return sum(count for _, count in self.series(now, intervals))
+
+
+class CountMinSketch:
+    """Оценка частоты ключа сверху с ошибкой не больше e/width от суммы всех счётчиков"""
+
+    def __init__(self, width=2048, depth=4):
+        self.width = width
+        self.depth = depth
+        self.table = array('q', [0]) * (width * depth)
+
+    def indexes(self, key):
+        # Двойное хэширование: строки берут h1 + row * h2 от одного хэша
+        h = hash64(key)
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        return [row * self.width + (h1 + row * h2) % self.width for row in range(self.depth)]
+
+    def add(self, key, count=1, indexes=None):
+        table = self.table
+        for index in indexes or self.indexes(key):
+            table[index] += count
+
+    def estimate(self, key, indexes=None):
+        table = self.table
+        return min(table[index] for index in indexes or self.indexes(key))
+
+    def subtract(self, other):
+        table = self.table
+        for index, value in enumerate(other.table):
+            if value:
+                table[index] -= value
+
+    def clear(self):
+        self.table = array('q', [0]) * (self.width * self.depth)
+
+
+class SlidingTopK:
+    """Самые частые ключи за скользящее окно.
+
+    На каждый интервал окна - свой count-min sketch, плюс их сумма для оценки
+    за всё окно. Когда интервал выходит из окна, его sketch вычитается из суммы.
+    Кандидаты в топ - ограниченный словарь ключей с наибольшими оценками.
+    """
+
+    def __init__(self, window, buckets, k=10, width=2048, depth=4, capacity=None):
+        self.resolution = window // buckets
+        self.buckets = [CountMinSketch(width, depth) for _ in range(buckets)]
+        self.epochs = [-1] * buckets
+        self.total = CountMinSketch(width, depth)
+        self.current = -1
+        self.k = k
+        self.capacity = capacity or k * 10
+        self.candidates = {}
+
+    def _advance(self, epoch):
+        """Освобождает интервалы, вышедшие из окна к интервалу epoch"""
+
+        if epoch <= self.current:
+            return
+        size = len(self.buckets)
+        for next_epoch in range(max(self.current + 1, epoch - size + 1), epoch + 1):
+            index = next_epoch % size
+            if self.epochs[index] != -1:
+                self.total.subtract(self.buckets[index])
+                self.buckets[index].clear()
+            self.epochs[index] = next_epoch
+        self.current = epoch
+
+    def add(self, key, ts, count=1):
+        """False, если интервал события уже вышел из окна"""
+
+        epoch = int(ts // self.resolution)
+        self._advance(epoch)
+        if epoch <= self.current - len(self.buckets):
+            return False
+
+        indexes = self.total.indexes(key)
+        self.buckets[epoch % len(self.buckets)].add(key, count, indexes)
+        self.total.add(key, count, indexes)
+        self.candidates[key] = self.total.estimate(key, indexes)
+
+        if len(self.candidates) > 2 * self.capacity:
+            self._prune()
+        return True
+
+    def _prune(self):
+        ranked = sorted(self.candidates.items(), key=lambda item: item[1], reverse=True)
+        self.candidates = dict(ranked[:self.capacity])
+
+    def top(self, now, limit=None):
+        """[(ключ, оценка)] по убыванию за окно, заканчивающееся в now"""
+
+        self._advance(int(now // self.resolution))
+        self.candidates = {
+            key: estimate for key, estimate in
+            ((key, self.total.estimate(key)) for key in self.candidates)
+            if estimate > 0
+        }
+        ranked = sorted(self.candidates.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:limit or self.k]
+
+
+class HyperLogLog:
+    """Оценка числа различных ключей; 2^p однобайтовых регистров, ошибка около 1.04 / sqrt(2^p)"""
+
+    def __init__(self, p=12):
+        self.p = p
+        self.registers = bytearray(1 << p)
+
+    def add(self, key):
+        h = hash64(key)
+        index = h >> (64 - self.p)
+        rest = h & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Поправка для малых значений: линейный подсчёт по пустым регистрам
+            return round(m * math.log(m / zeros))
+        return round(estimate)
+
+    def clear(self):
+        self.registers = bytearray(len(self.registers))
+
+
+class SlidingDistinct:
+    """Число различных ключей за скользящее окно: HyperLogLog на каждый интервал"""
+
+    def __init__(self, window, buckets, p=12):
+        self.resolution = window // buckets
+        self.sketches = [HyperLogLog(p) for _ in range(buckets)]
+        self.epochs = [-1] * buckets
+        self.p = p
+
+    def add(self, key, ts):
+        epoch = int(ts // self.resolution)
+        index = epoch % len(self.sketches)
+        if self.epochs[index] != epoch:
+            if self.epochs[index] > epoch:
+                return False
+            self.epochs[index] = epoch
+            self.sketches[index].clear()
+        self.sketches[index].add(key)
+        return True
+
+    def count(self, now):
+        current = int(now // self.resolution)
+        merged = HyperLogLog(self.p)
+        for epoch, sketch in zip(self.epochs, self.sketches):
+            if current - len(self.sketches) < epoch <= current:
+                merged.merge(sketch)
+        return merged.count()
@@ -0,0 +1,192 @@
+from types import SimpleNamespace
+
+import pytest
+
+import app as analytics_app
+from consumer import EventConsumer
+from engine import AnalyticsEngine
+from sketches import CountMinSketch, HyperLogLog, RingCounter, SlidingTopK
+
+NOW = 1_700_000_000
+
+
+def event(event_type, ts, event_id=None, **data):
+    result = {'type': event_type, 'key': None, 'ts': int(ts * 1000), 'data': data}
+    if event_id is not None:
+        result['id'] = event_id
+    return result
+
+
+class TestSketches:
+    """Тесты для компактных структур"""
+
+    def test_ring_counter_drops_expired_intervals(self):
+        """Старые интервалы вытесняются новыми, опоздавшие события отбрасываются"""
+
+        counter = RingCounter(resolution=60, slots=3)
+        assert counter.add(NOW) and counter.add(NOW)
+        assert counter.add(NOW + 60)
+        assert counter.add(NOW + 180)  # занимает ячейку NOW
+        assert counter.add(NOW) is False
+
+        assert [count for _, count in counter.series(NOW + 180)] == [1, 0, 1]
+        assert counter.total(NOW + 180, 1) == 1
+
+    def test_count_min_sketch_never_underestimates(self):
+        """Оценка не меньше точного значения и вычитание отменяет добавление"""
+
+        sketch = CountMinSketch(width=64, depth=4)
+        other = CountMinSketch(width=64, depth=4)
+        for key in range(500):
+            sketch.add(key, key % 7 + 1)
+        other.add(3, 4)
+        sketch.add(3, 4)
+
+        assert all(sketch.estimate(key) >= key % 7 + 1 for key in range(500))
+        before = sketch.estimate(3)
+        sketch.subtract(other)
+        assert sketch.estimate(3) == before - 4
+
+    def test_sliding_top_k_forgets_old_buckets(self):
+        """Комментарии, вышедшие из окна, не учитываются в топе"""
+
+        top = SlidingTopK(window=300, buckets=5, k=3)
+        for _ in range(10):
+            top.add('old', NOW)
+        for _ in range(3):
+            top.add('new', NOW + 240)
+        top.add('other', NOW + 240)
+
+        assert top.top(NOW + 240) == [('old', 10), ('new', 3), ('other', 1)]
+        assert top.top(NOW + 300) == [('new', 3), ('other', 1)]
+        assert top.add('old', NOW) is False
+
+    def test_hyperloglog_estimate(self):
+        """Ошибка оценки в пределах нескольких процентов"""
+
+        hll = HyperLogLog()
+        for key in range(20000):
+            hll.add(key)
+            hll.add(key)
+
+        assert hll.count() == pytest.approx(20000, rel=0.05)
+
+
+class TestAnalyticsEngine:
+    """Тесты для движка агрегатов"""
+
+    def test_aggregates(self):
+        """Посты по минутам, топ постов и активные авторы"""
+
+        engine = AnalyticsEngine()
+        engine.process_many([
+            event('post.published', NOW, 1, id=1, author_id=1),
+            event('post.published', NOW + 60, 2, id=2, author_id=2),
+            event('comment.created', NOW + 60, id=1, post_id=1, user_id=3),
+            event('comment.created', NOW + 61, id=2, post_id=2, user_id=3),
+            event('comment.created', NOW + 62, id=3, post_id=2, user_id=4),
+            event('user.registered', NOW + 62, id=4),
+            event('user.banned', NOW + 62, id=4),
+        ])
+
+        published = engine.per_minute(engine.posts_published, 2, now=NOW + 60)
+        assert [minute['count'] for minute in published] == [1, 1]
+        assert engine.top('5m', now=NOW + 62) == [
+            {'post_id': 2, 'comments': 2},
+            {'post_id': 1, 'comments': 1},
+        ]
+        assert engine.authors(now=NOW + 62)['5m'] == 4
+        assert engine.summary(now=NOW + 62)['last_hour']['registrations'] == 1
+        assert engine.stats()['ignored'] == 1
+
+    def test_duplicate_events_are_skipped(self):
+        """Повторная доставка события из outbox не учитывается"""
+
+        engine = AnalyticsEngine()
+        engine.process(event('post.published', NOW, 7, id=1, author_id=1))
+        engine.process(event('post.published', NOW, 7, id=1, author_id=1))
+
+        assert engine.posts_published.total(NOW) == 1
+        assert engine.stats()['duplicates'] == 1
+
+    def test_malformed_events_are_invalid(self):
+        """Валидный JSON не той формы не роняет обработку"""
+
+        engine = AnalyticsEngine()
+        engine.process_many([
+            {'type': 'comment.created', 'ts': NOW * 1000, 'data': ['post_id', 1]},
+            event('comment.created', NOW, post_id=[1], user_id=1),
+            event('post.created', NOW),
+        ])
+
+        assert engine.stats()['invalid'] == 2
+        assert engine.posts_created.total(NOW) == 1
+
+    def test_snapshot_restore(self, tmp_path):
+        """Состояние переживает перезапуск"""
+
+        path = tmp_path / 'analytics.snapshot'
+        engine = AnalyticsEngine()
+        engine.process(event('comment.created', NOW, post_id=5, user_id=1))
+        engine.snapshot(path)
+
+        restored = AnalyticsEngine.restore(path)
+        assert restored.top('1h', now=NOW) == [{'post_id': 5, 'comments': 1}]
+        restored.process(event('comment.created', NOW, post_id=5, user_id=1))
+        assert restored.top('1h', now=NOW)[0]['comments'] == 2
+
+    def test_restore_without_snapshot(self, tmp_path):
+        assert AnalyticsEngine.restore(tmp_path / 'missing').stats()['processed'] == 0
+
+
+class TestApi:
+    """Тесты для HTTP API"""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        monkeypatch.setattr(analytics_app, 'ENGINE', AnalyticsEngine())
+        return analytics_app.app.test_client()
+
+    def test_ingest_and_top_posts(self, client):
+        """События по HTTP попадают в агрегаты"""
+
+        response = client.post('/internal/events/', json=[
+            {'type': 'comment.created', 'data': {'post_id': 42, 'user_id': 1}},
+            {'type': 'comment.created', 'data': {'post_id': 42, 'user_id': 2}},
+        ])
+        assert response.status_code == 202
+
+        response = client.get('/stats/top-posts/?window=5m&limit=1')
+        assert response.status_code == 200
+        assert response.get_json()['results'] == [{'post_id': 42, 'comments': 2}]
+
+    @pytest.mark.parametrize('url', [
+        '/stats/top-posts/?window=2h',
+        '/stats/top-posts/?limit=0',
+        '/stats/posts-per-minute/?minutes=abc',
+    ])
+    def test_invalid_params(self, client, url):
+        assert client.get(url).status_code == 400
+
+
+class TestConsumer:
+    """Тесты для чтения событий из Kafka"""
+
+    def test_failed_batch_does_not_stop_consumer(self):
+        class FailingEngine(AnalyticsEngine):
+            def process_many(self, events):
+                raise RuntimeError('boom')
+
+        consumer = EventConsumer(FailingEngine(), [])
+        consumer.handle_batch({'comments': [SimpleNamespace(value=b'{"type": "x"}'), SimpleNamespace(value=b'{')]})
+
+        stats = consumer.stats()
+        assert (stats['batch_errors'], stats['decode_errors'], stats['batches']) == (1, 1, 0)
+        assert 'boom' in stats['last_error']
+
+    def test_health_reports_stopped_consumer(self, monkeypatch):
+        monkeypatch.setattr(analytics_app, 'CONSUMER', EventConsumer(AnalyticsEngine(), []))
+
+        response = analytics_app.app.test_client().get('/health/')
+        assert response.status_code == 503
+        assert response.get_json()['status'] == 'unhealthy'
@@ -0,0 +1,282 @@
+"""Асинхронный режим шлюза (aiohttp).
+
+Маршруты и проверка токена те же, что в gateway.py, но тела запросов и ответов
+передаются потоково, кусками, а запросы к сервисам не занимают поток -
+один процесс держит тысячи одновременных вызовов.
+
+Запуск: GATEWAY_ENGINE=async python gateway.py (или python async_gateway.py)
+"""
+import asyncio
+import logging
+import os
+import time
+from functools import wraps
+
+import aiohttp
+from aiohttp import web
+from multidict import CIMultiDict
+
+from gateway import (
+    SERVICES, HOP_BY_HOP_HEADERS, INTERNAL_HEADERS, CLIENT_IP_HEADER, UPSTREAM_TIMEOUT, DEADLINE_HEADER,
+    HEALTH_DEADLINE, HEALTH_CACHE_TTL, TOKEN_CACHE, RESPONSE_CACHE,
+    authenticate_header, response_cache_key, is_storable, make_etag, etag_matches, purge_after_write
+)
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = int(os.environ.get('GATEWAY_CHUNK_SIZE', 64 * 1024))
+UPSTREAM_LIMIT = int(os.environ.get('GATEWAY_UPSTREAM_LIMIT', 1000))  # одновременных запросов к одному сервису
+KEEPALIVE_TIMEOUT = float(os.environ.get('GATEWAY_KEEPALIVE_TIMEOUT', 60))  # сколько держать простаивающее соединение
+
+CLIENT_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=UPSTREAM_TIMEOUT, sock_read=UPSTREAM_TIMEOUT)
+HEALTH_TIMEOUT = aiohttp.ClientTimeout(total=HEALTH_DEADLINE)
+
+
+def filter_headers(headers):
+    """Убирает hop-by-hop и служебные заголовки"""
+
+    return CIMultiDict(
+        (key, value) for key, value in headers.items()
+        if key.lower() not in HOP_BY_HOP_HEADERS and key.lower() not in INTERNAL_HEADERS
+    )
+
+
+def token_required(handler):
+    @wraps(handler)
+    async def decorated(request):
+        payload, error = authenticate_header(request.headers.get('Authorization'))
+        if error:
+            return web.json_response({'error': error}, status=401)
+
+        request['user'] = payload
+        return await handler(request)
+    return decorated
+
+
+async def _iter_body(request):
+    async for chunk in request.content.iter_chunked(CHUNK_SIZE):
+        yield chunk
+
+
+def cached_response(entry, if_none_match, cache_status):
+    if etag_matches(if_none_match, entry.etag):
+        return web.Response(status=304, headers={'ETag': entry.etag, 'X-Cache': cache_status})
+
+    response = web.Response(status=entry.status, body=entry.body, headers=entry.headers)
+    response.headers['ETag'] = entry.etag
+    response.headers['X-Cache'] = cache_status
+    return response
+
+
+def _storable_size(upstream):
+    """Размер тела, если ответ можно прочитать целиком и положить в кэш"""
+
+    if not is_storable(upstream.status, upstream.headers) or upstream.content_length is None:
+        return None
+    if upstream.content_length > RESPONSE_CACHE.max_entry_bytes:
+        return None
+    return upstream.content_length
+
+
+async def forward(request, service, path, headers, cache_key=None):
+    """Потоково проксирует запрос в сервис и ответ обратно клиенту"""
+
+    generation = RESPONSE_CACHE.generation
+    url = f"{SERVICES[service]}/{path}"
+    session = request.app['sessions'][service]
+    in_flight = request.app['in_flight']
+    body = _iter_body(request) if request.can_read_body else None
+
+    in_flight[service] += 1
+    try:
+        async with session.request(
+            request.method,
+            url,
+            headers=headers,
+            params=request.query,
+            data=body,
+            allow_redirects=False
+        ) as upstream:
+            purge_after_write(service, path, request.method, upstream.status)
+
+            if cache_key and _storable_size(upstream) is not None:
+                body = await upstream.read()
+                response_headers = [
+                    (key, value) for key, value in filter_headers(upstream.headers).items()
+                    if key.lower() not in ('content-length', 'etag')
+                ]
+                etag = upstream.headers.get('ETag') or make_etag(body)
+                entry = RESPONSE_CACHE.set(cache_key, upstream.status, response_headers, body, etag, generation)
+                if entry:
+                    return cached_response(entry, request.headers.get('If-None-Match'), 'MISS')
+                return web.Response(status=upstream.status, body=body, headers=response_headers)
+
+            response = web.StreamResponse(status=upstream.status, headers=filter_headers(upstream.headers))
+            await response.prepare(request)
+            try:
+                async for chunk in upstream.content.iter_chunked(CHUNK_SIZE):
+                    await response.write(chunk)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                # Заголовки уже отправлены - остаётся только оборвать ответ
+                logger.error(f"Upstream {service} broke the response for {url}: {e}")
+                request.transport.close()
+                return response
+            await response.write_eof()
+            return response
+    except asyncio.TimeoutError as e:  # таймауты aiohttp - тоже ClientError, поэтому проверяются первыми
+        return web.json_response({'error': str(e) or e.__class__.__name__}, status=504)
+    except aiohttp.ClientError as e:
+        return web.json_response({'error': str(e) or e.__class__.__name__}, status=502)
+    finally:
+        in_flight[service] -= 1
+
+
+# Публичные маршруты
+async def register(request):
+    return await forward(request, 'users', 'register/', filter_headers(request.headers))
+
+
+async def login(request):
+    # Адрес клиента - для ограничения попыток входа по IP; присланный клиентом заголовок перезаписывается
+    headers = filter_headers(request.headers)
+    headers[CLIENT_IP_HEADER] = request.remote or ''
+    return await forward(request, 'users', 'login/', headers)
+
+
+# Защищённый маршрут
+@token_required
+async def proxy(request):
+    service = request.match_info['service']
+    path = request.match_info['path']
+
+    if service not in SERVICES:
+        return web.json_response({'error': 'Service not found'}, status=404)
+
+    if service == 'auth':
+        return web.json_response({'error': 'Unauthorized'}, status=401)
+
+    # Служебные маршруты сервисов (internal/...) доступны только внутри сети
+    if path.startswith('internal/'):
+        return web.json_response({'error': 'Not found'}, status=404)
+
+    # Добавляем завершающий слэш, если его нет
+    if path and not path.endswith('/'):
+        path = path + '/'
+
+    cache_key = response_cache_key(service, path, request.method, request.query.items(), request.headers)
+    if cache_key:
+        entry = RESPONSE_CACHE.get(cache_key)
+        if entry:
+            return cached_response(entry, request.headers.get('If-None-Match'), 'HIT')
+
+    headers = filter_headers(request.headers)
+    headers['X-User-Id'] = str(request['user'].get('user_id'))
+    headers[DEADLINE_HEADER] = str(UPSTREAM_TIMEOUT * 1000)
+    if cache_key:
+        # Кэшируем полный ответ, условные запросы обрабатываем сами
+        headers.pop('If-None-Match', None)
+        headers.pop('If-Modified-Since', None)
+
+    return await forward(request, service, path, headers, cache_key)
+
+
+async def _probe(session, service_url):
+    started = time.monotonic()
+    try:
+        async with session.get(f"{service_url}/health/", timeout=HEALTH_TIMEOUT) as response:
+            status = {
+                'status': 'up' if response.status == 200 else 'down',
+                'code': response.status
+            }
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        status = {'status': 'down', 'code': 0}
+
+    status['latency_ms'] = round((time.monotonic() - started) * 1000, 1)
+    return status
+
+
+async def check_services(sessions):
+    """Опрашивает все сервисы параллельно, не дольше HEALTH_DEADLINE"""
+
+    tasks = {
+        service_name: asyncio.ensure_future(_probe(sessions[service_name], service_url))
+        for service_name, service_url in SERVICES.items()
+    }
+    await asyncio.wait(tasks.values(), timeout=HEALTH_DEADLINE)
+
+    services_status = {}
+    for service_name, task in tasks.items():
+        if task.done():
+            services_status[service_name] = task.result()
+        else:
+            task.cancel()
+            services_status[service_name] = {'status': 'down', 'code': 0, 'latency_ms': HEALTH_DEADLINE * 1000}
+    return services_status
+
+
+async def health(request):
+    cache = request.app['health_cache']
+    async with cache['lock']:
+        if cache['services'] is None or time.monotonic() - cache['checked_at'] >= HEALTH_CACHE_TTL:
+            cache['services'] = await check_services(request.app['sessions'])
+            cache['checked_at'] = time.monotonic()
+        services_status = cache['services']
+
+    return web.json_response({
+        'gateway': 'up',
+        'services': services_status
+    })
+
+
+async def gateway_stats(request):
+    pools = {}
+    for service_name, session in request.app['sessions'].items():
+        pools[service_name] = {
+            'limit': session.connector.limit,
+            'in_flight': request.app['in_flight'][service_name],
+        }
+
+    return web.json_response({
+        'pools': pools,
+        'token_cache': TOKEN_CACHE.stats(),
+        'response_cache': RESPONSE_CACHE.stats()
+    })
+
+
+async def upstream_sessions(app):
+    """Один ClientSession (и пул соединений) на сервис на всё время жизни приложения"""
+
+    app['in_flight'] = {service_name: 0 for service_name in SERVICES}
+    app['health_cache'] = {'lock': asyncio.Lock(), 'services': None, 'checked_at': 0.0}
+    app['sessions'] = {
+        service_name: aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=UPSTREAM_LIMIT, keepalive_timeout=KEEPALIVE_TIMEOUT),
+            timeout=CLIENT_TIMEOUT,
+            cookie_jar=aiohttp.DummyCookieJar(),
+            # Тело ответа отдаём клиенту как есть, вместе с Content-Encoding
+            auto_decompress=False
+        )
+        for service_name in SERVICES
+    }
+    yield
+    await asyncio.gather(*(session.close() for session in app['sessions'].values()))
+
+
+def create_app():
+    app = web.Application()
+    app.cleanup_ctx.append(upstream_sessions)
+    app.router.add_post('/api/auth/register', register)
+    app.router.add_post('/api/auth/login', login)
+    for method in ('GET', 'POST', 'PUT', 'PATCH', 'DELETE'):
+        app.router.add_route(method, '/api/{service}/{path:.*}', proxy)
+    app.router.add_get('/health', health)
+    app.router.add_get('/gateway/stats', gateway_stats)
+    return app
+
+
+def main():
+    web.run_app(create_app(), host='0.0.0.0', port=8000)
+
+
+if __name__ == '__main__':
+    main()
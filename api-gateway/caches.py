@@ -0,0 +1,154 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenCache:
+    """LRU-кэш проверенных JWT: токен -> payload, пока токен не истёк"""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl  # верхняя граница для токенов без exp
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            payload, expires_at = entry
+            if expires_at <= now:
+                del self._entries[token]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return payload
+
+    def set(self, token, payload):
+        if self.maxsize <= 0:
+            return
+
+        expires_at = time.time() + self.ttl
+        exp = payload.get('exp')
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, exp)
+
+        with self._lock:
+            self._entries[token] = (payload, expires_at)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+class CachedResponse:
+    __slots__ = ('status', 'headers', 'body', 'etag', 'expires_at')
+
+    def __init__(self, status, headers, body, etag, expires_at):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.etag = etag
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """LRU-кэш ответов сервисов с TTL и ограничением по объёму"""
+
+    def __init__(self, ttl, max_entries, max_bytes, max_entry_bytes):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes  # ответы крупнее не кэшируются
+        self.hits = 0
+        self.misses = 0
+        self.purges = 0
+        self.generation = 0  # растёт при каждой очистке
+        self._size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if entry.expires_at <= now:
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key, status, headers, body, etag, generation=None):
+        """Сохраняет ответ; generation - значение self.generation до запроса в сервис"""
+
+        if len(body) > self.max_entry_bytes:
+            return None
+
+        entry = CachedResponse(status, headers, body, etag, time.time() + self.ttl)
+        with self._lock:
+            # Пока ответ шёл из сервиса, кэш очистили - ответ мог устареть
+            if generation is not None and generation != self.generation:
+                return None
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._size += len(body)
+            while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+        return entry
+
+    def purge(self, prefix):
+        """Удаляет все ответы, ключ которых начинается с prefix"""
+
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                self._remove(key)
+            self.purges += 1
+            self.generation += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._size -= len(entry.body)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'purges': self.purges,
+                'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+            }
@@ -0,0 +1,13 @@
+#!/bin/bash
+
+# SERVER_MODE=dev - встроенный сервер Flask (или aiohttp), иначе gunicorn с воркерами на все ядра.
+# GATEWAY_ENGINE=async - aiohttp-реализация gateway
+if [ "$SERVER_MODE" = "dev" ]; then
+    exec python gateway.py
+fi
+
+if [ "$GATEWAY_ENGINE" = "async" ]; then
+    exec gunicorn 'async_gateway:create_app()' --worker-class aiohttp.GunicornWebWorker --bind 0.0.0.0:8000
+fi
+
+exec gunicorn gateway:app --bind 0.0.0.0:8000
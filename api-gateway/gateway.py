@@ -1,44 +1,206 @@
 from flask import Flask, request, jsonify
 import requests
+from requests.adapters import HTTPAdapter
+from http.cookiejar import DefaultCookiePolicy
+from concurrent.futures import ThreadPoolExecutor, wait
 import jwt
 from functools import wraps
+import hashlib
 import os
+import threading
+import time
+from urllib.parse import quote, urlencode
+
+from caches import TokenCache, ResponseCache
 
 app = Flask(__name__)
 
 SERVICES = {
     'users': 'http://users-service:8001',
     'posts': 'http://posts-service:8002',
-    'commnets': 'http://posts-service:8003',
+    'comments': 'http://comments-service:8003',
+    'analytics': 'http://analytics-service:8004',
 }
 
 JWT_SECRET = os.environ.get('JWT_SECRET', 'django-insecure-0(1bdu-nzf+%5xp960pac28f^a1^fez)mmxfj54_#lfe7v8ct4')
 
+# Кэш проверенных токенов: повторная проверка подписи для того же токена не нужна
+TOKEN_CACHE = TokenCache(
+    maxsize=int(os.environ.get('GATEWAY_TOKEN_CACHE_SIZE', 10000)),
+    ttl=int(os.environ.get('GATEWAY_TOKEN_CACHE_TTL', 300))
+)
+
+# Кэш GET-ответов публичных маршрутов (по умолчанию выключен).
+# GATEWAY_CACHE_PREFIXES - префиксы вида "<сервис>/<путь>", например "posts/"
+CACHE_PREFIXES = tuple(filter(None, os.environ.get('GATEWAY_CACHE_PREFIXES', '').split(',')))
+CACHE_VARY_HEADERS = tuple(filter(None, os.environ.get('GATEWAY_CACHE_VARY_HEADERS', 'Accept,Accept-Language').split(',')))
+# Успешный запрос на эти маршруты сбрасывает кэш сервиса - только в этом процессе
+# (при нескольких воркерах gunicorn остальные отдают старое до конца TTL, см. gunicorn.conf.py)
+CACHE_PURGE_ROUTES = tuple(filter(None, os.environ.get(
+    'GATEWAY_CACHE_PURGE_ROUTES', 'create/,edit/,publish/,close/,delete/'
+).split(',')))
+
+RESPONSE_CACHE = ResponseCache(
+    ttl=float(os.environ.get('GATEWAY_CACHE_TTL', 10)),
+    max_entries=int(os.environ.get('GATEWAY_CACHE_MAX_ENTRIES', 5000)),
+    max_bytes=int(os.environ.get('GATEWAY_CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+    max_entry_bytes=int(os.environ.get('GATEWAY_CACHE_MAX_ENTRY_BYTES', 1024 * 1024))
+)
+
+# Пул соединений к сервисам
+POOL_CONNECTIONS = int(os.environ.get('GATEWAY_POOL_CONNECTIONS', 4))  # сколько пулов (хостов) держать на сервис
+POOL_MAXSIZE = int(os.environ.get('GATEWAY_POOL_MAXSIZE', 32))  # сколько keep-alive соединений держать на хост
+POOL_BLOCK = os.environ.get('GATEWAY_POOL_BLOCK', 'false').lower() == 'true'  # POOL_MAXSIZE - жёсткий лимит на хост
+
+# Таймаут запроса к сервису; оставшийся бюджет передаётся сервису в заголовке,
+# чтобы его собственные вызовы других сервисов в него укладывались
+UPSTREAM_TIMEOUT = 30
+DEADLINE_HEADER = 'X-Request-Timeout-Ms'
+
+# Адрес клиента, как его видит gateway (users-service ограничивает по нему попытки входа)
+CLIENT_IP_HEADER = 'X-Real-IP'
+
+# Hop-by-hop заголовки относятся к конкретному соединению и не проксируются
+HOP_BY_HOP_HEADERS = {
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+    'te', 'trailers', 'transfer-encoding', 'upgrade', 'host',
+}
+# Служебные заголовки между сервисами: от клиента не пропускаются
+INTERNAL_HEADERS = {'x-service-token', CLIENT_IP_HEADER.lower()}
+
+
+def _make_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        pool_block=POOL_BLOCK,
+        max_retries=0
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    # Сессия общая для всех клиентов - куки сервисов не должны в ней оседать
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    return session
+
+
+# Одна сессия (и один пул keep-alive соединений) на сервис, общая для всех потоков
+SESSIONS = {service_name: _make_session() for service_name in SERVICES}
+
+
+def filter_headers(headers):
+    """Убирает hop-by-hop и служебные заголовки"""
+
+    return [
+        (key, value) for key, value in headers
+        if key.lower() not in HOP_BY_HOP_HEADERS and key.lower() not in INTERNAL_HEADERS
+    ]
+
+
+def response_cache_key(service, path, method, query_items, headers):
+    """Ключ кэша для GET-запроса или None, если маршрут не кэшируется"""
+
+    target = f"{service}/{path}"
+    if method != 'GET' or not target.startswith(CACHE_PREFIXES):
+        return None
+
+    # Части ключа экранируются: иначе "?a=1%26b%3D2" и "?a=1&b=2" дали бы один ключ
+    query = urlencode(sorted(query_items))
+    vary = urlencode([(header, headers.get(header, '')) for header in CACHE_VARY_HEADERS])
+    return f"{quote(target)}?{query}#{vary}"
+
+
+def is_storable(status_code, headers):
+    """Можно ли положить ответ в общий кэш"""
+
+    if status_code != 200 or 'Set-Cookie' in headers:
+        return False
+    cache_control = headers.get('Cache-Control', '').lower()
+    return not any(directive in cache_control for directive in ('private', 'no-store', 'no-cache'))
+
+
+def make_etag(body):
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match or not etag:
+        return False
+    candidates = [value.strip().removeprefix('W/') for value in if_none_match.split(',')]
+    return '*' in candidates or etag.removeprefix('W/') in candidates
+
+
+def purge_after_write(service, path, method, status_code):
+    """Сбрасывает кэш сервиса после успешной записи через маршруты CACHE_PURGE_ROUTES"""
+
+    if method == 'GET' or status_code >= 400 or not CACHE_PREFIXES:
+        return
+    if path.endswith(CACHE_PURGE_ROUTES):
+        RESPONSE_CACHE.purge(f"{service}/")
+
+
+def pool_stats():
+    """Статистика пулов соединений по сервисам"""
+
+    stats = {}
+    for service_name, session in SESSIONS.items():
+        adapter = session.get_adapter(SERVICES[service_name])
+        hosts = {}
+        for key in adapter.poolmanager.pools.keys():
+            pool = adapter.poolmanager.pools.get(key)
+            if pool is None:
+                continue
+            idle = sum(1 for conn in list(pool.pool.queue) if conn is not None)
+            hosts[f"{pool.host}:{pool.port}"] = {
+                'connections_opened': pool.num_connections,
+                'requests': pool.num_requests,
+                'idle': idle,
+            }
+        stats[service_name] = {
+            'maxsize': POOL_MAXSIZE,
+            'block': POOL_BLOCK,
+            'hosts': hosts,
+        }
+    return stats
+
+
+def authenticate_header(auth_header):
+    """Проверяет заголовок Authorization, возвращает (payload, ошибка)"""
+
+    if not auth_header:
+        return None, 'Token is missing'
+
+    # Проверяем формат заголовка
+    parts = auth_header.split(' ')
+    if len(parts) != 2 or parts[0].lower() != 'bearer':
+        return None, 'Invalid authorization header format. Expected: Bearer <token>'
+
+    token = parts[1]  # Безопасное получение токена
+    payload = TOKEN_CACHE.get(token)
+    if payload is not None:
+        return payload, None
+
+    try:
+        payload = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
+    except jwt.ExpiredSignatureError:
+        return None, 'Token has expired'
+    except jwt.InvalidTokenError:
+        return None, 'Invalid token'
+    except Exception as e:
+        return None, f'Token verification failed: {str(e)}'
+
+    TOKEN_CACHE.set(token, payload)
+    return payload, None
+
 
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        auth_header = request.headers.get('Authorization')
-        
-        if not auth_header:
-            return jsonify({'error': 'Token is missing'}), 401
-        
-        # Проверяем формат заголовка
-        parts = auth_header.split(' ')
-        if len(parts) != 2 or parts[0].lower() != 'bearer':
-            return jsonify({'error': 'Invalid authorization header format. Expected: Bearer <token>'}), 401
-        
-        try:
-            token = parts[1]  # Безопасное получение токена
-            payload = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
-            request.user = payload
-        except jwt.ExpiredSignatureError:
-            return jsonify({'error': 'Token has expired'}), 401
-        except jwt.InvalidTokenError:
-            return jsonify({'error': 'Invalid token'}), 401
-        except Exception as e:
-            return jsonify({'error': f'Token verification failed: {str(e)}'}), 401
-        
+        payload, error = authenticate_header(request.headers.get('Authorization'))
+        if error:
+            return jsonify({'error': error}), 401
+
+        request.user = payload
         return f(*args, **kwargs)
     return decorated
 
@@ -46,26 +208,36 @@ def token_required(f):
 # Публичные маршруты
 @app.route('/api/auth/register', methods=['POST'])
 def register():
-    response = requests.post(
+    response = SESSIONS['users'].post(
         f"{SERVICES['users']}/register/",
         json=request.json,
         timeout=30
     )
-    return response.content, response.status_code, response.headers.items()
+    return response.content, response.status_code, filter_headers(response.headers.items())
 
 
 @app.route('/api/auth/login', methods=['POST'])
 def login():
-    response = requests.post(
+    response = SESSIONS['users'].post(
         f"{SERVICES['users']}/login/",
         json=request.json,
+        # Адрес клиента - для ограничения попыток входа по IP
+        headers={CLIENT_IP_HEADER: request.remote_addr or ''},
         timeout=30
     )
-    return response.content, response.status_code, response.headers.items()
+    return response.content, response.status_code, filter_headers(response.headers.items())
+
+
+def cached_response(entry, if_none_match, cache_status):
+    headers = entry.headers + [('ETag', entry.etag), ('X-Cache', cache_status)]
+    if etag_matches(if_none_match, entry.etag):
+        return b'', 304, [('ETag', entry.etag), ('X-Cache', cache_status)]
+    return entry.body, entry.status, headers
 
 
 # Защищённый маршрут
-@app.route('/api/<service>/<path:path>', methods=['GET', 'POST', 'PUT', 'DELETE'])
+@app.route('/api/<service>/', defaults={'path': ''}, methods=['GET', 'POST', 'PUT', 'PATCH', 'DELETE'])
+@app.route('/api/<service>/<path:path>', methods=['GET', 'POST', 'PUT', 'PATCH', 'DELETE'])
 @token_required
 def proxy(service, path):
     if service not in SERVICES:
@@ -74,19 +246,35 @@ def proxy(service, path):
     if service == 'auth':
         return jsonify({'error': 'Unauthorized'}), 401
 
+    # Служебные маршруты сервисов (internal/...) доступны только внутри сети
+    if path.startswith('internal/'):
+        return jsonify({'error': 'Not found'}), 404
+
     # Добавляем завершающий слэш, если его нет
-    if not path.endswith('/'):
+    if path and not path.endswith('/'):
         path = path + '/'
 
+    cache_key = response_cache_key(service, path, request.method, request.args.items(multi=True), request.headers)
+    if cache_key:
+        entry = RESPONSE_CACHE.get(cache_key)
+        if entry:
+            return cached_response(entry, request.headers.get('If-None-Match'), 'HIT')
+        generation = RESPONSE_CACHE.generation
+
     # Forward request to appropriate service
     url = f"{SERVICES[service]}/{path}"
 
     # Forward headers
-    headers = {key: value for key, value in request.headers if key != 'Host'}
+    headers = dict(filter_headers(request.headers))
     headers['X-User-Id'] = str(request.user.get('user_id'))
+    headers[DEADLINE_HEADER] = str(UPSTREAM_TIMEOUT * 1000)
+    if cache_key:
+        # Кэшируем полный ответ, условные запросы обрабатываем сами
+        headers.pop('If-None-Match', None)
+        headers.pop('If-Modified-Since', None)
 
     try:
-        response = requests.request(
+        response = SESSIONS[service].request(
             method=request.method,
             url=url,
             headers=headers,
@@ -94,32 +282,101 @@ def proxy(service, path):
             params=request.args,
             cookies=request.cookies,
             allow_redirects=False,
-            timeout=30
+            timeout=UPSTREAM_TIMEOUT
         )
-
-        return response.content, response.status_code, response.headers.items()
+    except requests.Timeout as e:
+        return jsonify({'error': str(e)}), 504
     except requests.RequestException as e:
-        return jsonify({'error': str(e)}), 500
+        return jsonify({'error': str(e)}), 502
+
+    purge_after_write(service, path, request.method, response.status_code)
+
+    response_headers = filter_headers(response.headers.items())
+    if cache_key and is_storable(response.status_code, response.headers):
+        # Тело уже распаковано requests - заголовки длины и сжатия больше не верны
+        response_headers = [
+            (key, value) for key, value in response_headers
+            if key.lower() not in ('content-encoding', 'content-length', 'etag')
+        ]
+        etag = response.headers.get('ETag') or make_etag(response.content)
+        entry = RESPONSE_CACHE.set(
+            cache_key, response.status_code, response_headers, response.content, etag, generation
+        )
+        if entry:
+            return cached_response(entry, request.headers.get('If-None-Match'), 'MISS')
+
+    return response.content, response.status_code, response_headers
+
+
+# Проверка здоровья: сервисы опрашиваются параллельно, результат кэшируется
+HEALTH_DEADLINE = float(os.environ.get('GATEWAY_HEALTH_DEADLINE', 2))  # общий дедлайн опроса, сек
+HEALTH_CACHE_TTL = float(os.environ.get('GATEWAY_HEALTH_CACHE_TTL', 5))  # сколько отдавать последний результат, сек
+
+HEALTH_EXECUTOR = ThreadPoolExecutor(max_workers=2 * len(SERVICES), thread_name_prefix='health')
+_health_lock = threading.Lock()
+_health_cache = {'services': None, 'checked_at': 0.0}
+
+
+def _probe_service(service_name):
+    started = time.monotonic()
+    try:
+        response = SESSIONS[service_name].get(f"{SERVICES[service_name]}/health/", timeout=HEALTH_DEADLINE)
+        status = {
+            'status': 'up' if response.status_code == 200 else 'down',
+            'code': response.status_code
+        }
+    except requests.RequestException:
+        status = {'status': 'down', 'code': 0}
+
+    status['latency_ms'] = round((time.monotonic() - started) * 1000, 1)
+    return status
+
+
+def check_services():
+    """Опрашивает все сервисы параллельно, не дольше HEALTH_DEADLINE"""
+
+    futures = {HEALTH_EXECUTOR.submit(_probe_service, service_name): service_name for service_name in SERVICES}
+    done, _ = wait(futures, timeout=HEALTH_DEADLINE)
 
-@app.route('/health', methods=['GET'])
-def health():
     services_status = {}
+    for future, service_name in futures.items():
+        if future in done:
+            services_status[service_name] = future.result()
+        else:
+            services_status[service_name] = {'status': 'down', 'code': 0, 'latency_ms': HEALTH_DEADLINE * 1000}
+    return services_status
 
-    for service_name, service_url in SERVICES.items():
-        try:
-            response = requests.get(f"{service_url}/health", timeout=5)
-            services_status[service_name] = {
-                'status': 'up' if response.status_code == 200 else 'down',
-                'code': response.status_code
-            }
-        except requests.RequestException:
-            services_status[service_name] = {'status': 'down', 'code': 0}
 
+def services_health():
+    """Последний результат опроса, если он моложе HEALTH_CACHE_TTL"""
+
+    with _health_lock:
+        if _health_cache['services'] is None or time.monotonic() - _health_cache['checked_at'] >= HEALTH_CACHE_TTL:
+            _health_cache['services'] = check_services()
+            _health_cache['checked_at'] = time.monotonic()
+        return _health_cache['services']
+
+
+@app.route('/health', methods=['GET'])
+def health():
     return jsonify({
         'gateway': 'up',
-        'services': services_status
+        'services': services_health()
+    })
+
+
+@app.route('/gateway/stats', methods=['GET'])
+def gateway_stats():
+    return jsonify({
+        'pools': pool_stats(),
+        'token_cache': TOKEN_CACHE.stats(),
+        'response_cache': RESPONSE_CACHE.stats()
     })
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=8000, debug=True)
\ No newline at end of file
+    if os.environ.get('GATEWAY_ENGINE') == 'async':
+        import async_gateway
+        async_gateway.main()
+    else:
+        app.run(host='0.0.0.0', port=8000, debug=os.environ.get('ENVIRONMENT') == 'development')
\ No newline at end of file
@@ -0,0 +1,27 @@
+# Настройки gunicorn для gateway (читается из рабочего каталога автоматически)
+import multiprocessing
+import os
+
+# Кэш ответов (GATEWAY_CACHE_PREFIXES) и кэш токенов живут в памяти воркера: сброс кэша
+# после записи очищает только воркер, обработавший запись, остальные отдают старый ответ
+# до конца GATEWAY_CACHE_TTL. Поэтому с кэшем ответов по умолчанию один воркер;
+# WEB_WORKERS > 1 вместе с ним - только если устаревание на TTL допустимо
+RESPONSE_CACHE_ENABLED = bool(os.environ.get('GATEWAY_CACHE_PREFIXES'))
+workers = int(os.environ.get('WEB_WORKERS', 1 if RESPONSE_CACHE_ENABLED else multiprocessing.cpu_count()))
+worker_class = 'gthread'  # для GATEWAY_ENGINE=async заменяется aiohttp.GunicornWebWorker
+threads = int(os.environ.get('WEB_THREADS', 8))
+
+# Больше таймаута запроса к сервису (UPSTREAM_TIMEOUT), чтобы gateway успел ответить сам
+timeout = int(os.environ.get('WEB_TIMEOUT', 35))
+graceful_timeout = int(os.environ.get('WEB_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('WEB_KEEPALIVE', 5))
+
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('WEB_MAX_REQUESTS_JITTER', 1000))
+
+# Пулы соединений и кэши создаются в каждом воркере после fork
+preload_app = False
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+accesslog = os.environ.get('WEB_ACCESS_LOG', '-') or None
+errorlog = '-'
@@ -0,0 +1,23 @@
+import jwt
+import pytest
+
+import async_gateway
+import gateway
+from caches import ResponseCache
+
+
+@pytest.fixture
+def auth_headers():
+    token = jwt.encode({'user_id': 7}, gateway.JWT_SECRET, algorithm='HS256')
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def response_cache(monkeypatch):
+    """Пустой кэш ответов для posts/ и comments/ в обоих движках"""
+
+    cache = ResponseCache(ttl=10, max_entries=100, max_bytes=64 * 1024, max_entry_bytes=1024)
+    monkeypatch.setattr(gateway, 'CACHE_PREFIXES', ('posts/', 'comments/'))
+    monkeypatch.setattr(gateway, 'RESPONSE_CACHE', cache)
+    monkeypatch.setattr(async_gateway, 'RESPONSE_CACHE', cache)
+    return cache
@@ -0,0 +1,236 @@
+import asyncio
+import time
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+import async_gateway
+import gateway
+
+CLOSED_URL = 'http://127.0.0.1:1'
+
+
+def make_upstream(upstream):
+    """Сервис-заглушка: эхо запроса, потоковый ответ, медленные ответы"""
+
+    app = web.Application()
+
+    async def echo(request):
+        path = request.match_info['path']
+        upstream['calls'][path] = upstream['calls'].get(path, 0) + 1
+        return web.json_response({
+            'method': request.method,
+            'path': path,
+            'query': sorted(request.query.items()),
+            'body': (await request.read()).decode(),
+            'user_id': request.headers.get('X-User-Id'),
+            'service_token': request.headers.get('X-Service-Token'),
+            'proxy_authorization': request.headers.get('Proxy-Authorization'),
+            'calls': upstream['calls'][path],
+        }, status=201 if request.method == 'POST' else 200, headers={
+            'X-Upstream': 'yes',
+            'Keep-Alive': 'timeout=5',
+            'Proxy-Authenticate': 'Basic',
+            'X-Service-Token': 'leaked',
+        })
+
+    async def stream(request):
+        response = web.StreamResponse(headers={'Content-Type': 'text/plain', 'Keep-Alive': 'timeout=5'})
+        await response.prepare(request)
+        await response.write(b'first')
+        await upstream['release'].wait()
+        await response.write(b'-second')
+        await response.write_eof()
+        return response
+
+    async def slow(request):
+        await asyncio.sleep(2)
+        return web.json_response({})
+
+    async def health(request):
+        upstream['calls']['health'] = upstream['calls'].get('health', 0) + 1
+        return web.json_response({'status': 'healthy'})
+
+    app.router.add_get('/health/', health)
+    app.router.add_get('/stream/', stream)
+    app.router.add_get('/slow/', slow)
+    app.router.add_get('/slow/health/', slow)
+    app.router.add_route('*', '/{path:.*}', echo)
+    return app
+
+
+@pytest.fixture
+def run(monkeypatch):
+    """Запускает сервис-заглушку и async-шлюз, все сервисы указывают на заглушку"""
+
+    def run(check):
+        async def main():
+            upstream = {'calls': {}, 'release': asyncio.Event()}
+            async with TestServer(make_upstream(upstream)) as server:
+                url = str(server.make_url('')).rstrip('/')
+                for service_name in gateway.SERVICES:
+                    monkeypatch.setitem(gateway.SERVICES, service_name, url)
+                async with TestClient(TestServer(async_gateway.create_app())) as client:
+                    await check(client, upstream, url)
+
+        asyncio.run(main())
+    return run
+
+
+@pytest.fixture
+def flask_client():
+    return gateway.app.test_client()
+
+
+class TestForward:
+    """Тесты проксирования в async-режиме"""
+
+    def test_streamed_without_hop_by_hop_headers(self, run, auth_headers):
+        """Первый кусок доходит до клиента до конца ответа сервиса"""
+
+        async def check(client, upstream, url):
+            response = await client.get('/api/posts/stream/', headers=auth_headers)
+            assert response.status == 200
+            assert await asyncio.wait_for(response.content.readexactly(5), 2) == b'first'
+            upstream['release'].set()
+            assert await response.read() == b'-second'
+            assert 'Keep-Alive' not in response.headers
+
+        run(check)
+
+    def test_request_and_response_headers_filtered(self, run, auth_headers):
+        async def check(client, upstream, url):
+            response = await client.post('/api/posts/create/?b=2&a=1', data=b'{"title": "t"}', headers={
+                **auth_headers, 'X-Service-Token': 'forged', 'Proxy-Authorization': 'Basic x'
+            })
+            data = await response.json()
+
+            assert response.status == 201
+            assert data['method'] == 'POST' and data['path'] == 'create/'
+            assert data['query'] == [['a', '1'], ['b', '2']]
+            assert data['body'] == '{"title": "t"}'
+            assert data['user_id'] == '7'
+            assert data['service_token'] is None and data['proxy_authorization'] is None
+            assert response.headers['X-Upstream'] == 'yes'
+            for header in ('Keep-Alive', 'Proxy-Authenticate', 'X-Service-Token'):
+                assert header not in response.headers
+
+        run(check)
+
+    def test_upstream_timeout(self, run, auth_headers, monkeypatch):
+        monkeypatch.setattr(async_gateway, 'CLIENT_TIMEOUT', aiohttp.ClientTimeout(sock_read=0.2))
+
+        async def check(client, upstream, url):
+            response = await client.get('/api/posts/slow/', headers=auth_headers)
+            assert response.status == 504
+            assert 'error' in await response.json()
+
+        run(check)
+
+    def test_upstream_unavailable(self, run, auth_headers, monkeypatch):
+        async def check(client, upstream, url):
+            monkeypatch.setitem(gateway.SERVICES, 'posts', CLOSED_URL)
+            response = await client.get('/api/posts/', headers=auth_headers)
+            assert response.status == 502
+            assert 'error' in await response.json()
+
+        run(check)
+
+    def test_response_cache(self, run, auth_headers, response_cache):
+        async def check(client, upstream, url):
+            first = await client.get('/api/posts/', headers=auth_headers)
+            second = await client.get('/api/posts/', headers=auth_headers)
+            not_modified = await client.get('/api/posts/', headers={
+                **auth_headers, 'If-None-Match': f"W/{first.headers['ETag']}"
+            })
+
+            assert first.headers['X-Cache'] == 'MISS' and second.headers['X-Cache'] == 'HIT'
+            assert await first.read() == await second.read()
+            assert not_modified.status == 304
+            assert upstream['calls'][''] == 1
+
+            await client.post('/api/posts/create/', json={}, headers=auth_headers)
+            third = await client.get('/api/posts/', headers=auth_headers)
+            assert third.headers['X-Cache'] == 'MISS'
+            assert (await third.json())['calls'] == 2
+
+        run(check)
+
+
+class TestHealth:
+    """Тесты /health в async-режиме"""
+
+    def test_slow_and_failing_services(self, run, monkeypatch):
+        monkeypatch.setattr(async_gateway, 'HEALTH_DEADLINE', 0.2)
+        monkeypatch.setattr(async_gateway, 'HEALTH_TIMEOUT', aiohttp.ClientTimeout(total=1))
+        monkeypatch.setattr(async_gateway, 'HEALTH_CACHE_TTL', 60)
+
+        async def check(client, upstream, url):
+            monkeypatch.setitem(gateway.SERVICES, 'comments', f'{url}/slow')
+            monkeypatch.setitem(gateway.SERVICES, 'analytics', CLOSED_URL)
+
+            started = time.monotonic()
+            response = await client.get('/health')
+            elapsed = time.monotonic() - started
+            services = (await response.json())['services']
+
+            assert elapsed < 0.5
+            assert services['users']['status'] == services['posts']['status'] == 'up'
+            assert services['comments'] == {'status': 'down', 'code': 0, 'latency_ms': 200.0}
+            assert services['analytics']['status'] == 'down'
+
+            again = await client.get('/health')
+            assert (await again.json())['services'] == services
+            assert upstream['calls']['health'] == 2
+
+        run(check)
+
+
+class TestParity:
+    """Оба движка отвечают одинаково"""
+
+    @pytest.mark.parametrize('method, path, body, with_token', [
+        ('GET', '/api/users/profile/?x=1', None, True),
+        ('POST', '/api/comments/create/', b'{"text": "hi"}', True),
+        ('DELETE', '/api/posts/1/delete', None, True),
+        ('GET', '/api/posts/', None, False),
+        ('GET', '/api/unknown/x/', None, True),
+        ('GET', '/api/posts/internal/events/', None, True),
+    ])
+    def test_same_response(self, run, flask_client, auth_headers, method, path, body, with_token):
+        headers = {**(auth_headers if with_token else {}), 'Content-Type': 'application/json'}
+
+        async def check(client, upstream, url):
+            flask_response = await asyncio.get_running_loop().run_in_executor(
+                None, lambda: flask_client.open(path, method=method, data=body, headers=headers)
+            )
+            async_response = await client.request(method, path, data=body, headers=headers)
+
+            assert async_response.status == flask_response.status_code
+            flask_data, async_data = flask_response.get_json(), await async_response.json()
+            for data in (flask_data, async_data):
+                data.pop('calls', None)
+            assert async_data == flask_data
+            assert async_response.content_type == flask_response.mimetype
+            for header in ('X-Upstream', 'Keep-Alive', 'X-Service-Token'):
+                assert async_response.headers.get(header) == flask_response.headers.get(header)
+
+        run(check)
+
+    @pytest.mark.parametrize('service_url, status', [(CLOSED_URL, 502), ('{url}/slow', 504)])
+    def test_same_error_status(self, run, flask_client, auth_headers, monkeypatch, service_url, status):
+        monkeypatch.setattr(gateway, 'UPSTREAM_TIMEOUT', 0.2)
+        monkeypatch.setattr(async_gateway, 'CLIENT_TIMEOUT', aiohttp.ClientTimeout(sock_read=0.2))
+
+        async def check(client, upstream, url):
+            monkeypatch.setitem(gateway.SERVICES, 'posts', service_url.format(url=url))
+            flask_response = await asyncio.get_running_loop().run_in_executor(
+                None, lambda: flask_client.get('/api/posts/', headers=auth_headers)
+            )
+            async_response = await client.get('/api/posts/', headers=auth_headers)
+
+            assert flask_response.status_code == async_response.status == status
+
+        run(check)
@@ -0,0 +1,189 @@
+import jwt
+import pytest
+
+import caches
+import gateway
+from caches import ResponseCache, TokenCache
+
+NOW = 1_700_000_000
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Управляемое время для caches"""
+
+    current = {'now': float(NOW)}
+    monkeypatch.setattr(caches.time, 'time', lambda: current['now'])
+    return current
+
+
+class TestTokenCache:
+    """Тесты кэша проверенных токенов"""
+
+    def test_ttl_is_bounded_by_exp(self, clock):
+        """Запись живёт не дольше exp токена, даже если ttl больше"""
+
+        cache = TokenCache(maxsize=10, ttl=300)
+        cache.set('short', {'user_id': 1, 'exp': NOW + 10})
+        cache.set('long', {'user_id': 2, 'exp': NOW + 1000})
+
+        clock['now'] = NOW + 9
+        assert cache.get('short') == {'user_id': 1, 'exp': NOW + 10}
+        clock['now'] = NOW + 10
+        assert cache.get('short') is None
+        assert cache.get('long') is not None
+        clock['now'] = NOW + 300
+        assert cache.get('long') is None
+
+    def test_expired_token_is_not_served(self, clock):
+        """Токен с exp в прошлом из кэша не отдаётся"""
+
+        cache = TokenCache(maxsize=10, ttl=300)
+        cache.set('expired', {'user_id': 1, 'exp': NOW - 1})
+
+        assert cache.get('expired') is None
+        assert cache.stats()['size'] == 0
+
+    def test_token_without_exp_uses_ttl(self, clock):
+        """Без exp (или с exp не числом) запись живёт ttl"""
+
+        cache = TokenCache(maxsize=10, ttl=300)
+        cache.set('no-exp', {'user_id': 1})
+        cache.set('bad-exp', {'user_id': 2, 'exp': 'never'})
+
+        clock['now'] = NOW + 299
+        assert cache.get('no-exp') is not None
+        assert cache.get('bad-exp') is not None
+        clock['now'] = NOW + 300
+        assert cache.get('no-exp') is None
+        assert cache.get('bad-exp') is None
+
+    def test_lru_eviction(self, clock):
+        """При переполнении вытесняется давно не использованный токен"""
+
+        cache = TokenCache(maxsize=2, ttl=300)
+        cache.set('a', {'user_id': 1})
+        cache.set('b', {'user_id': 2})
+        assert cache.get('a') is not None
+        cache.set('c', {'user_id': 3})
+
+        assert cache.get('b') is None
+        assert cache.get('a') is not None
+        assert cache.get('c') is not None
+        assert cache.stats()['size'] == 2
+
+    def test_disabled_cache(self, clock):
+        cache = TokenCache(maxsize=0, ttl=300)
+        cache.set('a', {'user_id': 1})
+
+        assert cache.get('a') is None
+        assert cache.stats()['size'] == 0
+
+
+class TestAuthenticateHeader:
+    """Тесты проверки заголовка Authorization"""
+
+    @pytest.fixture(autouse=True)
+    def token_cache(self, monkeypatch):
+        cache = TokenCache(maxsize=10, ttl=300)
+        monkeypatch.setattr(gateway, 'TOKEN_CACHE', cache)
+        return cache
+
+    def test_valid_token_is_cached(self, token_cache):
+        token = jwt.encode({'user_id': 7}, gateway.JWT_SECRET, algorithm='HS256')
+
+        assert gateway.authenticate_header(f'Bearer {token}') == ({'user_id': 7}, None)
+        assert gateway.authenticate_header(f'Bearer {token}') == ({'user_id': 7}, None)
+        assert token_cache.stats()['size'] == 1
+        assert token_cache.hits == 1
+
+    @pytest.mark.parametrize('payload, secret, error', [
+        ({'user_id': 7}, 'wrong-secret-wrong-secret-wrong-secret', 'Invalid token'),
+        ({'user_id': 7, 'exp': NOW}, None, 'Token has expired'),
+    ])
+    def test_rejected_token_is_not_cached(self, token_cache, payload, secret, error):
+        """Отклонённый токен не попадает в кэш и проверяется заново"""
+
+        token = jwt.encode(payload, secret or gateway.JWT_SECRET, algorithm='HS256')
+
+        for _ in range(2):
+            assert gateway.authenticate_header(f'Bearer {token}') == (None, error)
+        assert token_cache.stats()['size'] == 0
+        assert token_cache.hits == 0
+
+    @pytest.mark.parametrize('header', [None, '', 'Token abc', 'Bearer'])
+    def test_malformed_header(self, token_cache, header):
+        payload, error = gateway.authenticate_header(header)
+
+        assert payload is None and error
+        assert token_cache.stats()['size'] == 0
+
+
+def response_cache(**kwargs):
+    options = {'ttl': 10, 'max_entries': 100, 'max_bytes': 1000, 'max_entry_bytes': 100}
+    options.update(kwargs)
+    return ResponseCache(**options)
+
+
+class TestResponseCache:
+    """Тесты кэша ответов"""
+
+    def test_ttl(self, clock):
+        cache = response_cache()
+        cache.set('posts/', 200, [], b'body', '"e"')
+
+        clock['now'] = NOW + 9
+        assert cache.get('posts/').body == b'body'
+        clock['now'] = NOW + 10
+        assert cache.get('posts/') is None
+        assert cache.stats()['bytes'] == 0
+
+    def test_entry_count_bound(self, clock):
+        """Сверх max_entries вытесняется давно не использованный ответ"""
+
+        cache = response_cache(max_entries=2)
+        cache.set('a', 200, [], b'1', '"1"')
+        cache.set('b', 200, [], b'2', '"2"')
+        cache.get('a')
+        cache.set('c', 200, [], b'3', '"3"')
+
+        assert cache.get('b') is None
+        assert cache.get('a') is not None and cache.get('c') is not None
+
+    def test_byte_bounds(self, clock):
+        """Объём кэша не превышает max_bytes, крупные ответы не кэшируются"""
+
+        cache = response_cache(max_bytes=100, max_entry_bytes=60)
+        assert cache.set('big', 200, [], b'x' * 61, '"big"') is None
+        cache.set('a', 200, [], b'x' * 60, '"a"')
+        cache.set('b', 200, [], b'x' * 50, '"b"')
+
+        assert cache.get('a') is None
+        assert cache.get('b') is not None
+        assert cache.stats()['bytes'] == 50
+
+        cache.set('b', 200, [], b'x' * 10, '"b2"')
+        assert cache.stats()['bytes'] == 10 and cache.stats()['entries'] == 1
+
+    def test_fill_started_before_purge_is_dropped(self, clock):
+        """Ответ, запрошенный до очистки, в кэш не попадает"""
+
+        cache = response_cache()
+        generation = cache.generation
+        cache.purge('posts/')
+
+        assert cache.set('posts/', 200, [], b'stale', '"s"', generation) is None
+        assert cache.get('posts/') is None
+        assert cache.set('posts/', 200, [], b'fresh', '"f"', cache.generation) is not None
+
+    def test_purge_by_prefix(self, clock):
+        cache = response_cache()
+        cache.set('posts/', 200, [], b'1', '"1"')
+        cache.set('posts/1/', 200, [], b'2', '"2"')
+        cache.set('comments/post/1/', 200, [], b'3', '"3"')
+
+        cache.purge('posts/')
+
+        assert cache.get('posts/') is None and cache.get('posts/1/') is None
+        assert cache.get('comments/post/1/') is not None
+        assert cache.stats()['purges'] == 1
@@ -0,0 +1,78 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+import gateway
+
+
+class FakeSession:
+    """Сессия сервиса: отвечает с задержкой, ошибкой или кодом"""
+
+    def __init__(self, status=200, delay=0.0, error=None):
+        self.status = status
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    def get(self, url, timeout=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return SimpleNamespace(status_code=self.status)
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    sessions = {
+        'users': FakeSession(),
+        'posts': FakeSession(delay=1.0),
+        'comments': FakeSession(error=requests.ConnectionError('refused')),
+        'analytics': FakeSession(status=503),
+    }
+    monkeypatch.setattr(gateway, 'SESSIONS', sessions)
+    monkeypatch.setattr(gateway, 'HEALTH_DEADLINE', 0.2)
+    monkeypatch.setattr(gateway, '_health_cache', {'services': None, 'checked_at': 0.0})
+    return sessions
+
+
+class TestCheckServices:
+    """Тесты опроса сервисов для /health"""
+
+    def test_slow_service_does_not_delay_others(self, sessions):
+        """Опрос укладывается в дедлайн, медленный сервис считается недоступным"""
+
+        started = time.monotonic()
+        services = gateway.check_services()
+        elapsed = time.monotonic() - started
+
+        assert elapsed < 0.5
+        assert services['users']['status'] == 'up'
+        assert services['posts'] == {'status': 'down', 'code': 0, 'latency_ms': 200.0}
+        assert services['comments']['status'] == 'down' and services['comments']['code'] == 0
+        assert services['analytics']['status'] == 'down' and services['analytics']['code'] == 503
+
+    def test_result_is_cached(self, sessions, monkeypatch):
+        """В пределах HEALTH_CACHE_TTL сервисы повторно не опрашиваются"""
+
+        monkeypatch.setattr(gateway, 'HEALTH_CACHE_TTL', 60)
+        client = gateway.app.test_client()
+
+        first = client.get('/health')
+        second = client.get('/health')
+
+        assert first.status_code == second.status_code == 200
+        assert first.get_json() == second.get_json()
+        assert first.get_json()['gateway'] == 'up'
+        assert all(session.calls == 1 for session in sessions.values())
+
+    def test_cache_expires(self, sessions, monkeypatch):
+        monkeypatch.setattr(gateway, 'HEALTH_CACHE_TTL', 0)
+        client = gateway.app.test_client()
+
+        client.get('/health')
+        client.get('/health')
+
+        assert sessions['users'].calls == 2
@@ -0,0 +1,175 @@
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import gateway
+
+
+class FakeSession:
+    """Сессия сервиса: на GET отдаёт новое тело при каждом запросе"""
+
+    def __init__(self, headers=None, on_request=None):
+        self.headers = headers or {}
+        self.on_request = on_request
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        if self.on_request:
+            self.on_request()
+
+        response = requests.Response()
+        response.status_code = 200 if method == 'GET' else 201
+        response.headers = CaseInsensitiveDict({'Content-Type': 'application/json', **self.headers})
+        response._content = f'{{"call": {len(self.calls)}}}'.encode()
+        return response
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    sessions = {service_name: FakeSession() for service_name in gateway.SERVICES}
+    monkeypatch.setattr(gateway, 'SESSIONS', sessions)
+    return sessions
+
+
+@pytest.fixture
+def client():
+    return gateway.app.test_client()
+
+
+class TestResponseCacheKey:
+    """Тесты ключа кэша и разбора If-None-Match"""
+
+    def test_query_parts_are_escaped(self, response_cache):
+        """Экранированный "&" в значении не склеивается с отдельными параметрами"""
+
+        headers = {'Accept': 'application/json'}
+        joined = gateway.response_cache_key('posts', '', 'GET', [('a', '1&b=2')], headers)
+        split = gateway.response_cache_key('posts', '', 'GET', [('a', '1'), ('b', '2')], headers)
+
+        assert joined != split
+        assert gateway.response_cache_key('posts', '', 'GET', [('b', '2'), ('a', '1')], headers) == split
+        assert gateway.response_cache_key('posts', '', 'POST', [], headers) is None
+        assert gateway.response_cache_key('users', 'profile/', 'GET', [], headers) is None
+
+    def test_vary_headers_are_escaped(self, response_cache):
+        key = gateway.response_cache_key('posts', '', 'GET', [], {'Accept': 'a#Accept-Language=ru'})
+
+        assert key != gateway.response_cache_key('posts', '', 'GET', [], {'Accept': 'a', 'Accept-Language': 'ru'})
+
+    @pytest.mark.parametrize('if_none_match, expected', [
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"other", "abc"', True),
+        ('*', True),
+        ('"other"', False),
+        ('', False),
+        (None, False),
+    ])
+    def test_etag_matches(self, if_none_match, expected):
+        assert gateway.etag_matches(if_none_match, '"abc"') is expected
+
+    def test_weak_etag_matches(self):
+        assert gateway.etag_matches('"abc"', 'W/"abc"')
+
+    @pytest.mark.parametrize('status, headers, expected', [
+        (200, {}, True),
+        (200, {'Cache-Control': 'public, max-age=60'}, True),
+        (200, {'Cache-Control': 'private'}, False),
+        (200, {'Cache-Control': 'no-store'}, False),
+        (200, {'Cache-Control': 'no-cache'}, False),
+        (200, {'Set-Cookie': 'sessionid=1'}, False),
+        (404, {}, False),
+    ])
+    def test_is_storable(self, status, headers, expected):
+        assert gateway.is_storable(status, CaseInsensitiveDict(headers)) is expected
+
+
+class TestProxyCache:
+    """Тесты кэширования ответов в proxy"""
+
+    def test_miss_then_hit(self, client, sessions, response_cache, auth_headers):
+        first = client.get('/api/posts/', headers=auth_headers)
+        second = client.get('/api/posts/', headers=auth_headers)
+
+        assert first.headers['X-Cache'] == 'MISS'
+        assert second.headers['X-Cache'] == 'HIT'
+        assert first.data == second.data == b'{"call": 1}'
+        assert first.headers['ETag'] == second.headers['ETag'] == gateway.make_etag(b'{"call": 1}')
+        assert len(sessions['posts'].calls) == 1
+
+    def test_escaped_query_is_cached_separately(self, client, sessions, response_cache, auth_headers):
+        client.get('/api/posts/?a=1&b=2', headers=auth_headers)
+        response = client.get('/api/posts/?a=1%26b%3D2', headers=auth_headers)
+
+        assert response.headers['X-Cache'] == 'MISS'
+        assert len(sessions['posts'].calls) == 2
+
+    @pytest.mark.parametrize('if_none_match', ['{etag}', 'W/{etag}', '"other", {etag}', '*'])
+    def test_not_modified(self, client, sessions, response_cache, auth_headers, if_none_match):
+        etag = client.get('/api/posts/', headers=auth_headers).headers['ETag']
+
+        response = client.get('/api/posts/', headers={
+            **auth_headers, 'If-None-Match': if_none_match.format(etag=etag)
+        })
+
+        assert response.status_code == 304
+        assert response.data == b''
+        assert response.headers['ETag'] == etag
+        assert len(sessions['posts'].calls) == 1
+
+    def test_stale_etag_gets_full_response(self, client, sessions, response_cache, auth_headers):
+        client.get('/api/posts/', headers=auth_headers)
+        response = client.get('/api/posts/', headers={**auth_headers, 'If-None-Match': '"other"'})
+
+        assert response.status_code == 200
+        assert response.data == b'{"call": 1}'
+
+    @pytest.mark.parametrize('cache_control', ['private', 'no-store'])
+    def test_private_response_is_not_cached(self, client, sessions, response_cache, auth_headers, cache_control):
+        sessions['posts'].headers = {'Cache-Control': cache_control}
+
+        client.get('/api/posts/', headers=auth_headers)
+        response = client.get('/api/posts/', headers=auth_headers)
+
+        assert 'X-Cache' not in response.headers
+        assert response.data == b'{"call": 2}'
+        assert response_cache.stats()['entries'] == 0
+
+    @pytest.mark.parametrize('method, service, path, read_path', [
+        ('POST', 'posts', 'create/', 'posts/'),
+        ('PATCH', 'posts', '1/edit/', 'posts/1/'),
+        ('DELETE', 'posts', '1/delete/', 'posts/'),
+        ('POST', 'comments', 'create/', 'comments/post/1/'),
+        ('PATCH', 'comments', '1/edit/', 'comments/post/1/'),
+        ('DELETE', 'comments', '1/delete/', 'comments/post/1/'),
+    ])
+    def test_write_purges_service(self, client, sessions, response_cache, auth_headers,
+                                  method, service, path, read_path):
+        """Успешная запись сбрасывает кэш своего сервиса"""
+
+        client.get(f'/api/{read_path}', headers=auth_headers)
+        client.open(f'/api/{service}/{path}', method=method, headers=auth_headers, json={})
+        response = client.get(f'/api/{read_path}', headers=auth_headers)
+
+        assert response.headers['X-Cache'] == 'MISS'
+        assert response_cache.stats()['purges'] == 1
+
+    def test_write_keeps_other_services(self, client, sessions, response_cache, auth_headers):
+        client.get('/api/posts/', headers=auth_headers)
+        client.post('/api/comments/create/', headers=auth_headers, json={})
+
+        assert client.get('/api/posts/', headers=auth_headers).headers['X-Cache'] == 'HIT'
+
+    def test_fill_started_before_purge_is_dropped(self, client, sessions, response_cache, auth_headers):
+        """Ответ, полученный во время записи в сервис, не кэшируется"""
+
+        sessions['posts'].on_request = lambda: response_cache.purge('posts/')
+        first = client.get('/api/posts/', headers=auth_headers)
+        sessions['posts'].on_request = None
+
+        second = client.get('/api/posts/', headers=auth_headers)
+
+        assert first.status_code == 200 and 'X-Cache' not in first.headers
+        assert second.headers['X-Cache'] == 'MISS'
+        assert second.data == b'{"call": 2}'
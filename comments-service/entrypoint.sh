@@ -0,0 +1,11 @@
+#!/bin/bash
+
+cd /app/main
+
+# Быстрая проверка применённых миграций; migrate - только если есть новые, под advisory lock
+echo "Applying database migrations (${MIGRATE_MODE:-auto})..."
+python -m servicekit.migrate || exit 1
+
+# SERVER_MODE: wsgi (по умолчанию), asgi или dev - см. servicekit/serve.py
+echo "Starting server (${SERVER_MODE:-wsgi})..."
+exec python -m servicekit.serve --port 8003
\ No newline at end of file
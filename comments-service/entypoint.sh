@@ -1,9 +0,0 @@
-#!/bin/bash
-
-cd /app/main
-
-echo "Applying database migrations..."
-python manage.py migrate
-
-echo "Starting server..."
-python manage.py runserver 0.0.0.0:8003
\ No newline at end of file
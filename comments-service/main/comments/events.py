@@ -0,0 +1,22 @@
+from django.db import transaction
+from servicekit import publish
+
+COMMENTS_TOPIC = 'comments'
+
+
+def comment_event_data(comment):
+    """Компактное содержимое события о комментарии"""
+
+    return {
+        'id': comment.pk,
+        'post_id': comment.post_id,
+        'user_id': comment.user_id,
+        'created_at': comment.created_at,
+    }
+
+
+def emit_comment_event(event_type, comment, **extra):
+    """Публикует событие о комментарии после коммита транзакции; ключ - пост, чтобы события поста шли по порядку"""
+
+    data = {**comment_event_data(comment), **extra}
+    transaction.on_commit(lambda: publish(COMMENTS_TOPIC, event_type, comment.post_id, data))
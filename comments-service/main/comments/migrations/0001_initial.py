@@ -0,0 +1,34 @@
+# Generated by Django 6.0 on 2026-10-18 19:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Comment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.IntegerField()),
+                ('post_id', models.IntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('text', models.TextField(max_length=1000)),
+                ('image_url', models.URLField(max_length=500)),
+                ('is_updated', models.BooleanField(default=False)),
+            ],
+            options={
+                'verbose_name': 'комментарий',
+                'verbose_name_plural': 'комментарии',
+                'db_table': 'comments',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['post_id', 'created_at'], name='comments_post_id_015fcc_idx')],
+            },
+        ),
+    ]
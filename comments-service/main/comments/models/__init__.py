@@ -0,0 +1 @@
+from .Comment import Comment
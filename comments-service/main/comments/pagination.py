@@ -0,0 +1,78 @@
+import base64
+import binascii
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+
+
+class CommentKeysetPagination:
+    """Keyset-пагинация комментариев поста по (created_at, id) от старых к новым.
+
+    Страница выбирается по индексу (post_id, created_at), а строки читаются
+    из серверного курсора пачками по chunk_size - даже очень длинная ветка
+    отдаётся без загрузки всей страницы в память. Курсор следующей страницы
+    известен только после того, как страница прочитана до конца.
+    """
+
+    page_size = getattr(settings, 'COMMENTS_PAGE_SIZE', 50)
+    max_page_size = getattr(settings, 'COMMENTS_MAX_PAGE_SIZE', 10000)
+    chunk_size = getattr(settings, 'COMMENTS_STREAM_CHUNK_SIZE', 500)
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Некорректный курсор'
+
+    def __init__(self):
+        self.next_cursor = None
+
+    def paginate_queryset(self, queryset, request):
+        """Ленивый итератор строк страницы; ошибка курсора - сразу, до начала выдачи"""
+
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        if position is not None:
+            created_at, pk = position
+            # Первое условие задаёт границу диапазона по индексу, второе разбирает совпадения по времени
+            queryset = queryset.filter(created_at__gte=created_at).filter(
+                Q(created_at__gt=created_at) | Q(id__gt=pk)
+            )
+
+        rows = queryset.order_by('created_at', 'id')[:page_size + 1].iterator(chunk_size=self.chunk_size)
+        return self._iter_page(rows, page_size)
+
+    def _iter_page(self, rows, page_size):
+        last = None
+        for index, row in enumerate(rows):
+            if index == page_size:
+                self.next_cursor = self.encode_cursor(last)
+                break
+            last = row
+            yield row
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            decoded = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii')
+            created_at, pk = decoded.rsplit('|', 1)
+            return datetime.fromisoformat(created_at), int(pk)
+        except (binascii.Error, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def encode_cursor(row):
+        return base64.urlsafe_b64encode(f"{row['created_at'].isoformat()}|{row['id']}".encode('ascii')).decode('ascii')
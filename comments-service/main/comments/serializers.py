@@ -1,3 +1,4 @@
+from django.utils import timezone
 from rest_framework import serializers
 
 from comments.models.Comment import Comment
@@ -5,9 +6,27 @@ from comments.services.PostServiceClient import PostServiceClient
 from comments.services.UserServiceClient import UserServiceClient
 
 
-class UserSerializer(serializers.ModelSerializer):
+class CommentListSerializer(serializers.ListSerializer):
+    """Список комментариев: авторы и посты всей страницы загружаются разом.
+
+    Вместо двух HTTP-запросов на каждый комментарий - пакетный запрос
+    пользователей и параллельные запросы уникальных постов; результаты
+    кладутся в context, откуда их берут get_user_data и get_post_data.
+    """
+
+    def to_representation(self, data):
+        comments = list(data.all() if hasattr(data, 'all') else data)
+
+        self.context['users'] = UserServiceClient.get_users(comment.user_id for comment in comments)
+        self.context['posts'] = PostServiceClient.get_posts(comment.post_id for comment in comments)
+
+        return super().to_representation(comments)
+
+
+class CommentSerializer(serializers.ModelSerializer):
     """Сериализатор для комментариев"""
 
+    user_id = serializers.IntegerField(read_only=True)
     user_data = serializers.SerializerMethodField(read_only=True)
     post_data = serializers.SerializerMethodField(read_only=True)
 
@@ -26,12 +45,13 @@ class UserSerializer(serializers.ModelSerializer):
             'updated_at',
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'is_updated']
+        list_serializer_class = CommentListSerializer
 
-    @staticmethod
-    def get_user_data(obj):
+    def get_user_data(self, obj):
         """Получение данных пользователя из внешнего сервиса"""
         try:
-            user_data = UserServiceClient.get_user(obj.user_id)
+            users = self.context.get('users')
+            user_data = users.get(obj.user_id) if users is not None else UserServiceClient.get_user(obj.user_id)
             if user_data:
                 # Возвращаем только необходимые поля (настроить по потребности)
                 return {
@@ -41,11 +61,11 @@ class UserSerializer(serializers.ModelSerializer):
             pass
         return None
 
-    @staticmethod
     def get_post_data(self, obj):
         """Получение данных поста из внешнего сервиса"""
         try:
-            post_data = PostServiceClient.get_post(obj.post_id)
+            posts = self.context.get('posts')
+            post_data = posts.get(obj.post_id) if posts is not None else PostServiceClient.get_post(obj.post_id)
             if post_data:
                 # Возвращаем только необходимые поля (настроить по потребности)
                 return {
@@ -55,14 +75,6 @@ class UserSerializer(serializers.ModelSerializer):
             pass
         return None
 
-    @staticmethod
-    def validate_user_id(self, value):
-        """Валидация существования пользователя"""
-        if not UserServiceClient.get_user(value):
-            raise serializers.ValidationError("Пользователь не существует")
-        return value
-
-    @staticmethod
     def validate_post_id(self, value):
         """Валидация существования поста"""
         if not PostServiceClient.get_post(value):
@@ -79,4 +91,64 @@ class UserSerializer(serializers.ModelSerializer):
         instance = super().update(instance, validated_data)
         instance.is_updated = True
         instance.save()
-        return instance
\ No newline at end of file
+        return instance
+
+
+class CommentUpdateSerializer(serializers.ModelSerializer):
+    """Для редактирования комментария"""
+
+    class Meta:
+        model = Comment
+        fields = ['id', 'text', 'image_url', 'is_updated', 'updated_at']
+        read_only_fields = ['id', 'is_updated', 'updated_at']
+
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.is_updated = True
+        instance.save()
+        return instance
+
+
+class CommentRowSerializer:
+    """Быстрый сериализатор для потоковой выдачи.
+
+    Работает со строками queryset.values() пачками: авторы и посты пачки
+    загружаются разом, формат вывода совпадает с CommentSerializer.
+    """
+
+    columns = ['id', 'user_id', 'post_id', 'text', 'image_url', 'is_updated', 'created_at', 'updated_at']
+    datetime_fields = ('created_at', 'updated_at')
+
+    @staticmethod
+    def format_datetime(value, tz):
+        value = value.astimezone(tz).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+
+    @staticmethod
+    def remote_data(data):
+        return {'id': data.get('id')} if data else None
+
+    def serialize(self, rows):
+        tz = timezone.get_current_timezone()
+        users = UserServiceClient.get_users(row['user_id'] for row in rows)
+        posts = PostServiceClient.get_posts(row['post_id'] for row in rows)
+
+        result = []
+        for row in rows:
+            data = {
+                'id': row['id'],
+                'user_id': row['user_id'],
+                'post_id': row['post_id'],
+                'user_data': self.remote_data(users.get(row['user_id'])),
+                'post_data': self.remote_data(posts.get(row['post_id'])),
+                'text': row['text'],
+                'image_url': row['image_url'],
+                'is_updated': row['is_updated'],
+            }
+            for name in self.datetime_fields:
+                data[name] = self.format_datetime(row[name], tz) if row[name] is not None else None
+            result.append(data)
+        return result
\ No newline at end of file
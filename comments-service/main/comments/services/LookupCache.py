@@ -0,0 +1,156 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Загрузчик возвращает NOT_FOUND, если объекта нет (404) - такой ответ тоже кэшируется
+NOT_FOUND = object()
+
+
+class _Call:
+    """Загрузка одного ключа, которую ждут все одновременные промахи по нему"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+
+
+class LookupCache:
+    """Локальный кэш объектов из других сервисов.
+
+    - TTL и ограничение размера (вытесняются давно не использованные);
+    - отрицательное кэширование: "нет такого объекта" хранится negative_ttl секунд;
+    - склейка запросов: одновременные промахи по одному ключу ждут одну загрузку;
+    - ошибки загрузки (None) не кэшируются.
+    """
+
+    def __init__(self, maxsize=10000, ttl=60, negative_ttl=10):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stats_counters = {'hits': 0, 'negative_hits': 0, 'misses': 0, 'coalesced': 0, 'errors': 0}
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, loader):
+        """Объект по ключу; при промахе - loader(key). None, если объекта нет или сервис недоступен"""
+
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                return value
+
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+            else:
+                self.stats_counters['coalesced'] += 1
+
+        if not leader:
+            call.event.wait()
+            return call.result
+
+        value = None
+        try:
+            value = loader(key)
+        finally:
+            self._finish({key: value}, {key: call})
+
+        return None if value is NOT_FOUND else value
+
+    def get_many(self, keys, loader):
+        """Объекты по ключам: {ключ: объект}.
+
+        loader(ключи) -> {ключ: объект или NOT_FOUND}; ключи, которых нет в ответе,
+        считаются ошибкой загрузки и не кэшируются.
+        """
+
+        results = {}
+        waiting = {}
+        loading = {}
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                found, value = self._lookup(key)
+                if found:
+                    if value is not None:
+                        results[key] = value
+                elif key in self._inflight:
+                    self.stats_counters['coalesced'] += 1
+                    waiting[key] = self._inflight[key]
+                else:
+                    loading[key] = self._inflight[key] = _Call()
+
+        if loading:
+            values = {}
+            try:
+                values = loader(list(loading))
+            finally:
+                self._finish({key: values.get(key) for key in loading}, loading)
+            results.update(
+                (key, value) for key, value in values.items() if key in loading and value is not NOT_FOUND
+            )
+
+        for key, call in waiting.items():
+            call.event.wait()
+            if call.result is not None:
+                results[key] = call.result
+
+        return results
+
+    def _lookup(self, key):
+        """(найдено, значение) - вызывается под блокировкой"""
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                if value is NOT_FOUND:
+                    self.stats_counters['negative_hits'] += 1
+                    return True, None
+                self.stats_counters['hits'] += 1
+                return True, value
+            del self._entries[key]
+
+        self.stats_counters['misses'] += 1
+        return False, None
+
+    def _finish(self, values, calls):
+        """Кэширует загруженные значения и будит ждущих"""
+
+        now = time.monotonic()
+        with self._lock:
+            for key, value in values.items():
+                if value is None:
+                    self.stats_counters['errors'] += 1
+                else:
+                    ttl = self.negative_ttl if value is NOT_FOUND else self.ttl
+                    self._entries[key] = (value, now + ttl)
+                    self._entries.move_to_end(key)
+                self._inflight.pop(key, None)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+        for key, call in calls.items():
+            value = values.get(key)
+            call.result = None if value is NOT_FOUND else value
+            call.event.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.stats_counters)
+            size = len(self._entries)
+
+        lookups = counters['hits'] + counters['negative_hits'] + counters['misses']
+        return {
+            'size': size,
+            'maxsize': self.maxsize,
+            **counters,
+            'hit_ratio': round((counters['hits'] + counters['negative_hits']) / lookups, 4) if lookups else 0.0,
+        }
@@ -1,19 +1,56 @@
-import requests
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 from django.conf import settings
+from servicekit import ServiceClient, ServiceUnavailable
+
+from .LookupCache import LookupCache, NOT_FOUND
 
 logger = logging.getLogger(__name__)
 
+# У posts-service нет пакетного эндпоинта - посты запрашиваются параллельно
+POSTS_FETCH_WORKERS = 8
+
+posts_service = ServiceClient('posts', settings.POSTS_SERVICE_URL)
+
+posts_cache = LookupCache(
+    maxsize=getattr(settings, 'LOOKUP_CACHE_SIZE', 10000),
+    ttl=getattr(settings, 'LOOKUP_CACHE_TTL', 60),
+    negative_ttl=getattr(settings, 'LOOKUP_CACHE_NEGATIVE_TTL', 10)
+)
+
+
+def fetch_post(post_id):
+    """Данные поста, NOT_FOUND или None, если posts-service недоступен"""
+
+    try:
+        response = posts_service.get(f"/{post_id}/")
+        if response.status_code == 200:
+            return response.json()
+        if response.status_code == 404:
+            return NOT_FOUND
+    except (ServiceUnavailable, ValueError) as e:
+        logger.error(f"Failed to fetch post {post_id}: {e}")
+    return None
+
+
 class PostServiceClient:
     @staticmethod
     def get_post(post_id):
-        try:
-            response = requests.get(
-                f"{settings.POSTS_SERVICE_URL}/{post_id}/",
-                timeout=5
+        return posts_cache.get(post_id, fetch_post)
+
+    @staticmethod
+    def get_posts(post_ids):
+        """Несколько постов параллельными запросами: {id: данные}"""
+
+        post_ids = list(dict.fromkeys(post_ids))
+        if not post_ids:
+            return {}
+
+        # Каждому потоку - копия контекста запроса, чтобы дедлайн действовал и там
+        contexts = [copy_context() for _ in post_ids]
+        with ThreadPoolExecutor(max_workers=min(POSTS_FETCH_WORKERS, len(post_ids))) as executor:
+            results = executor.map(
+                lambda context, post_id: context.run(PostServiceClient.get_post, post_id), contexts, post_ids
             )
-            if response.status_code == 200:
-                return response.json()
-        except requests.RequestException as e:
-            logger.error(f"Failed to fetch post {post_id}: {e}")
-        return None
+            return {post_id: post for post_id, post in zip(post_ids, results) if post is not None}
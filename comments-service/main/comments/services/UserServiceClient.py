@@ -1,19 +1,64 @@
-import requests
 import logging
 from django.conf import settings
+from servicekit import ServiceClient, ServiceUnavailable
+
+from .LookupCache import LookupCache, NOT_FOUND
 
 logger = logging.getLogger(__name__)
 
-class UserServiceClient:
-    @staticmethod
-    def get_user(user_id):
+# Не больше, чем принимает users-service за один вызов
+USERS_BATCH_SIZE = 100
+
+users_service = ServiceClient('users', settings.USERS_SERVICE_URL)
+
+users_cache = LookupCache(
+    maxsize=getattr(settings, 'LOOKUP_CACHE_SIZE', 10000),
+    ttl=getattr(settings, 'LOOKUP_CACHE_TTL', 60),
+    negative_ttl=getattr(settings, 'LOOKUP_CACHE_NEGATIVE_TTL', 10)
+)
+
+
+def fetch_user(user_id):
+    """Данные пользователя, NOT_FOUND или None, если users-service недоступен"""
+
+    try:
+        response = users_service.get(f"/{user_id}/")
+        if response.status_code == 200:
+            return response.json()
+        if response.status_code == 404:
+            return NOT_FOUND
+    except (ServiceUnavailable, ValueError) as e:
+        logger.error(f"Failed to fetch user {user_id}: {e}")
+    return None
+
+
+def fetch_users(user_ids):
+    """Пакетная загрузка: {id: данные или NOT_FOUND}; id из неудавшихся запросов не попадают"""
+
+    users = {}
+    for start in range(0, len(user_ids), USERS_BATCH_SIZE):
+        chunk = user_ids[start:start + USERS_BATCH_SIZE]
         try:
-            response = requests.get(
-                f"{settings.USERS_SERVICE_URL}/{user_id}/",
-                timeout=5
+            response = users_service.get(
+                "/batch/",
+                params={'ids': ','.join(str(user_id) for user_id in chunk)}
             )
             if response.status_code == 200:
-                return response.json()
-        except requests.RequestException as e:
-            logger.error(f"Failed to fetch user {user_id}: {e}")
-        return None
+                data = response.json()
+                users.update((user['id'], user) for user in data['results'])
+                users.update((user_id, NOT_FOUND) for user_id in data.get('missing', []))
+        except (ServiceUnavailable, ValueError, KeyError) as e:
+            logger.error(f"Failed to fetch users {chunk}: {e}")
+    return users
+
+
+class UserServiceClient:
+    @staticmethod
+    def get_user(user_id):
+        return users_cache.get(user_id, fetch_user)
+
+    @staticmethod
+    def get_users(user_ids):
+        """Несколько пользователей: из кэша, остальные - одним запросом на каждые USERS_BATCH_SIZE id"""
+
+        return users_cache.get_many(user_ids, fetch_users)
@@ -0,0 +1,55 @@
+import os
+import sys
+import pytest
+import django
+
+# Настраиваем Django
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'main.test_settings')
+
+django.setup()
+
+# Теперь импортируем всё остальное
+from model_bakery import baker
+from servicekit import EventPublisher, FakeBroker
+from servicekit.events import set_publisher
+from ..models import Comment
+
+
+@pytest.fixture
+def comments(db):
+    """Фикстура: 50 комментариев трёх пользователей к двум постам"""
+
+    return [
+        baker.make(
+            Comment,
+            user_id=index % 3 + 1,
+            post_id=index % 2 + 10,
+            text=f'Comment {index}',
+            image_url='https://example.com/comment.jpg'
+        )
+        for index in range(50)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def clear_lookup_caches():
+    """Локальный кэш не переживает тест"""
+
+    from ..services.PostServiceClient import posts_cache
+    from ..services.UserServiceClient import users_cache
+
+    users_cache.clear()
+    posts_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def event_broker():
+    """События уходят в брокер в памяти"""
+
+    broker = FakeBroker()
+    publisher = EventPublisher(broker)
+    previous = set_publisher(publisher)
+    yield broker
+    set_publisher(previous)
+    publisher.close(timeout=1)
@@ -0,0 +1,108 @@
+import threading
+import time
+from unittest import mock
+
+from ..services.LookupCache import LookupCache, NOT_FOUND
+from ..services.UserServiceClient import UserServiceClient
+
+
+class TestLookupCache:
+    """Тесты для локального кэша удалённых объектов"""
+
+    def test_hit_and_expiry(self):
+        """Повторный запрос - из кэша, после TTL - снова из сервиса"""
+
+        cache = LookupCache(ttl=0.05)
+        loader = mock.Mock(side_effect=lambda key: {'id': key})
+
+        assert cache.get(1, loader) == {'id': 1}
+        assert cache.get(1, loader) == {'id': 1}
+        assert loader.call_count == 1
+
+        time.sleep(0.06)
+        cache.get(1, loader)
+        assert loader.call_count == 2
+        assert cache.stats()['hit_ratio'] == round(1 / 3, 4)
+
+    def test_negative_caching(self):
+        """"Не найден" кэшируется, ошибка - нет"""
+
+        cache = LookupCache()
+        missing = mock.Mock(return_value=NOT_FOUND)
+        failing = mock.Mock(return_value=None)
+
+        assert cache.get(1, missing) is None
+        assert cache.get(1, missing) is None
+        assert missing.call_count == 1
+
+        assert cache.get(2, failing) is None
+        assert cache.get(2, failing) is None
+        assert failing.call_count == 2
+        assert cache.stats()['negative_hits'] == 1
+
+    def test_lru_bound(self):
+        """Вытесняются давно не использованные"""
+
+        cache = LookupCache(maxsize=2)
+        loader = mock.Mock(side_effect=lambda key: key)
+
+        cache.get(1, loader)
+        cache.get(2, loader)
+        cache.get(1, loader)
+        cache.get(3, loader)
+        cache.get(1, loader)
+
+        assert cache.stats()['size'] == 2
+        assert loader.call_count == 3
+        cache.get(2, loader)
+        assert loader.call_count == 4
+
+    def test_concurrent_misses_coalesced(self):
+        """Одновременные промахи по ключу ждут одну загрузку"""
+
+        cache = LookupCache()
+        release = threading.Event()
+        loader = mock.Mock(side_effect=lambda key: release.wait() and {'id': key})
+        results = []
+
+        threads = [threading.Thread(target=lambda: results.append(cache.get(1, loader))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        while cache.stats()['coalesced'] < 4:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert loader.call_count == 1
+        assert results == [{'id': 1}] * 5
+
+    def test_get_many(self):
+        """Пакетная загрузка запрашивает только отсутствующие ключи"""
+
+        cache = LookupCache()
+        cache.get(1, lambda key: {'id': 1})
+        loader = mock.Mock(return_value={2: {'id': 2}, 3: NOT_FOUND})
+
+        assert cache.get_many([1, 2, 3, 4], loader) == {1: {'id': 1}, 2: {'id': 2}}
+        loader.assert_called_once_with([2, 3, 4])
+
+        loader = mock.Mock(return_value={})
+        assert cache.get_many([1, 2, 3, 4], loader) == {1: {'id': 1}, 2: {'id': 2}}
+        loader.assert_called_once_with([4])
+
+
+class TestUserServiceClientCache:
+    """Тесты для кэширования ответов users-service"""
+
+    def test_batch_missing_cached(self):
+        """Пользователи из missing не запрашиваются повторно"""
+
+        response = mock.Mock(status_code=200)
+        response.json.return_value = {'results': [{'id': 1}], 'missing': [2]}
+        with mock.patch('comments.services.UserServiceClient.users_service.get', return_value=response) as get:
+            assert UserServiceClient.get_users([1, 2]) == {1: {'id': 1}}
+            assert UserServiceClient.get_users([1, 2]) == {1: {'id': 1}}
+            assert UserServiceClient.get_user(2) is None
+
+        assert get.call_count == 1
@@ -0,0 +1,47 @@
+from unittest import mock
+
+from ..models import Comment
+from ..serializers import CommentSerializer
+
+
+class TestCommentListSerializer:
+    """Тесты для пакетной загрузки авторов и постов"""
+
+    def test_constant_number_of_upstream_calls(self, comments):
+        """Авторы - одним пакетным запросом, каждый пост - один раз"""
+
+        users = {user_id: {'id': user_id} for user_id in (1, 2, 3)}
+        with mock.patch('comments.services.UserServiceClient.UserServiceClient.get_users', return_value=users) as get_users, \
+                mock.patch('comments.services.UserServiceClient.UserServiceClient.get_user') as get_user, \
+                mock.patch('comments.services.PostServiceClient.PostServiceClient.get_post',
+                           side_effect=lambda post_id: {'id': post_id}) as get_post:
+            data = CommentSerializer(Comment.objects.all(), many=True).data
+
+        assert len(data) == 50
+        assert get_users.call_count == 1
+        assert get_user.call_count == 0
+        assert sorted(call.args[0] for call in get_post.call_args_list) == [10, 11]
+        assert all(item['user_data'] == {'id': item['user_id']} for item in data)
+        assert all(item['post_data'] == {'id': item['post_id']} for item in data)
+
+    def test_missing_remote_objects(self, comments):
+        """Недоступные пользователи и посты отдаются как None"""
+
+        with mock.patch('comments.services.UserServiceClient.UserServiceClient.get_users', return_value={}), \
+                mock.patch('comments.services.PostServiceClient.PostServiceClient.get_post', return_value=None):
+            data = CommentSerializer(Comment.objects.all()[:5], many=True).data
+
+        assert all(item['user_data'] is None and item['post_data'] is None for item in data)
+
+    def test_single_comment_fetches_directly(self, comments):
+        """Одиночный комментарий запрашивает данные напрямую"""
+
+        with mock.patch('comments.services.UserServiceClient.UserServiceClient.get_user',
+                        return_value={'id': 2}) as get_user, \
+                mock.patch('comments.services.PostServiceClient.PostServiceClient.get_post',
+                           return_value={'id': 11}):
+            data = CommentSerializer(comments[1]).data
+
+        get_user.assert_called_once_with(2)
+        assert data['user_data'] == {'id': 2}
+        assert data['post_data'] == {'id': 11}
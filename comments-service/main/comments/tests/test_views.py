@@ -0,0 +1,208 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.db import DatabaseError
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from model_bakery import baker
+from servicekit.events import get_publisher
+
+from ..models import Comment
+
+
+@pytest.fixture
+def client():
+    return Client()
+
+
+@pytest.fixture
+def remote_lookups():
+    """Пользователи и посты из других сервисов существуют"""
+
+    with mock.patch('comments.services.UserServiceClient.UserServiceClient.get_users',
+                    side_effect=lambda ids: {user_id: {'id': user_id} for user_id in ids}) as get_users, \
+            mock.patch('comments.services.PostServiceClient.PostServiceClient.get_post',
+                       side_effect=lambda post_id: {'id': post_id}):
+        yield get_users
+
+
+@pytest.fixture
+def thread(db):
+    """30 комментариев к посту 10, по два с одинаковым created_at, и один к посту 11"""
+
+    now = timezone.now()
+    comments = baker.make(Comment, user_id=1, post_id=10, image_url='https://example.com/1.jpg', _quantity=30)
+    for index, comment in enumerate(comments):
+        comment.created_at = now + timedelta(minutes=index // 2)
+    Comment.objects.bulk_update(comments, ['created_at'])
+    baker.make(Comment, user_id=2, post_id=11, image_url='https://example.com/2.jpg')
+    return comments
+
+
+def read_page(client, post_id, **params):
+    response = client.get(reverse('post-comments', kwargs={'post_id': post_id}), params)
+    assert response.status_code == 200
+    assert response.streaming
+    return json.loads(b''.join(response.streaming_content))
+
+
+class TestPostCommentsAPI:
+    """Тесты для комментариев к посту"""
+
+    def test_walk_all_pages(self, client, thread, remote_lookups):
+        """Обход всех страниц от старых к новым без пропусков и повторов"""
+
+        seen = []
+        params = {'page_size': 7}
+        while True:
+            page = read_page(client, 10, **params)
+            seen.extend(item['id'] for item in page['results'])
+            if not page['next']:
+                break
+            params['cursor'] = page['next']
+
+        expected = list(Comment.objects.filter(post_id=10).order_by('created_at', 'id').values_list('id', flat=True))
+        assert seen == expected
+
+    def test_streamed_in_chunks(self, client, thread, remote_lookups):
+        """Пачки строк сериализуются по отдельности, формат как у CommentSerializer"""
+
+        with mock.patch('comments.pagination.CommentKeysetPagination.chunk_size', 4):
+            page = read_page(client, 10, page_size=10)
+
+        assert len(page['results']) == 10
+        assert remote_lookups.call_count == 3
+        first = page['results'][0]
+        assert first['user_data'] == {'id': 1}
+        assert first['post_data'] == {'id': 10}
+        assert first['created_at'].endswith('Z')
+        assert set(first) == {
+            'id', 'user_id', 'post_id', 'user_data', 'post_data', 'text', 'image_url',
+            'is_updated', 'created_at', 'updated_at'
+        }
+
+    def test_empty_thread(self, client, db, remote_lookups):
+        """Пост без комментариев"""
+
+        assert read_page(client, 99) == {'results': [], 'next': None}
+
+    def test_invalid_cursor(self, client, thread):
+        """Некорректный курсор"""
+
+        response = client.get(reverse('post-comments', kwargs={'post_id': 10}), {'cursor': 'not-a-cursor'})
+
+        assert response.status_code == 404
+
+
+class TestCommentWriteAPI:
+    """Тесты для создания, редактирования и удаления"""
+
+    def test_create(self, client, db, django_capture_on_commit_callbacks, event_broker):
+        """Автор берётся из X-User-Id, пост проверяется в posts-service, для счётчика публикуется событие"""
+
+        with mock.patch('comments.services.PostServiceClient.PostServiceClient.get_post',
+                        return_value={'id': 10, 'author_id': 3}), \
+                mock.patch('comments.services.UserServiceClient.UserServiceClient.get_user', return_value={'id': 5}), \
+                django_capture_on_commit_callbacks(execute=True):
+            response = client.post(
+                reverse('comment-create'),
+                {'post_id': 10, 'user_id': 1, 'text': 'Hi', 'image_url': 'https://example.com/c.jpg'},
+                content_type='application/json',
+                HTTP_X_USER_ID='5'
+            )
+
+        assert response.status_code == 201
+        comment = Comment.objects.get()
+        assert (comment.user_id, comment.post_id, comment.is_updated) == (5, 10, False)
+        get_publisher().flush(timeout=1)
+        [event] = event_broker.messages('comments')
+        assert (event['type'], event['key']) == ('comment.created', '10')
+        assert (event['data']['post_id'], event['data']['created_at']) == (10, comment.created_at.isoformat())
+        assert event['data']['id'] == comment.pk and event['data']['user_id'] == 5
+        assert event['data']['post_author_id'] == 3
+
+    def test_create_for_missing_post(self, client, db):
+        """Комментарий к несуществующему посту"""
+
+        with mock.patch('comments.services.PostServiceClient.PostServiceClient.get_post', return_value=None):
+            response = client.post(
+                reverse('comment-create'),
+                {'post_id': 10, 'text': 'Hi', 'image_url': 'https://example.com/c.jpg'},
+                content_type='application/json',
+                HTTP_X_USER_ID='5'
+            )
+
+        assert response.status_code == 400
+        assert 'post_id' in response.json()
+
+    def test_create_unauthenticated(self, client, db):
+        """Без аутентификации"""
+
+        response = client.post(reverse('comment-create'), {}, content_type='application/json')
+
+        assert response.status_code in (401, 403)
+
+    def test_edit_own_only(self, client, thread):
+        """Редактировать можно только свой комментарий"""
+
+        url = reverse('comment-update', kwargs={'pk': thread[0].pk})
+
+        response = client.patch(url, {'text': 'Edited'}, content_type='application/json', HTTP_X_USER_ID='2')
+        assert response.status_code == 404
+
+        response = client.patch(url, {'text': 'Edited'}, content_type='application/json', HTTP_X_USER_ID='1')
+        assert response.status_code == 200
+        thread[0].refresh_from_db()
+        assert thread[0].text == 'Edited'
+        assert thread[0].is_updated
+
+    def test_delete_own_only(self, client, thread, django_capture_on_commit_callbacks, event_broker):
+        """Удалить можно только свой комментарий"""
+
+        url = reverse('comment-delete', kwargs={'pk': thread[0].pk})
+
+        with django_capture_on_commit_callbacks(execute=True):
+            assert client.delete(url, HTTP_X_USER_ID='2').status_code == 404
+            assert client.delete(url, HTTP_X_USER_ID='1').status_code == 200
+
+        assert not Comment.objects.filter(pk=thread[0].pk).exists()
+        get_publisher().flush(timeout=1)
+        [event] = event_broker.messages('comments')
+        assert (event['type'], event['data']['post_id']) == ('comment.deleted', 10)
+
+    def test_failed_delete_publishes_nothing(self, client, thread, django_capture_on_commit_callbacks):
+        """Если удаление не удалось, событие comment.deleted не публикуется"""
+
+        url = reverse('comment-delete', kwargs={'pk': thread[0].pk})
+
+        with django_capture_on_commit_callbacks() as callbacks, \
+                mock.patch.object(Comment, 'delete', side_effect=DatabaseError('delete failed')), \
+                pytest.raises(DatabaseError):
+            client.delete(url, HTTP_X_USER_ID='1')
+
+        assert callbacks == []
+        assert Comment.objects.filter(pk=thread[0].pk).exists()
+
+
+class TestPostCountsAPI:
+    """Тесты для счётчиков комментариев по постам"""
+
+    def test_counts(self, client, thread):
+        """Число комментариев и время последнего"""
+
+        response = client.get(reverse('post-counts'), {'ids': '10,11,12'})
+
+        assert response.status_code == 200
+        results = {row['post_id']: row for row in response.json()['results']}
+        assert set(results) == {10, 11}
+        assert results[10]['count'] == 30
+        last = max(comment.created_at for comment in thread)
+        assert results[10]['last_comment_at'] == last.isoformat().replace('+00:00', 'Z')
+
+    def test_invalid_ids(self, client, db):
+        """Некорректный список id"""
+
+        assert client.get(reverse('post-counts'), {'ids': '1,x'}).status_code == 400
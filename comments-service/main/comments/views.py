@@ -1,3 +1,136 @@
-from django.shortcuts import render
+import json
+from itertools import islice
 
-# Create your views here.
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Count, Max
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework import generics, permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from .authentication import HeaderJWTAuthentication
+from .events import emit_comment_event
+from .models import Comment
+from .pagination import CommentKeysetPagination
+from .serializers import CommentSerializer, CommentUpdateSerializer, CommentRowSerializer
+from .services.PostServiceClient import PostServiceClient, posts_cache
+from .services.UserServiceClient import users_cache
+
+# Столько постов posts-service сверяет за один запрос
+POST_COUNTS_MAX_IDS = 1000
+
+
+def stream_page(rows, paginator, serializer):
+    """JSON страницы по частям: каждая пачка строк сериализуется и сразу отправляется"""
+
+    yield '{"results": ['
+    separator = ''
+    while True:
+        chunk = list(islice(rows, paginator.chunk_size))
+        if not chunk:
+            break
+        for item in serializer.serialize(chunk):
+            yield separator + json.dumps(item, cls=DjangoJSONEncoder, ensure_ascii=False)
+            separator = ', '
+    # Курсор следующей страницы известен только после чтения всей страницы
+    yield '], "next": ' + json.dumps(paginator.next_cursor) + '}'
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def post_comments(request, post_id):
+    """Комментарии к посту от старых к новым"""
+
+    serializer = CommentRowSerializer()
+    paginator = CommentKeysetPagination()
+    rows = paginator.paginate_queryset(
+        Comment.objects.filter(post_id=post_id).values(*serializer.columns),
+        request
+    )
+    return StreamingHttpResponse(stream_page(rows, paginator, serializer), content_type='application/json')
+
+
+class CommentCreateView(generics.CreateAPIView):
+    """Создание комментария"""
+
+    authentication_classes = [HeaderJWTAuthentication]
+    serializer_class = CommentSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def perform_create(self, serializer):
+        comment = serializer.save(user_id=self.request.user.user_id)
+        # Автор поста нужен notifications-service; пост только что проверен и лежит в кэше
+        post = PostServiceClient.get_post(comment.post_id)
+        emit_comment_event('comment.created', comment, post_author_id=post.get('author_id') if post else None)
+
+
+class CommentUpdateView(generics.UpdateAPIView):
+    """Редактирование комментария"""
+
+    authentication_classes = [HeaderJWTAuthentication]
+    serializer_class = CommentUpdateSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return Comment.objects.filter(user_id=self.request.user.user_id)
+
+
+@api_view(['DELETE'])
+@permission_classes([permissions.IsAuthenticated])
+def delete_comment(request, pk):
+    """Удалить комментарий"""
+
+    try:
+        comment = Comment.objects.get(pk=pk, user_id=request.user.user_id)
+    except Comment.DoesNotExist:
+        return Response(
+            {'error': 'Комментарий не найден или у вас нет прав'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    # Событие уходит только после коммита удаления; если удаление упадёт, его не будет
+    with transaction.atomic():
+        emit_comment_event('comment.deleted', comment)
+        comment.delete()
+    return Response({'status': 'deleted', 'comment_id': pk}, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def health(request):
+    return Response({'status': 'up'}, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def post_counts(request):
+    """Число комментариев и время последнего по постам ?ids=1,2,3 - для сверки счётчиков posts-service"""
+
+    try:
+        post_ids = [int(value) for value in request.query_params.get('ids', '').split(',') if value]
+    except ValueError:
+        return Response({'error': 'Некорректный список id'}, status=status.HTTP_400_BAD_REQUEST)
+
+    if len(post_ids) > POST_COUNTS_MAX_IDS:
+        return Response(
+            {'error': f'Не больше {POST_COUNTS_MAX_IDS} id за запрос'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    rows = (
+        Comment.objects.filter(post_id__in=post_ids)
+        .order_by()
+        .values('post_id')
+        .annotate(count=Count('id'), last_comment_at=Max('created_at'))
+    )
+    return Response({'results': list(rows)})
+
+
+def lookup_cache_stats(request):
+    """Размер и попадания локального кэша пользователей и постов"""
+
+    return JsonResponse({
+        'users': users_cache.stats(),
+        'posts': posts_cache.stats(),
+    })
@@ -10,7 +10,11 @@ https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 import os
 
 from django.core.asgi import get_asgi_application
+from servicekit.warmup import warm_up
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'main.settings')
 
 application = get_asgi_application()
+
+# Прогрев до приёма запросов (WARMUP=0 - отключить)
+warm_up()
@@ -1,6 +1,8 @@
 import os
 from pathlib import Path
 
+from servicekit.db import connection_settings
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = 'django-insecure-0(1bdu-nzf+%5xp960pac28f^a1^fez)mmxfj54_#lfe7v8ct4'
@@ -20,6 +22,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'servicekit.DeadlineMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -56,6 +59,8 @@ DATABASES = {
         'PASSWORD': os.environ.get('POSTGRES_PASSWORD', 'password'),
         'HOST': os.environ.get('POSTGRES_HOST', 'comments-db'),
         'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+        # Постоянные соединения или пул - по DB_CONNECTION_MODE
+        **connection_settings(),
     }
 }
 
@@ -84,5 +89,38 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
-USERS_SERVICE_URL = 'http://users-service:8001'
-POSTS_SERVICE_URL = 'http://posts-service:8002'
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+USERS_SERVICE_URL = os.environ.get('USERS_SERVICE_URL', 'http://users-service:8001')
+POSTS_SERVICE_URL = os.environ.get('POSTS_SERVICE_URL', 'http://posts-service:8002')
+
+# Локальный кэш пользователей и постов из других сервисов
+LOOKUP_CACHE_SIZE = int(os.environ.get('LOOKUP_CACHE_SIZE', 10000))
+LOOKUP_CACHE_TTL = float(os.environ.get('LOOKUP_CACHE_TTL', 60))
+LOOKUP_CACHE_NEGATIVE_TTL = float(os.environ.get('LOOKUP_CACHE_NEGATIVE_TTL', 10))  # для "не найден"
+
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'comments.authentication.HeaderJWTAuthentication',
+    ],
+    'DEFAULT_PERMISSION_CLASSES': [
+        'rest_framework.permissions.AllowAny',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+    ]
+}
+
+APPEND_SLASH = False
+
+# Комментарии к посту: размер страницы и пачки, читаемой из серверного курсора
+COMMENTS_PAGE_SIZE = int(os.environ.get('COMMENTS_PAGE_SIZE', 50))
+COMMENTS_MAX_PAGE_SIZE = int(os.environ.get('COMMENTS_MAX_PAGE_SIZE', 10000))
+COMMENTS_STREAM_CHUNK_SIZE = int(os.environ.get('COMMENTS_STREAM_CHUNK_SIZE', 500))
+
+# Что прогревать до приёма запросов (servicekit.warmup)
+WARMUP_SERIALIZERS = [
+    'comments.serializers.CommentSerializer',
+    'comments.serializers.CommentUpdateSerializer',
+]
+WARMUP_PATHS = ['/health/']
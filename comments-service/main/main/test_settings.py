@@ -0,0 +1,58 @@
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+
+
+SECRET_KEY = 'test-secret-key-for-tests-only'
+
+DEBUG = False
+
+ALLOWED_HOSTS = []
+
+
+INSTALLED_APPS = [
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'comments.apps.CommentsConfig',
+]
+
+MIDDLEWARE = []
+
+ROOT_URLCONF = 'main.urls'
+
+WSGI_APPLICATION = 'main.wsgi.application'
+
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
+
+MIGRATION_MODULES = {
+    'comments': None,
+}
+
+LANGUAGE_CODE = 'en-us'
+TIME_ZONE = 'UTC'
+USE_I18N = True
+USE_TZ = True
+
+STATIC_URL = 'static/'
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+USERS_SERVICE_URL = 'http://users-service:8001'
+POSTS_SERVICE_URL = 'http://posts-service:8002'
+
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'comments.authentication.HeaderJWTAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+    ]
+}
+
+APPEND_SLASH = False
@@ -1,6 +1,26 @@
+from django.apps import apps
 from django.contrib import admin
 from django.urls import path
+from comments import views
+from servicekit.views import database_stats, event_stats, upstream_stats
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
+    path('health/', views.health, name='health'),
+    path('internal/upstreams/', upstream_stats, name='upstream-stats'),
+    path('internal/events/', event_stats, name='event-stats'),
+    path('internal/database/', database_stats, name='database-stats'),
+    path('internal/lookup-cache/', views.lookup_cache_stats, name='lookup-cache-stats'),
+    path('internal/post-counts/', views.post_counts, name='post-counts'),
+
+    # Комментарии к посту
+    path('post/<int:post_id>/', views.post_comments, name='post-comments'),
+
+    # Создание, редактирование и удаление комментария
+    path('create/', views.CommentCreateView.as_view(), name='comment-create'),
+    path('<int:pk>/edit/', views.CommentUpdateView.as_view(), name='comment-update'),
+    path('<int:pk>/delete/', views.delete_comment, name='comment-delete'),
 ]
+
+# В профиле только для API (main.api_settings) админки нет
+if apps.is_installed('django.contrib.admin'):
+    urlpatterns.insert(0, path('admin/', admin.site.urls))
@@ -0,0 +1,33 @@
+"""Общий код сервисов ImageBoard.
+
+http      - клиент для вызовов между сервисами (пул, ретраи, circuit breaker)
+breaker   - circuit breaker
+deadline  - бюджет времени запроса и его передача между сервисами
+events    - асинхронная публикация событий в Kafka
+views     - Django-view с метриками клиентов
+db        - постоянные соединения или пул для Postgres
+profiles  - профиль настроек только для API
+warmup    - прогрев воркера до приёма запросов
+migrate   - миграции при старте: пропуск, если всё применено, и advisory lock
+serve     - запуск сервиса под gunicorn (WSGI или ASGI) или runserver
+"""
+from .breaker import CircuitBreaker
+from .deadline import DeadlineMiddleware, deadline_scope, remaining_time
+from .events import EventPublisher, FakeBroker, KafkaBackend, publish
+from .http import SERVICE_TOKEN_HEADER, ServiceClient, ServiceUnavailable, CircuitOpen, DeadlineExceeded
+
+__all__ = [
+    'CircuitBreaker',
+    'DeadlineMiddleware',
+    'deadline_scope',
+    'remaining_time',
+    'EventPublisher',
+    'FakeBroker',
+    'KafkaBackend',
+    'publish',
+    'SERVICE_TOKEN_HEADER',
+    'ServiceClient',
+    'ServiceUnavailable',
+    'CircuitOpen',
+    'DeadlineExceeded',
+]
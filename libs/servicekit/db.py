@@ -0,0 +1,102 @@
+"""Режим соединений с Postgres для DATABASES.
+
+DB_CONNECTION_MODE:
+  persistent (по умолчанию) - соединение потока живёт DB_CONN_MAX_AGE секунд и
+                              проверяется перед повторным использованием;
+                              соединений не больше, чем воркеров * потоков
+  pool                      - пул psycopg 3 на процесс: DB_POOL_MIN_SIZE..DB_POOL_MAX_SIZE
+                              соединений, ожидание свободного не дольше DB_POOL_TIMEOUT
+  request                   - новое соединение на каждый запрос
+"""
+import os
+import threading
+
+from django.db.backends.signals import connection_created
+
+MODES = ('persistent', 'pool', 'request')
+
+_opened = {}  # алиас базы -> сколько соединений открыл процесс
+_opened_lock = threading.Lock()
+
+
+def connection_settings():
+    """Ключи DATABASES[...] для режима из DB_CONNECTION_MODE"""
+
+    mode = os.environ.get('DB_CONNECTION_MODE', 'persistent')
+    if mode == 'persistent':
+        return {
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+            'CONN_HEALTH_CHECKS': True,
+        }
+    if mode == 'pool':
+        # Django не разрешает CONN_MAX_AGE вместе с пулом - соединения возвращаются в пул после запроса
+        return {
+            'CONN_MAX_AGE': 0,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+                    'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+                    'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+                    'max_idle': float(os.environ.get('DB_POOL_MAX_IDLE', 300)),
+                    'max_lifetime': float(os.environ.get('DB_POOL_MAX_LIFETIME', 3600)),
+                },
+            },
+        }
+    if mode == 'request':
+        return {'CONN_MAX_AGE': 0}
+    raise ValueError(f"Unknown DB_CONNECTION_MODE: {mode}, expected one of {', '.join(MODES)}")
+
+
+def _count_connection(sender, connection, **kwargs):
+    with _opened_lock:
+        _opened[connection.alias] = _opened.get(connection.alias, 0) + 1
+
+
+connection_created.connect(_count_connection, dispatch_uid='servicekit.db.count_connection')
+
+
+def connections_stats():
+    """Режим, число открытых процессом соединений и, для пула, его заполнение и ожидание"""
+
+    from django.db import connections
+
+    stats = {}
+    for alias in connections:
+        connection = connections[alias]
+        settings_dict = connection.settings_dict
+        pool = getattr(connection, 'pool', None) if settings_dict.get('OPTIONS', {}).get('pool') else None
+
+        with _opened_lock:
+            opened = _opened.get(alias, 0)
+        entry = {
+            'mode': 'pool' if pool is not None else 'persistent' if settings_dict.get('CONN_MAX_AGE') else 'request',
+            'conn_max_age': settings_dict.get('CONN_MAX_AGE'),
+            'health_checks': settings_dict.get('CONN_HEALTH_CHECKS', False),
+            'connections_opened': opened,
+        }
+        if pool is not None:
+            entry['pool'] = pool_stats(pool.get_stats())
+        stats[alias] = entry
+    return stats
+
+
+def pool_stats(raw):
+    """Сводка по ConnectionPool.get_stats(): занятость и среднее ожидание соединения"""
+
+    size = raw.get('pool_size', 0)
+    in_use = size - raw.get('pool_available', 0)
+    queued = raw.get('requests_queued', 0)
+    return {
+        'min_size': raw.get('pool_min'),
+        'max_size': raw.get('pool_max'),
+        'size': size,
+        'in_use': in_use,
+        'utilisation': round(in_use / raw['pool_max'], 3) if raw.get('pool_max') else None,
+        'waiting': raw.get('requests_waiting', 0),
+        'requests': raw.get('requests_num', 0),
+        'queued': queued,
+        'avg_wait_ms': round(raw.get('requests_wait_ms', 0) / queued, 1) if queued else 0.0,
+        'timeouts': raw.get('requests_errors', 0),
+        'connections_opened': raw.get('connections_num', 0),
+        'connection_errors': raw.get('connections_errors', 0),
+    }
@@ -0,0 +1,56 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Заголовок с оставшимся бюджетом запроса в миллисекундах.
+# Передаётся относительным, чтобы не зависеть от расхождения часов между хостами
+DEADLINE_HEADER = 'X-Request-Timeout-Ms'
+
+_deadline = ContextVar('servicekit_deadline', default=None)
+
+
+def current_deadline():
+    """Момент (time.monotonic()), к которому запрос должен быть обработан, или None"""
+
+    return _deadline.get()
+
+
+def remaining_time():
+    """Сколько секунд осталось до дедлайна текущего запроса, или None"""
+
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+@contextmanager
+def deadline_scope(seconds):
+    """Ограничивает бюджет вложенных вызовов; более ранний внешний дедлайн сохраняется"""
+
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    if outer is not None:
+        deadline = min(deadline, outer)
+
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+class DeadlineMiddleware:
+    """Django middleware: берёт бюджет из заголовка входящего запроса"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            budget_ms = float(request.headers[DEADLINE_HEADER])
+        except (KeyError, ValueError):
+            return self.get_response(request)
+
+        with deadline_scope(max(budget_ms, 0) / 1000):
+            return self.get_response(request)
@@ -0,0 +1,307 @@
+"""Шина событий поверх Kafka.
+
+publish() кладёт событие в ограниченный буфер в памяти и сразу возвращается.
+Фоновый поток передаёт события продюсеру, а тот сам собирает их в пачки
+(linger_ms / batch_size) и сообщает о доставке колбэками. Если буфер полон
+(брокер не успевает или недоступен), publish() ждёт не дольше block_timeout
+и отбрасывает событие - запрос не зависает из-за брокера.
+
+Без KAFKA_BOOTSTRAP_SERVERS события попадают во встроенный FakeBroker и никуда
+не доставляются (ошибка в логе, fallback=True у публикатора) - relay_outbox
+в этом режиме не запускается.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    raise TypeError(f"{value.__class__.__name__} is not JSON serializable")
+
+
+def encode_event(event_type, key, data, event_id=None, timestamp=None):
+    """Компактное представление события: {"type", "key", "ts", "data"} и "id", если задан, без пробелов"""
+
+    event = {'type': event_type, 'key': key, 'ts': int((timestamp or time.time()) * 1000), 'data': data}
+    if event_id is not None:
+        event['id'] = event_id
+    return json.dumps(event, separators=(',', ':'), ensure_ascii=False, default=_json_default).encode('utf-8')
+
+
+class FakeBroker:
+    """Брокер в памяти процесса - для тестов и локального запуска без Kafka"""
+
+    def __init__(self, retention=10000):
+        self.retention = retention  # сколько последних сообщений хранить в каждом топике
+        self.failing = False  # True - все отправки завершаются ошибкой
+        self._topics = defaultdict(lambda: deque(maxlen=self.retention))
+        self._lock = threading.Lock()
+
+    def send(self, topic, key, value, on_success, on_error):
+        if self.failing:
+            on_error(ConnectionError('fake broker is failing'))
+            return
+
+        with self._lock:
+            self._topics[topic].append((key, value))
+        on_success()
+
+    def flush(self, timeout=None):
+        pass
+
+    def close(self, timeout=None):
+        pass
+
+    def messages(self, topic):
+        """Сообщения топика как dict в порядке отправки"""
+
+        with self._lock:
+            return [json.loads(value) for _, value in self._topics[topic]]
+
+    def clear(self):
+        with self._lock:
+            self._topics.clear()
+
+
+class KafkaBackend:
+    """Отправка через KafkaProducer (пакет kafka-python)"""
+
+    def __init__(self, bootstrap_servers, **producer_config):
+        self.bootstrap_servers = bootstrap_servers
+        self.producer_config = producer_config
+        self._producer = None
+
+    @property
+    def producer(self):
+        # Создаётся в потоке отправки при первом событии, а не при импорте:
+        # до fork воркеров и без ожидания брокера на старте сервиса
+        if self._producer is None:
+            from kafka import KafkaProducer
+
+            self._producer = KafkaProducer(bootstrap_servers=self.bootstrap_servers, **self.producer_config)
+        return self._producer
+
+    def send(self, topic, key, value, on_success, on_error):
+        future = self.producer.send(topic, key=key, value=value)
+        future.add_callback(lambda metadata: on_success())
+        future.add_errback(on_error)
+
+    def flush(self, timeout=None):
+        if self._producer is not None:
+            self._producer.flush(timeout)
+
+    def close(self, timeout=None):
+        if self._producer is not None:
+            self._producer.close(timeout)
+
+
+class EventPublisher:
+    """Асинхронная отправка событий с ограниченным буфером"""
+
+    def __init__(self, backend, buffer_size=10000, block_timeout=0.05, topic_prefix='', on_delivery=None,
+                 fallback=False):
+        self.backend = backend
+        self.fallback = fallback  # True - брокер в памяти вместо ненастроенной Kafka
+        self.block_timeout = block_timeout
+        self.topic_prefix = topic_prefix
+        self.on_delivery = on_delivery  # on_delivery(topic, value, error) после подтверждения или ошибки
+        self.counters = {'published': 0, 'delivered': 0, 'failed': 0, 'dropped': 0}
+        self._queue = queue.Queue(maxsize=buffer_size)
+        self._buffered = 0  # в буфере, ещё не переданы продюсеру
+        self._pending = 0  # приняты publish(), ещё нет ответа о доставке
+        self._cond = threading.Condition()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def publish(self, topic, event_type, key, data, event_id=None, timestamp=None, on_delivery=None):
+        """Ставит событие в очередь; False, если буфер полон и событие отброшено.
+
+        on_delivery(error) вызывается для этого события после подтверждения (error=None) или ошибки.
+        """
+
+        self._ensure_thread()
+        topic = f"{self.topic_prefix}{topic}"
+        key = str(key).encode('utf-8') if key is not None else None
+        value = encode_event(event_type, key and key.decode('utf-8'), data, event_id, timestamp)
+
+        with self._cond:
+            self._buffered += 1
+            self._pending += 1
+        try:
+            self._queue.put((topic, key, value, on_delivery), timeout=self.block_timeout)
+        except queue.Full:
+            with self._cond:
+                self._buffered -= 1
+                self._pending -= 1
+                self.counters['dropped'] += 1
+                self._cond.notify_all()
+            logger.warning(f"Event buffer is full, dropping {event_type} for key {key}")
+            return False
+
+        with self._cond:
+            self.counters['published'] += 1
+        return True
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='event-publisher', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+
+            topic, key, value, callback = item
+            try:
+                self.backend.send(
+                    topic, key, value,
+                    on_success=lambda topic=topic, value=value, callback=callback: self._delivered(
+                        topic, value, None, callback
+                    ),
+                    on_error=lambda error, topic=topic, value=value, callback=callback: self._delivered(
+                        topic, value, error, callback
+                    )
+                )
+            except Exception as e:
+                self._delivered(topic, value, e, callback)
+            finally:
+                with self._cond:
+                    self._buffered -= 1
+                    self._cond.notify_all()
+
+    def _delivered(self, topic, value, error, callback=None):
+        if error:
+            logger.error(f"Failed to deliver event to {topic}: {error}")
+        try:
+            if callback:
+                callback(error)
+            if self.on_delivery:
+                self.on_delivery(topic, value, error)
+        except Exception:
+            logger.exception('Event delivery callback failed')
+
+        # Счётчик ожидающих уменьшается после колбэков - flush() возвращается, когда они отработали
+        with self._cond:
+            self._pending -= 1
+            self.counters['failed' if error else 'delivered'] += 1
+            self._cond.notify_all()
+
+    def flush(self, timeout=5.0):
+        """Ждёт доставки всех принятых событий; True, если успели"""
+
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._cond.wait_for(lambda: self._buffered == 0, timeout)
+
+        self.backend.flush(max(deadline - time.monotonic(), 0))
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending == 0, max(deadline - time.monotonic(), 0))
+
+    def close(self, timeout=5.0):
+        self.flush(timeout)
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+        self.backend.close(timeout)
+
+    def stats(self):
+        with self._cond:
+            return {
+                **self.counters,
+                'buffered': self._buffered,
+                'pending': self._pending,
+                'buffer_size': self._queue.maxsize,
+                'fallback': self.fallback,
+            }
+
+
+_publisher = None
+_publisher_lock = threading.Lock()
+
+
+def parse_acks(value):
+    """EVENTS_ACKS: 0, 1 или all"""
+
+    return 'all' if value.strip().lower() == 'all' else int(value)
+
+
+def publisher_from_env():
+    """EventPublisher по переменным окружения KAFKA_* / EVENTS_*"""
+
+    servers = os.environ.get('KAFKA_BOOTSTRAP_SERVERS')
+    if servers:
+        backend = KafkaBackend(
+            servers.split(','),
+            linger_ms=int(os.environ.get('EVENTS_LINGER_MS', 20)),  # сколько ждать, собирая пачку
+            batch_size=int(os.environ.get('EVENTS_BATCH_SIZE', 64 * 1024)),  # размер пачки на партицию, байт
+            acks=parse_acks(os.environ.get('EVENTS_ACKS', '1')),
+            retries=int(os.environ.get('EVENTS_RETRIES', 3)),
+            max_block_ms=int(os.environ.get('EVENTS_MAX_BLOCK_MS', 5000)),
+            compression_type=os.environ.get('EVENTS_COMPRESSION') or None
+        )
+    else:
+        logger.error('KAFKA_BOOTSTRAP_SERVERS is not set, events are kept in memory and not delivered')
+        backend = FakeBroker()
+
+    return EventPublisher(
+        backend,
+        buffer_size=int(os.environ.get('EVENTS_BUFFER_SIZE', 10000)),
+        block_timeout=int(os.environ.get('EVENTS_BLOCK_MS', 50)) / 1000,
+        topic_prefix=os.environ.get('EVENTS_TOPIC_PREFIX', ''),
+        fallback=not servers
+    )
+
+
+def get_publisher():
+    global _publisher
+
+    if _publisher is None:
+        with _publisher_lock:
+            if _publisher is None:
+                _publisher = publisher_from_env()
+    return _publisher
+
+
+def set_publisher(publisher):
+    """Подменяет публикатор процесса (тесты); возвращает прежний"""
+
+    global _publisher
+
+    with _publisher_lock:
+        previous, _publisher = _publisher, publisher
+    return previous
+
+
+def publish(topic, event_type, key, data):
+    return get_publisher().publish(topic, event_type, key, data)
+
+
+def events_stats():
+    return get_publisher().stats() if _publisher is not None else None
+
+
+@atexit.register
+def _close_publisher():
+    if _publisher is not None:
+        _publisher.close(timeout=float(os.environ.get('EVENTS_CLOSE_TIMEOUT', 5)))
@@ -0,0 +1,33 @@
+"""Настройки gunicorn для сервисов; всё переопределяется переменными WEB_*"""
+import multiprocessing
+import os
+
+# Воркер - отдельный процесс со своим пулом потоков: процессы занимают все ядра,
+# потоки перекрывают ожидание БД и других сервисов
+workers = int(os.environ.get('WEB_WORKERS', multiprocessing.cpu_count()))
+worker_class = 'gthread'  # для SERVER_MODE=asgi заменяется воркером uvicorn
+threads = int(os.environ.get('WEB_THREADS', 4))
+
+# Воркер, не ответивший за timeout секунд, перезапускается; при остановке
+# и HUP воркерам даётся graceful_timeout секунд на текущие запросы
+timeout = int(os.environ.get('WEB_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('WEB_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('WEB_KEEPALIVE', 5))
+
+# Плановый перезапуск воркеров ограничивает рост памяти; jitter - чтобы не все сразу
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('WEB_MAX_REQUESTS_JITTER', 1000))
+
+# Приложение загружается в каждом воркере после fork: пулы соединений, потоки
+# публикации событий и кэши не разделяются между процессами. Кэши в памяти
+# (LocMemCache, LookupCache) у каждого воркера свои: сброс в одном не виден
+# в остальных, поэтому сроки жизни в них короткие. Общий кэш для всех
+# воркеров - Redis в POSTS_CACHE_URL / USERS_CACHE_URL
+preload_app = False
+
+# Файл heartbeat воркеров - в памяти, а не на диске контейнера
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+accesslog = os.environ.get('WEB_ACCESS_LOG', '-') or None
+errorlog = '-'
+loglevel = os.environ.get('WEB_LOG_LEVEL', 'info')
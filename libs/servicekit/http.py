@@ -0,0 +1,204 @@
+import logging
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .breaker import CircuitBreaker
+from .deadline import DEADLINE_HEADER, remaining_time
+
+logger = logging.getLogger(__name__)
+
+# Повторять можно только запросы, которые безопасно выполнить дважды
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+RETRY_STATUSES = {502, 503, 504}
+
+# Общий секрет сервисов (SERVICE_TOKEN): с ним служебные вызовы проходят без токена пользователя
+SERVICE_TOKEN_HEADER = 'X-Service-Token'
+
+# Все клиенты процесса - для метрик
+_clients = []
+_clients_lock = threading.Lock()
+
+
+class ServiceUnavailable(Exception):
+    """Сервис не ответил: ошибка сети или таймаут после всех попыток"""
+
+
+class CircuitOpen(ServiceUnavailable):
+    """Breaker открыт - запрос не отправлялся"""
+
+
+class DeadlineExceeded(ServiceUnavailable):
+    """Бюджет времени входящего запроса исчерпан"""
+
+
+class LatencyStats:
+    """Гистограмма задержек запросов"""
+
+    BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(self.BUCKETS_MS) + 1)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        ms = seconds * 1000
+        with self._lock:
+            self.count += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+            self.buckets[bisect_left(self.BUCKETS_MS, ms)] += 1
+
+    def snapshot(self):
+        with self._lock:
+            buckets = {f'le_{bound}': count for bound, count in zip(self.BUCKETS_MS, self.buckets)}
+            buckets['le_inf'] = self.buckets[-1]
+            return {
+                'count': self.count,
+                'avg': round(self.total_ms / self.count, 2) if self.count else 0.0,
+                'max': round(self.max_ms, 2),
+                'buckets': buckets,
+            }
+
+
+class ServiceClient:
+    """HTTP-клиент к одному сервису.
+
+    - пул keep-alive соединений, общий для всех потоков процесса;
+    - таймаут каждой попытки не больше оставшегося бюджета входящего запроса,
+      остаток бюджета передаётся дальше в заголовке X-Request-Timeout-Ms;
+    - повтор идемпотентных запросов при ошибках сети и 502/503/504
+      с экспоненциальной задержкой и случайным разбросом;
+    - circuit breaker: пока сервис лежит, запросы сразу падают с CircuitOpen;
+    - если задан service_token (по умолчанию SERVICE_TOKEN), он уходит в X-Service-Token.
+    """
+
+    def __init__(self, name, base_url, timeout=5.0, retries=2, backoff=0.05, backoff_max=1.0,
+                 pool_maxsize=32, failure_threshold=5, reset_timeout=30.0, service_token=None):
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.service_token = service_token if service_token is not None else os.environ.get('SERVICE_TOKEN', '')
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.breaker = CircuitBreaker(failure_threshold=failure_threshold, reset_timeout=reset_timeout)
+        self.latency = LatencyStats()
+        self.counters = {'requests': 0, 'failures': 0, 'retries': 0, 'rejected': 0}
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        with _clients_lock:
+            _clients.append(self)
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def request(self, method, path, **kwargs):
+        """Ответ сервиса (в том числе 4xx/5xx) или ServiceUnavailable"""
+
+        method = method.upper()
+        attempts = 1 + (self.retries if method in IDEMPOTENT_METHODS else 0)
+        url = f"{self.base_url}{path}"
+        headers = dict(kwargs.pop('headers', None) or {})
+        if self.service_token:
+            headers.setdefault(SERVICE_TOKEN_HEADER, self.service_token)
+
+        error = None
+        response = None
+        for attempt in range(attempts):
+            if attempt:
+                if not self._sleep_before_retry(attempt):
+                    break
+                self._count('retries')
+
+            # Таймаут - до breaker'а: в half-open allow_request() занимает единственную пробную попытку,
+            # и DeadlineExceeded после неё оставил бы breaker в half-open навсегда
+            timeout = self._attempt_timeout()
+            if not self.breaker.allow_request():
+                self._count('rejected')
+                raise CircuitOpen(f"{self.name}: circuit is open")
+            headers[DEADLINE_HEADER] = str(int(timeout * 1000))
+
+            self._count('requests')
+            started = time.monotonic()
+            try:
+                response = self.session.request(method, url, headers=headers, timeout=timeout, **kwargs)
+                error = None
+            except requests.RequestException as e:
+                response = None
+                error = e
+            finally:
+                self.latency.observe(time.monotonic() - started)
+
+            if response is not None and response.status_code < 500:
+                self.breaker.record_success()
+                return response
+
+            self._count('failures')
+            self.breaker.record_failure()
+            if response is not None and response.status_code not in RETRY_STATUSES:
+                break
+
+        if response is not None:
+            return response
+
+        logger.error(f"{self.name}: {method} {url} failed after {attempts} attempt(s): {error}")
+        raise ServiceUnavailable(f"{self.name}: {error}") from error
+
+    def _attempt_timeout(self):
+        remaining = remaining_time()
+        if remaining is None:
+            return self.timeout
+        if remaining <= 0:
+            raise DeadlineExceeded(f"{self.name}: request deadline exceeded")
+        return min(self.timeout, remaining)
+
+    def _sleep_before_retry(self, attempt):
+        """Пауза перед повтором ("full jitter"); False, если на неё не хватает бюджета"""
+
+        delay = random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+        remaining = remaining_time()
+        if remaining is not None and delay >= remaining:
+            return False
+        time.sleep(delay)
+        return True
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        return {
+            'name': self.name,
+            'base_url': self.base_url,
+            'circuit': self.breaker.state,
+            'circuit_opened': self.breaker.opened_count,
+            **counters,
+            'latency_ms': self.latency.snapshot(),
+        }
+
+
+def clients_stats():
+    """Метрики всех клиентов процесса"""
+
+    with _clients_lock:
+        clients = list(_clients)
+    return [client.stats() for client in clients]
@@ -0,0 +1,158 @@
+"""Миграции при старте контейнера без лишнего запуска Django.
+
+Запускается из каталога с manage.py вместо "python manage.py migrate":
+    python -m servicekit.migrate
+
+1. Список миграций на диске берётся из каталогов migrations/ приложений
+   INSTALLED_APPS (модуль настроек импортируется, Django не настраивается),
+   применённые - одним запросом к django_migrations через psycopg2.
+   Если всё применено - выход сразу.
+2. Иначе берётся advisory lock Postgres: при одновременном старте нескольких
+   реплик миграции применяет одна, остальные ждут её, перепроверяют и выходят.
+
+MIGRATE_MODE: auto (по умолчанию), always - всегда manage.py migrate, skip - ничего не делать.
+"""
+import importlib
+import importlib.util
+import logging
+import os
+import re
+import subprocess
+import sys
+import time
+import zlib
+from pathlib import Path
+
+logger = logging.getLogger('servicekit.migrate')
+
+MIGRATION_FILE = re.compile(r'^(?!__)\w+\.py$')
+
+
+def disk_migrations(installed_apps):
+    """{(приложение, миграция)} из файлов migrations/ приложений"""
+
+    migrations = set()
+    for entry in installed_apps:
+        package = entry.split('.apps.')[0] if '.apps.' in entry else entry
+        # Ищется только пакет верхнего уровня: импорт самих приложений потребовал бы настроенный Django
+        top, *rest = package.split('.')
+        spec = importlib.util.find_spec(top)
+        if spec is None or not spec.submodule_search_locations:
+            continue
+
+        label = package.rsplit('.', 1)[-1]
+        for location in spec.submodule_search_locations:
+            directory = Path(location).joinpath(*rest, 'migrations')
+            if not directory.is_dir():
+                continue
+            for path in directory.iterdir():
+                if MIGRATION_FILE.match(path.name):
+                    migrations.add((label, path.stem))
+    return migrations
+
+
+def applied_migrations(cursor):
+    """{(приложение, миграция)} из django_migrations; пусто, если таблицы ещё нет"""
+
+    cursor.execute("SELECT to_regclass('django_migrations') IS NOT NULL")
+    if not cursor.fetchone()[0]:
+        return set()
+    cursor.execute('SELECT app, name FROM django_migrations')
+    return set(cursor.fetchall())
+
+
+def lock_key(database):
+    """Ключ advisory lock - общий для всех реплик сервиса с этой базой"""
+
+    return zlib.crc32(f"servicekit.migrate:{database}".encode('utf-8'))
+
+
+def acquire_lock(cursor, key, timeout, poll_interval=0.5):
+    """pg_try_advisory_lock в цикле; False, если не удалось за timeout секунд"""
+
+    deadline = time.monotonic() + timeout
+    while True:
+        cursor.execute('SELECT pg_try_advisory_lock(%s)', [key])
+        if cursor.fetchone()[0]:
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(poll_interval)
+
+
+def run_migrate():
+    subprocess.run([sys.executable, 'manage.py', 'migrate', '--noinput'], check=True)
+
+
+def migrate_if_pending(cursor, expected, key, lock_timeout=300):
+    """Применяет миграции, если из expected применены не все; True, если migrate запускался"""
+
+    pending = expected - applied_migrations(cursor)
+    if not pending:
+        logger.info(f"All {len(expected)} migrations are applied, skipping migrate")
+        return False
+
+    logger.info(f"{len(pending)} pending migrations, waiting for the migration lock")
+    if not acquire_lock(cursor, key, lock_timeout):
+        raise TimeoutError(f"Migration lock was not acquired in {lock_timeout} s")
+    try:
+        # Пока ждали блокировку, миграции могла применить другая реплика
+        if not expected - applied_migrations(cursor):
+            logger.info('Migrations were applied by another replica')
+            return False
+        run_migrate()
+        return True
+    finally:
+        cursor.execute('SELECT pg_advisory_unlock(%s)', [key])
+
+
+def migrate(settings, lock_timeout=300):
+    """Проверка и применение миграций для базы default из модуля настроек"""
+
+    database = settings.DATABASES['default']
+    if 'postgresql' not in database['ENGINE']:
+        run_migrate()
+        return True
+
+    import psycopg2
+
+    expected = disk_migrations(settings.INSTALLED_APPS)
+    connection = psycopg2.connect(
+        dbname=database['NAME'],
+        user=database['USER'],
+        password=database['PASSWORD'],
+        host=database['HOST'],
+        port=database['PORT'],
+        connect_timeout=10
+    )
+    # advisory lock сессионный - без транзакции он живёт до unlock или закрытия соединения
+    connection.autocommit = True
+    try:
+        with connection.cursor() as cursor:
+            return migrate_if_pending(cursor, expected, lock_key(database['NAME']), lock_timeout)
+    finally:
+        connection.close()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    sys.path.insert(0, os.getcwd())
+
+    mode = os.environ.get('MIGRATE_MODE', 'auto')
+    if mode == 'skip':
+        logger.info('MIGRATE_MODE=skip, not applying migrations')
+        return
+    if mode == 'always':
+        run_migrate()
+        return
+    if mode != 'auto':
+        raise SystemExit(f"Unknown MIGRATE_MODE: {mode}, expected auto, always or skip")
+
+    settings = importlib.import_module(os.environ.get('DJANGO_SETTINGS_MODULE', 'main.settings'))
+    started = time.perf_counter()
+    migrate(settings, lock_timeout=float(os.environ.get('MIGRATE_LOCK_TIMEOUT', 300)))
+    logger.info(f"Migration step took {time.perf_counter() - started:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
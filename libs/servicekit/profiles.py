@@ -0,0 +1,29 @@
+"""Профиль настроек только для JSON API за gateway.
+
+Сервисы не отдают HTML и не работают с браузером напрямую: админка, сессии,
+сообщения, CSRF и clickjacking-защита только добавляют работу каждому запросу.
+auth и contenttypes остаются - на них опираются модели и DRF.
+"""
+
+BROWSER_APPS = {
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+}
+
+BROWSER_MIDDLEWARE = {
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+}
+
+
+def api_apps(installed_apps):
+    return [app for app in installed_apps if app not in BROWSER_APPS]
+
+
+def api_middleware(middleware):
+    return [name for name in middleware if name not in BROWSER_MIDDLEWARE]
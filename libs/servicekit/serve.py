@@ -0,0 +1,49 @@
+"""Запуск Django-сервиса: python -m servicekit.serve --port 8002
+
+Режим выбирается переменной SERVER_MODE:
+  wsgi (по умолчанию) - gunicorn: pre-fork воркеры с потоками, main.wsgi
+  asgi                - gunicorn с воркерами uvicorn, main.asgi
+  dev                 - manage.py runserver (один процесс, автоперезагрузка)
+
+Процесс заменяется сервером (exec), поэтому в контейнере сигналы получает сам gunicorn:
+HUP - плавный перезапуск воркеров с новым кодом, TERM - плавная остановка.
+Параметры gunicorn - в servicekit.gunicorn_conf.
+"""
+import argparse
+import os
+import sys
+
+MODES = ('wsgi', 'asgi', 'dev')
+
+
+def server_command(mode, port, project='main'):
+    """Команда запуска сервера в режиме mode"""
+
+    if mode == 'dev':
+        return [sys.executable, 'manage.py', 'runserver', f'0.0.0.0:{port}']
+    if mode not in MODES:
+        raise ValueError(f"Unknown SERVER_MODE: {mode}, expected one of {', '.join(MODES)}")
+
+    command = [
+        sys.executable, '-m', 'gunicorn', f'{project}.{mode}:application',
+        '--config', 'python:servicekit.gunicorn_conf',
+        '--bind', f'0.0.0.0:{port}',
+    ]
+    if mode == 'asgi':
+        command += ['--worker-class', 'uvicorn_worker.UvicornWorker']
+    return command
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Запуск Django-сервиса')
+    parser.add_argument('--port', type=int, required=True)
+    parser.add_argument('--mode', default=os.environ.get('SERVER_MODE', 'wsgi'), choices=MODES)
+    parser.add_argument('--project', default='main', help='Пакет с wsgi.py и asgi.py')
+    args = parser.parse_args()
+
+    command = server_command(args.mode, args.port, args.project)
+    os.execvp(command[0], command)
+
+
+if __name__ == '__main__':
+    main()
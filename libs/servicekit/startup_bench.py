@@ -0,0 +1,107 @@
+"""Время запуска воркера и первых запросов для разных профилей настроек.
+
+Запускается из каталога с manage.py:
+    python -m servicekit.startup_bench --settings main.settings main.api_settings --path /health/
+
+Каждый замер - в новом процессе интерпретатора, как у свежего воркера gunicorn:
+загрузка приложения из WSGI_APPLICATION (вместе с прогревом или без - WARMUP),
+затем первый и второй запрос на каждый путь прямо к WSGI-приложению.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from io import BytesIO
+
+
+def _call(application, path):
+    """Один GET к WSGI-приложению; (статус, мс)"""
+
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    status = []
+    started = time.perf_counter()
+    response = application(environ, lambda response_status, headers, exc_info=None: status.append(response_status))
+    try:
+        for _ in response:
+            pass
+    finally:
+        if hasattr(response, 'close'):
+            response.close()
+    return int(status[0].split()[0]), (time.perf_counter() - started) * 1000
+
+
+def measure(paths):
+    """Замер в текущем процессе (вызывается в дочернем процессе)"""
+
+    started = time.perf_counter()
+    from django.conf import settings
+    from django.utils.module_loading import import_string
+
+    # Импорт модуля wsgi выполняет и прогрев, если он там подключён
+    application = import_string(settings.WSGI_APPLICATION)
+    result = {'startup_ms': (time.perf_counter() - started) * 1000, 'requests': {}}
+
+    for path in paths:
+        status, first_ms = _call(application, path)
+        _, second_ms = _call(application, path)
+        result['requests'][path] = {'status': status, 'first_ms': first_ms, 'second_ms': second_ms}
+    return result
+
+
+def run_child(settings_module, paths, warmup):
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings_module, 'WARMUP': '1' if warmup else '0'}
+    output = subprocess.run(
+        [sys.executable, '-m', 'servicekit.startup_bench', '--child', '--path', *paths],
+        env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Время запуска воркера и первых запросов')
+    parser.add_argument('--settings', nargs='+', default=[os.environ.get('DJANGO_SETTINGS_MODULE', 'main.settings')])
+    parser.add_argument('--path', nargs='+', default=['/health/'])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.getcwd())
+    if args.child:
+        print(json.dumps(measure(args.path)))
+        return
+
+    print(f"{'settings':<24} {'warmup':<7} {'startup ms':>11} {'path':<24} {'status':>6} {'first ms':>9} {'second ms':>10}")
+    for settings_module in args.settings:
+        for warmup in (False, True):
+            runs = [run_child(settings_module, args.path, warmup) for _ in range(args.repeat)]
+            startup = statistics.median(run['startup_ms'] for run in runs)
+            for path in args.path:
+                first = statistics.median(run['requests'][path]['first_ms'] for run in runs)
+                second = statistics.median(run['requests'][path]['second_ms'] for run in runs)
+                status = runs[-1]['requests'][path]['status']
+                print(
+                    f"{settings_module:<24} {'on' if warmup else 'off':<7} {startup:>11.1f} "
+                    f"{path:<24} {status:>6} {first:>9.1f} {second:>10.1f}"
+                )
+
+
+if __name__ == '__main__':
+    main()
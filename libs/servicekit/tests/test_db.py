@@ -0,0 +1,39 @@
+import pytest
+
+from servicekit.db import connection_settings, pool_stats
+
+
+def test_persistent_mode_is_default(monkeypatch):
+    monkeypatch.delenv('DB_CONNECTION_MODE', raising=False)
+    monkeypatch.setenv('DB_CONN_MAX_AGE', '120')
+
+    assert connection_settings() == {'CONN_MAX_AGE': 120, 'CONN_HEALTH_CHECKS': True}
+
+
+def test_pool_mode(monkeypatch):
+    monkeypatch.setenv('DB_CONNECTION_MODE', 'pool')
+    monkeypatch.setenv('DB_POOL_MAX_SIZE', '4')
+
+    config = connection_settings()
+    assert config['CONN_MAX_AGE'] == 0
+    assert config['OPTIONS']['pool']['max_size'] == 4
+    assert config['OPTIONS']['pool']['min_size'] == 2
+
+
+def test_unknown_mode(monkeypatch):
+    monkeypatch.setenv('DB_CONNECTION_MODE', 'pgbouncer')
+
+    with pytest.raises(ValueError):
+        connection_settings()
+
+
+def test_pool_stats():
+    """Занятость и среднее ожидание по счётчикам psycopg_pool"""
+
+    stats = pool_stats({
+        'pool_min': 2, 'pool_max': 10, 'pool_size': 8, 'pool_available': 2,
+        'requests_num': 100, 'requests_queued': 4, 'requests_wait_ms': 30, 'requests_errors': 1,
+    })
+
+    assert (stats['in_use'], stats['utilisation'], stats['avg_wait_ms'], stats['timeouts']) == (6, 0.6, 7.5, 1)
+    assert pool_stats({'pool_max': 10})['avg_wait_ms'] == 0.0
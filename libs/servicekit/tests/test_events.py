@@ -0,0 +1,118 @@
+import json
+import threading
+
+from servicekit import EventPublisher, FakeBroker
+from servicekit.events import publish, publisher_from_env, set_publisher
+
+
+class BlockingBackend(FakeBroker):
+    """Брокер, который не принимает сообщения, пока его не отпустят"""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def send(self, topic, key, value, on_success, on_error):
+        self.release.wait()
+        super().send(topic, key, value, on_success, on_error)
+
+
+def test_events_delivered_in_order():
+    broker = FakeBroker()
+    publisher = EventPublisher(broker, topic_prefix='test.')
+
+    for post_id in range(5):
+        assert publisher.publish('posts', 'post.published', post_id, {'id': post_id})
+
+    assert publisher.flush(timeout=1)
+    messages = broker.messages('test.posts')
+    assert [message['data']['id'] for message in messages] == list(range(5))
+    assert messages[0]['type'] == 'post.published'
+    assert messages[0]['key'] == '0'
+    assert publisher.stats()['delivered'] == 5
+
+
+def test_compact_encoding():
+    broker = FakeBroker()
+    publisher = EventPublisher(broker)
+    publisher.publish('users', 'user.banned', 7, {'id': 7})
+    publisher.flush(timeout=1)
+
+    key, value = broker._topics['users'][0]
+    assert key == b'7'
+    assert b' ' not in value
+    assert set(json.loads(value)) == {'type', 'key', 'ts', 'data'}
+
+
+def test_full_buffer_drops_instead_of_blocking():
+    broker = BlockingBackend()
+    publisher = EventPublisher(broker, buffer_size=2, block_timeout=0.01)
+
+    results = [publisher.publish('posts', 'post.created', index, {}) for index in range(5)]
+
+    # Одно событие забрал поток отправки, два ждут в буфере
+    assert results.count(False) >= 2
+    assert publisher.stats()['dropped'] == results.count(False)
+
+    broker.release.set()
+    assert publisher.flush(timeout=1)
+    assert len(broker.messages('posts')) == results.count(True)
+
+
+def test_delivery_errors_reported():
+    broker = FakeBroker()
+    broker.failing = True
+    delivered = []
+    publisher = EventPublisher(broker, on_delivery=lambda topic, value, error: delivered.append(error))
+
+    publisher.publish('posts', 'post.created', 1, {})
+
+    assert publisher.flush(timeout=1)
+    assert publisher.stats()['failed'] == 1
+    assert isinstance(delivered[0], ConnectionError)
+
+
+def test_module_publish_uses_process_publisher():
+    broker = FakeBroker()
+    previous = set_publisher(EventPublisher(broker))
+    try:
+        assert publish('posts', 'post.closed', 1, {'id': 1})
+    finally:
+        publisher = set_publisher(previous)
+
+    publisher.flush(timeout=1)
+    assert broker.messages('posts')[0]['type'] == 'post.closed'
+
+
+def test_per_event_delivery_callback():
+    broker = FakeBroker()
+    publisher = EventPublisher(broker)
+    results = []
+
+    publisher.publish('posts', 'post.created', 1, {}, event_id=42, timestamp=1.5,
+                      on_delivery=lambda error: results.append(error))
+
+    assert publisher.flush(timeout=1)
+    assert results == [None]
+    message = broker.messages('posts')[0]
+    assert (message['id'], message['ts']) == (42, 1500)
+
+
+def test_publisher_from_env_without_kafka(monkeypatch, caplog):
+    """Без Kafka - брокер в памяти, ошибка в логе и fallback у публикатора"""
+
+    monkeypatch.delenv('KAFKA_BOOTSTRAP_SERVERS', raising=False)
+    publisher = publisher_from_env()
+
+    assert isinstance(publisher.backend, FakeBroker)
+    assert publisher.fallback and publisher.stats()['fallback']
+    assert 'KAFKA_BOOTSTRAP_SERVERS' in caplog.text
+
+
+def test_publisher_from_env_acks_all(monkeypatch):
+    monkeypatch.setenv('KAFKA_BOOTSTRAP_SERVERS', 'kafka:9092')
+    monkeypatch.setenv('EVENTS_ACKS', 'all')
+    publisher = publisher_from_env()
+
+    assert publisher.backend.producer_config['acks'] == 'all'
+    assert not publisher.fallback
@@ -0,0 +1,171 @@
+import time
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from servicekit import (
+    SERVICE_TOKEN_HEADER, CircuitBreaker, CircuitOpen, DeadlineExceeded, ServiceClient, ServiceUnavailable,
+    deadline_scope
+)
+from servicekit.deadline import DEADLINE_HEADER
+
+
+class FakeAdapter(BaseAdapter):
+    """Транспорт, отдающий заранее заданные статусы или исключения"""
+
+    def __init__(self, outcomes):
+        super().__init__()
+        self.outcomes = list(outcomes)
+        self.sent = []
+
+    def send(self, request, **kwargs):
+        self.sent.append((request, kwargs))
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        response = requests.Response()
+        response.status_code = outcome
+        response.request = request
+        response._content = b'{}'
+        return response
+
+    def close(self):
+        pass
+
+
+def make_client(outcomes, **kwargs):
+    client = ServiceClient('test', 'http://upstream', backoff=0.001, **kwargs)
+    adapter = FakeAdapter(outcomes)
+    client.session.mount('http://', adapter)
+    return client, adapter
+
+
+class TestServiceClient:
+    """Тесты для клиента между сервисами"""
+
+    def test_success(self):
+        client, adapter = make_client([200])
+
+        assert client.get('/users/1/').status_code == 200
+        assert adapter.sent[0][0].url == 'http://upstream/users/1/'
+        assert client.stats()['requests'] == 1
+
+    def test_service_token_header(self):
+        client, adapter = make_client([200, 200], service_token='secret')
+        client.get('/x/')
+        assert adapter.sent[0][0].headers[SERVICE_TOKEN_HEADER] == 'secret'
+
+        client, adapter = make_client([200], service_token='')
+        client.get('/x/')
+        assert SERVICE_TOKEN_HEADER not in adapter.sent[0][0].headers
+
+    def test_retries_idempotent_requests(self):
+        """GET повторяется при ошибке сети и 503"""
+
+        client, adapter = make_client([requests.ConnectionError('boom'), 503, 200], retries=2)
+
+        assert client.get('/x/').status_code == 200
+        assert len(adapter.sent) == 3
+        assert client.stats()['retries'] == 2
+
+    def test_post_is_not_retried(self):
+        client, adapter = make_client([requests.ConnectionError('boom'), 200], retries=2)
+
+        with pytest.raises(ServiceUnavailable):
+            client.post('/x/')
+        assert len(adapter.sent) == 1
+
+    def test_returns_last_5xx_response(self):
+        """После всех попыток возвращается последний ответ"""
+
+        client, adapter = make_client([502, 502], retries=1)
+
+        assert client.get('/x/').status_code == 502
+        assert client.stats()['failures'] == 2
+
+    def test_4xx_is_not_a_failure(self):
+        client, adapter = make_client([404] * 10, failure_threshold=2)
+
+        for _ in range(5):
+            assert client.get('/x/').status_code == 404
+        assert client.breaker.state == CircuitBreaker.CLOSED
+
+    def test_circuit_opens(self):
+        """После failure_threshold ошибок запросы не отправляются"""
+
+        client, adapter = make_client([requests.ConnectionError('boom')] * 2, retries=0, failure_threshold=2)
+
+        for _ in range(2):
+            with pytest.raises(ServiceUnavailable):
+                client.get('/x/')
+        with pytest.raises(CircuitOpen):
+            client.get('/x/')
+
+        assert len(adapter.sent) == 2
+        assert client.stats()['circuit'] == 'open'
+        assert client.stats()['rejected'] == 1
+
+    def test_deadline_limits_timeout_and_is_propagated(self):
+        client, adapter = make_client([200], timeout=5)
+
+        with deadline_scope(0.5):
+            client.get('/x/')
+
+        request, kwargs = adapter.sent[0]
+        assert kwargs['timeout'] <= 0.5
+        assert 0 < int(request.headers[DEADLINE_HEADER]) <= 500
+
+    def test_deadline_exceeded(self):
+        client, adapter = make_client([200])
+
+        with deadline_scope(0.01):
+            time.sleep(0.02)
+            with pytest.raises(DeadlineExceeded):
+                client.get('/x/')
+        assert adapter.sent == []
+
+    def test_deadline_exceeded_keeps_half_open_trial(self):
+        """Исчерпанный бюджет не занимает пробную попытку half-open breaker'а"""
+
+        client, adapter = make_client([requests.ConnectionError('boom'), 200], retries=0,
+                                      failure_threshold=1, reset_timeout=0.01)
+        with pytest.raises(ServiceUnavailable):
+            client.get('/x/')
+        time.sleep(0.02)
+        assert client.breaker.state == CircuitBreaker.HALF_OPEN
+
+        with deadline_scope(0.001):
+            time.sleep(0.01)
+            with pytest.raises(DeadlineExceeded):
+                client.get('/x/')
+
+        assert client.get('/x/').status_code == 200
+        assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+class TestCircuitBreaker:
+    """Тесты для circuit breaker"""
+
+    def test_half_open_allows_single_trial(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+        breaker.record_failure()
+        assert not breaker.allow_request()
+
+        time.sleep(0.02)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow_request()
+        assert not breaker.allow_request()
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_trial_reopens(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+        breaker.record_failure()
+        time.sleep(0.02)
+        assert breaker.allow_request()
+
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.opened_count == 2
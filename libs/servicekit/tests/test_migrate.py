@@ -0,0 +1,98 @@
+import pytest
+
+from servicekit import migrate as migrate_module
+from servicekit.migrate import disk_migrations, lock_key, migrate_if_pending
+
+
+class FakeCursor:
+    """Курсор с таблицей django_migrations и advisory lock, занятым первые busy попыток"""
+
+    def __init__(self, applied, busy=0, applied_while_waiting=()):
+        self.applied = set(applied)
+        self.busy = busy
+        self.applied_while_waiting = set(applied_while_waiting)
+        self.unlocked = []
+        self._result = None
+
+    def execute(self, sql, params=None):
+        if 'to_regclass' in sql:
+            self._result = [(bool(self.applied),)]
+        elif 'FROM django_migrations' in sql:
+            self._result = list(self.applied)
+        elif 'pg_try_advisory_lock' in sql:
+            acquired = self.busy == 0
+            if acquired:
+                self.applied |= self.applied_while_waiting
+            self.busy = max(self.busy - 1, 0)
+            self._result = [(acquired,)]
+        elif 'pg_advisory_unlock' in sql:
+            self.unlocked.append(params[0])
+            self._result = [(True,)]
+
+    def fetchone(self):
+        return self._result[0]
+
+    def fetchall(self):
+        return self._result
+
+
+@pytest.fixture
+def migrations_run(monkeypatch):
+    runs = []
+    monkeypatch.setattr(migrate_module, 'run_migrate', lambda: runs.append(True))
+    return runs
+
+
+@pytest.fixture
+def expected():
+    return {('posts', '0001_initial'), ('posts', '0002_index')}
+
+
+def test_disk_migrations(tmp_path, monkeypatch):
+    """Миграции ищутся в каталогах приложений без их импорта"""
+
+    migrations = tmp_path / 'blog' / 'migrations'
+    migrations.mkdir(parents=True)
+    for name in ('__init__.py', '0001_initial.py', '0002_index.py', 'README.md'):
+        (migrations / name).write_text('')
+    (tmp_path / 'blog' / '__init__.py').write_text('raise RuntimeError("не должен импортироваться")')
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    assert disk_migrations(['blog.apps.BlogConfig', 'missing_app']) == {
+        ('blog', '0001_initial'), ('blog', '0002_index'),
+    }
+
+
+def test_up_to_date_skips_migrate(expected, migrations_run):
+    cursor = FakeCursor(expected | {('auth', '0001_initial')})
+
+    assert migrate_if_pending(cursor, expected, lock_key('posts_db')) is False
+    assert not migrations_run and not cursor.unlocked
+
+
+def test_pending_runs_migrate_under_lock(expected, migrations_run, monkeypatch):
+    monkeypatch.setattr(migrate_module.time, 'sleep', lambda seconds: None)
+    cursor = FakeCursor({('posts', '0001_initial')}, busy=2)
+
+    assert migrate_if_pending(cursor, expected, 42) is True
+    assert migrations_run == [True]
+    assert cursor.unlocked == [42]
+
+
+def test_applied_by_another_replica(expected, migrations_run, monkeypatch):
+    """Пока реплика ждала блокировку, миграции применила другая"""
+
+    monkeypatch.setattr(migrate_module.time, 'sleep', lambda seconds: None)
+    cursor = FakeCursor({('posts', '0001_initial')}, busy=1, applied_while_waiting=expected)
+
+    assert migrate_if_pending(cursor, expected, 42) is False
+    assert not migrations_run
+    assert cursor.unlocked == [42]
+
+
+def test_lock_timeout(expected, migrations_run):
+    cursor = FakeCursor(set(), busy=10)
+
+    with pytest.raises(TimeoutError):
+        migrate_if_pending(cursor, expected, 42, lock_timeout=0)
+    assert not migrations_run
@@ -0,0 +1,27 @@
+from servicekit.profiles import api_apps, api_middleware
+
+
+def test_api_profile_drops_browser_stack():
+    """Админка, сессии, сообщения и CSRF убираются, остальной порядок сохраняется"""
+
+    apps = [
+        'django.contrib.admin', 'django.contrib.auth', 'django.contrib.contenttypes',
+        'django.contrib.sessions', 'django.contrib.messages', 'django.contrib.staticfiles', 'posts.apps.PostsConfig',
+    ]
+    middleware = [
+        'servicekit.DeadlineMiddleware',
+        'django.middleware.security.SecurityMiddleware',
+        'django.contrib.sessions.middleware.SessionMiddleware',
+        'django.middleware.common.CommonMiddleware',
+        'django.middleware.csrf.CsrfViewMiddleware',
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+        'django.contrib.messages.middleware.MessageMiddleware',
+        'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    ]
+
+    assert api_apps(apps) == ['django.contrib.auth', 'django.contrib.contenttypes', 'posts.apps.PostsConfig']
+    assert api_middleware(middleware) == [
+        'servicekit.DeadlineMiddleware',
+        'django.middleware.security.SecurityMiddleware',
+        'django.middleware.common.CommonMiddleware',
+    ]
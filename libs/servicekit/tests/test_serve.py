@@ -0,0 +1,30 @@
+import pytest
+
+from servicekit.serve import server_command
+
+
+@pytest.mark.parametrize('mode, application, worker_class', [
+    ('wsgi', 'main.wsgi:application', None),
+    ('asgi', 'main.asgi:application', 'uvicorn_worker.UvicornWorker'),
+])
+def test_gunicorn_modes(mode, application, worker_class):
+    """wsgi и asgi запускаются через gunicorn с общими настройками"""
+
+    command = server_command(mode, 8002)
+
+    assert command[1:4] == ['-m', 'gunicorn', application]
+    assert command[command.index('--bind') + 1] == '0.0.0.0:8002'
+    assert command[command.index('--config') + 1] == 'python:servicekit.gunicorn_conf'
+    if worker_class:
+        assert command[command.index('--worker-class') + 1] == worker_class
+    else:
+        assert '--worker-class' not in command
+
+
+def test_dev_mode():
+    assert server_command('dev', 8001)[1:] == ['manage.py', 'runserver', '0.0.0.0:8001']
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        server_command('uwsgi', 8001)
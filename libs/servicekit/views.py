@@ -0,0 +1,23 @@
+from django.http import JsonResponse
+
+from .db import connections_stats
+from .events import events_stats
+from .http import clients_stats
+
+
+def upstream_stats(request):
+    """Задержки, ошибки и состояние breaker'ов клиентов к другим сервисам"""
+
+    return JsonResponse({'upstreams': clients_stats()})
+
+
+def event_stats(request):
+    """Очередь и доставка событий публикатора процесса"""
+
+    return JsonResponse({'events': events_stats()})
+
+
+def database_stats(request):
+    """Режим соединений с базой, заполнение пула и ожидание соединения"""
+
+    return JsonResponse({'databases': connections_stats()})
@@ -0,0 +1,87 @@
+"""Прогрев воркера до приёма запросов.
+
+Вызывается из wsgi.py / asgi.py после создания приложения: gunicorn загружает
+приложение в каждом воркере после fork, поэтому прогрев проходит до того, как
+воркер начнёт принимать соединения. Ленивые затраты первого запроса переносятся
+на старт:
+  urls        - построение резолвера URL
+  serializers - разбор полей сериализаторов из settings.WARMUP_SERIALIZERS
+  validators  - валидаторы паролей (CommonPasswordValidator читает словарь паролей)
+  database    - проверка соединения; в режиме пула - открытие пула
+  requests    - запросы settings.WARMUP_PATHS через весь стек middleware
+
+Ошибка шага не мешает запуску - она только пишется в лог. WARMUP=0 отключает прогрев.
+"""
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def _warm_urls(settings):
+    from django.urls import get_resolver
+
+    # Словари резолвера строятся при первом обращении
+    get_resolver().reverse_dict
+
+
+def _warm_serializers(settings):
+    from django.utils.module_loading import import_string
+
+    for path in getattr(settings, 'WARMUP_SERIALIZERS', []):
+        import_string(path)().fields
+
+
+def _warm_validators(settings):
+    from django.contrib.auth.password_validation import get_default_password_validators
+
+    get_default_password_validators()
+
+
+def _warm_database(settings):
+    from django.db import connections
+
+    for alias in connections:
+        connection = connections[alias]
+        connection.ensure_connection()
+        # Соединение потока прогрева запросы не используют; пул при этом остаётся открытым
+        connection.close()
+
+
+def _warm_requests(settings):
+    from django.test import Client
+
+    client = Client(raise_request_exception=False)
+    for path in getattr(settings, 'WARMUP_PATHS', ['/health/']):
+        client.get(path)
+
+
+STEPS = [
+    ('urls', _warm_urls),
+    ('serializers', _warm_serializers),
+    ('validators', _warm_validators),
+    ('database', _warm_database),
+    ('requests', _warm_requests),
+]
+
+
+def warm_up():
+    """Выполняет шаги прогрева; время шагов в мс или None, если прогрев отключён"""
+
+    if os.environ.get('WARMUP', '1') == '0':
+        return None
+
+    from django.conf import settings
+
+    timings = {}
+    for name, step in STEPS:
+        started = time.perf_counter()
+        try:
+            step(settings)
+        except Exception as e:
+            logger.warning(f"Warm-up step {name} failed: {e}")
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    logger.info(f"Warm-up finished in {sum(timings.values()):.1f} ms: {timings}")
+    return timings
@@ -0,0 +1,77 @@
+from flask import Flask, request, jsonify
+import atexit
+import logging
+import os
+
+from consumer import consumer_from_env
+from pipeline import NotificationPipeline
+from sinks import sink_from_env
+
+logging.basicConfig(level=logging.INFO)
+
+app = Flask(__name__)
+
+PIPELINE = NotificationPipeline(
+    sink_from_env(),
+    window=float(os.environ.get('NOTIFICATIONS_WINDOW', 30)),  # сколько собирать комментарии в один дайджест, сек
+    max_items=int(os.environ.get('NOTIFICATIONS_MAX_ITEMS', 20)),
+    rate=float(os.environ.get('NOTIFICATIONS_RATE_PER_HOUR', 60)) / 3600,
+    burst=int(os.environ.get('NOTIFICATIONS_BURST', 5)),
+    max_pending=int(os.environ.get('NOTIFICATIONS_MAX_PENDING', 100000)),
+    queue_size=int(os.environ.get('NOTIFICATIONS_QUEUE_SIZE', 10000)),
+    workers=int(os.environ.get('NOTIFICATIONS_WORKERS', 2)),
+    max_attempts=int(os.environ.get('NOTIFICATIONS_MAX_ATTEMPTS', 3))
+)
+CONSUMER = None
+
+
+@app.route('/health/', methods=['GET'])
+def health():
+    if CONSUMER is not None and not CONSUMER.alive:
+        # Чтение из Kafka остановилось - новые комментарии не уведомляют
+        return jsonify({'status': 'unhealthy', 'service': 'notifications', 'error': 'Comment consumer is not running'}), 503
+    return jsonify({'status': 'healthy', 'service': 'notifications'})
+
+
+@app.route('/internal/events/', methods=['POST'])
+def ingest_events():
+    """Приём событий по HTTP - без Kafka"""
+
+    payload = request.get_json(silent=True)
+    events = payload if isinstance(payload, list) else [payload]
+    if not all(isinstance(event, dict) for event in events):
+        return jsonify({'error': 'Expected an event or a list of events'}), 400
+
+    accepted = sum(PIPELINE.submit(event) for event in events)
+    return jsonify({'accepted': accepted}), 202
+
+
+@app.route('/internal/metrics/', methods=['GET'])
+def metrics():
+    """Глубина очереди, задержка доставки и счётчики конвейера"""
+
+    return jsonify({
+        'pipeline': PIPELINE.stats(),
+        'consumer': CONSUMER.stats() if CONSUMER is not None else None,
+    })
+
+
+def start_background():
+    global CONSUMER
+
+    PIPELINE.start(tick_interval=float(os.environ.get('NOTIFICATIONS_TICK', 1)))
+    CONSUMER = consumer_from_env(PIPELINE)
+    if CONSUMER is not None:
+        CONSUMER.start()
+
+
+@atexit.register
+def _shutdown():
+    if CONSUMER is not None:
+        CONSUMER.stop()
+    PIPELINE.stop()
+
+
+if __name__ == '__main__':
+    start_background()
+    app.run(host='0.0.0.0', port=8005, threaded=True)
@@ -0,0 +1,110 @@
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class CommentEventConsumer:
+    """Читает события комментариев из Kafka и передаёт их конвейеру.
+
+    Смещения фиксируются после того, как пачка принята конвейером. Дайджесты,
+    ещё не доставленные к моменту падения процесса, теряются - это не больше
+    одного окна уведомлений.
+    """
+
+    def __init__(self, pipeline, bootstrap_servers, group_id='notifications-service', topic='comments',
+                 max_records=500):
+        self.pipeline = pipeline
+        self.bootstrap_servers = bootstrap_servers
+        self.group_id = group_id
+        self.topic = topic
+        self.max_records = max_records
+        self.counters = {'batches': 0, 'records': 0, 'decode_errors': 0, 'record_errors': 0}
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name='comment-consumer', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=10):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def run(self):
+        try:
+            self._consume()
+        except Exception as e:
+            # Поток завершается, но это видно в /health/ и в статистике
+            self.last_error = repr(e)
+            logger.exception('Comment consumer stopped')
+
+    def _consume(self):
+        from kafka import KafkaConsumer
+
+        consumer = KafkaConsumer(
+            self.topic,
+            bootstrap_servers=self.bootstrap_servers,
+            group_id=self.group_id,
+            enable_auto_commit=False,
+            auto_offset_reset='latest',  # уведомления о старых комментариях не нужны
+            max_poll_records=self.max_records
+        )
+        try:
+            while not self._stop.is_set():
+                batch = consumer.poll(timeout_ms=1000)
+                if not batch:
+                    continue
+
+                self.handle_batch(batch)
+                consumer.commit()
+        finally:
+            consumer.close(autocommit=False)
+
+    def handle_batch(self, batch):
+        """Передаёт конвейеру пачку из poll(); ошибочная запись считается и пропускается"""
+
+        for records in batch.values():
+            for record in records:
+                try:
+                    event = json.loads(record.value)
+                except ValueError:
+                    self.counters['decode_errors'] += 1
+                    continue
+
+                try:
+                    self.pipeline.submit(event)
+                except Exception as e:
+                    self.counters['record_errors'] += 1
+                    self.last_error = repr(e)
+                    logger.exception('Failed to submit a comment event')
+                    continue
+                self.counters['records'] += 1
+        self.counters['batches'] += 1
+
+    def stats(self):
+        return {**self.counters, 'alive': self.alive, 'last_error': self.last_error}
+
+
+def consumer_from_env(pipeline):
+    """CommentEventConsumer по переменным окружения; None, если Kafka не настроена"""
+
+    servers = os.environ.get('KAFKA_BOOTSTRAP_SERVERS')
+    if not servers:
+        return None
+
+    return CommentEventConsumer(
+        pipeline,
+        servers.split(','),
+        group_id=os.environ.get('NOTIFICATIONS_GROUP_ID', 'notifications-service'),
+        topic=f"{os.environ.get('EVENTS_TOPIC_PREFIX', '')}comments",
+        max_records=int(os.environ.get('NOTIFICATIONS_MAX_POLL_RECORDS', 500))
+    )
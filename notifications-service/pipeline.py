@@ -0,0 +1,309 @@
+"""Конвейер уведомлений авторам постов о новых комментариях.
+
+submit() -> дайджест получателя (окно window секунд, дубли отсеиваются)
+-> flush_due(): созревшие дайджесты, если лимит получателя позволяет,
+   уходят в ограниченную очередь доставки, иначе откладываются ещё на окно
+   и продолжают собирать комментарии -> воркеры доставляют их через sink.
+"""
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def _is_id(value):
+    """Идентификатор в событии - число или строка"""
+
+    return isinstance(value, (int, str)) and not isinstance(value, bool)
+
+
+class RecentKeys:
+    """Последние ключи событий - для отсева повторных доставок"""
+
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self._keys = OrderedDict()
+
+    def seen(self, key):
+        """True, если ключ уже встречался; иначе запоминает его"""
+
+        if key in self._keys:
+            return True
+        self._keys[key] = None
+        if len(self._keys) > self.maxsize:
+            self._keys.popitem(last=False)
+        return False
+
+
+class RateLimiter:
+    """Token bucket на каждого получателя: burst уведомлений сразу, дальше rate в секунду"""
+
+    def __init__(self, rate=1 / 60, burst=5):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}  # получатель -> (токены, время пополнения)
+
+    def allow(self, key, now):
+        tokens, updated = self._buckets.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            return False
+        self._buckets[key] = (tokens - 1, now)
+        return True
+
+    def prune(self, now):
+        """Забывает получателей с полным ведром - они неотличимы от новых"""
+
+        full = [
+            key for key, (tokens, updated) in self._buckets.items()
+            if tokens + (now - updated) * self.rate >= self.burst
+        ]
+        for key in full:
+            del self._buckets[key]
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class Digest:
+    """Комментарии для одного получателя, собранные за окно"""
+
+    def __init__(self, recipient_id, opened_at):
+        self.recipient_id = recipient_id
+        self.opened_at = opened_at  # с этого момента отсчитывается окно
+        self.first_at = opened_at  # первое событие - от него считается задержка доставки
+        self.count = 0
+        self.posts = {}  # пост -> число новых комментариев
+        self.comments = deque()  # последние комментарии
+
+    def add(self, data, max_items):
+        self.count += 1
+        self.posts[data['post_id']] = self.posts.get(data['post_id'], 0) + 1
+        self.comments.append({
+            'comment_id': data.get('id'),
+            'post_id': data['post_id'],
+            'user_id': data.get('user_id'),
+            'created_at': data.get('created_at'),
+        })
+        if len(self.comments) > max_items:
+            self.comments.popleft()
+
+    def payload(self):
+        return {
+            'recipient_id': self.recipient_id,
+            'type': 'comments',
+            'count': self.count,
+            'posts': [{'post_id': post_id, 'comments': count} for post_id, count in self.posts.items()],
+            'comments': list(self.comments),
+            'first_at': self.first_at,
+        }
+
+
+class NotificationPipeline:
+    """Дайджесты по получателям, лимиты и доставка пулом воркеров"""
+
+    def __init__(self, sink, window=30, max_items=20, rate=1 / 60, burst=5, max_pending=100000,
+                 queue_size=10000, workers=2, max_attempts=3, retry_backoff=0.5):
+        self.sink = sink
+        self.window = window
+        self.max_items = max_items  # сколько последних комментариев хранить в дайджесте
+        self.max_pending = max_pending  # сколько получателей может ждать окна одновременно
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.limiter = RateLimiter(rate, burst)
+        self.recent = RecentKeys()
+        self.counters = {
+            'received': 0, 'invalid': 0, 'skipped': 0, 'duplicates': 0, 'dropped': 0,
+            'digests': 0, 'deferred': 0, 'delivered': 0, 'failed': 0, 'retries': 0,
+        }
+        self.latencies = deque(maxlen=1000)  # от первого события дайджеста до доставки, сек
+        self._digests = OrderedDict()  # по возрастанию opened_at
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def submit(self, event, now=None):
+        """Принимает событие comment.created; False, если оно не приведёт к уведомлению"""
+
+        now = now or time.time()
+        data = (event.get('data') or {}) if isinstance(event, dict) else None
+
+        with self._lock:
+            self.counters['received'] += 1
+            # Идентификаторы становятся ключами словарей - событие другой формы отбрасывается
+            if not isinstance(data, dict) or not all(
+                data.get(key) is None or _is_id(data[key]) for key in ('id', 'post_id', 'post_author_id')
+            ):
+                self.counters['invalid'] += 1
+                return False
+
+            recipient_id = data.get('post_author_id')
+            # Свои комментарии и события без автора поста не уведомляют
+            if event.get('type') != 'comment.created' or recipient_id is None \
+                    or recipient_id == data.get('user_id') or data.get('post_id') is None:
+                self.counters['skipped'] += 1
+                return False
+
+            if data.get('id') is not None and self.recent.seen(data['id']):
+                self.counters['duplicates'] += 1
+                return False
+
+            digest = self._digests.get(recipient_id)
+            if digest is None:
+                if len(self._digests) >= self.max_pending:
+                    self.counters['dropped'] += 1
+                    return False
+                digest = self._digests[recipient_id] = Digest(recipient_id, now)
+            digest.add(data, self.max_items)
+            return True
+
+    def flush_due(self, now=None, force=False):
+        """Передаёт в доставку дайджесты, у которых закончилось окно; возвращает их число.
+
+        force - все дайджесты сразу, без окна и лимитов (ждёт места в очереди).
+        """
+
+        now = now or time.time()
+        ready = []
+        with self._lock:
+            for _ in range(len(self._digests)):
+                recipient_id, digest = next(iter(self._digests.items()))
+                if not force and digest.opened_at + self.window > now:
+                    break
+
+                if not force and not self.limiter.allow(recipient_id, now):
+                    # Лимит исчерпан - дайджест собирает комментарии ещё одно окно
+                    digest.opened_at = now
+                    self._digests.move_to_end(recipient_id)
+                    self.counters['deferred'] += 1
+                    continue
+
+                del self._digests[recipient_id]
+                ready.append(digest)
+            self.limiter.prune(now)
+
+        # Очередь заполняется вне блокировки - воркерам она нужна для счётчиков
+        for index, digest in enumerate(ready):
+            try:
+                self._queue.put(digest, block=force)
+            except queue.Full:
+                # Очередь доставки полна - остальные дайджесты ждут следующего прохода
+                self._requeue(ready[index:])
+                ready = ready[:index]
+                break
+
+        with self._lock:
+            self.counters['digests'] += len(ready)
+        return len(ready)
+
+    def _requeue(self, digests):
+        with self._lock:
+            for digest in reversed(digests):
+                current = self._digests.pop(digest.recipient_id, None)
+                if current is not None:
+                    # Пока дайджест ждал очереди, получатель успел набрать новый - объединяем
+                    digest.count += current.count
+                    for post_id, count in current.posts.items():
+                        digest.posts[post_id] = digest.posts.get(post_id, 0) + count
+                    digest.comments.extend(current.comments)
+                    while len(digest.comments) > self.max_items:
+                        digest.comments.popleft()
+                self._digests[digest.recipient_id] = digest
+                self._digests.move_to_end(digest.recipient_id, last=False)
+
+    def deliver(self, digest):
+        """Отправка дайджеста с повторами; True, если доставлен"""
+
+        payload = digest.payload()
+        for attempt in range(self.max_attempts):
+            if attempt:
+                with self._lock:
+                    self.counters['retries'] += 1
+                time.sleep(self.retry_backoff * 2 ** (attempt - 1))
+            try:
+                self.sink.send(payload)
+            except Exception as e:
+                logger.warning(f"Failed to deliver notification to {digest.recipient_id}: {e}")
+                continue
+
+            with self._lock:
+                self.counters['delivered'] += 1
+                self.latencies.append(time.time() - digest.first_at)
+            return True
+
+        with self._lock:
+            self.counters['failed'] += 1
+        return False
+
+    def _work(self):
+        while True:
+            digest = self._queue.get()
+            try:
+                if digest is _STOP:
+                    return
+                self.deliver(digest)
+            finally:
+                self._queue.task_done()
+
+    def _tick(self, interval):
+        while not self._stop.wait(interval):
+            self.flush_due()
+
+    def start(self, tick_interval=1.0):
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._work, name=f'notify-worker-{index}', daemon=True)
+            for index in range(self.workers)
+        ]
+        self._threads.append(threading.Thread(target=self._tick, args=(tick_interval,), name='notify-flush', daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def drain(self):
+        """Доставляет всё накопленное, не дожидаясь окон (остановка сервиса, тесты); нужен start()"""
+
+        self.flush_due(force=True)
+        self._queue.join()
+
+    def stop(self, timeout=10):
+        if not self._threads:
+            self.sink.close()
+            return
+
+        self._stop.set()
+        self.drain()
+        for _ in range(self.workers):
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self.sink.close()
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self.latencies)
+            counters = dict(self.counters)
+            pending = len(self._digests)
+            limited = len(self.limiter)
+
+        def percentile(q):
+            return round(latencies[min(int(len(latencies) * q), len(latencies) - 1)], 3) if latencies else None
+
+        return {
+            **counters,
+            'pending_recipients': pending,
+            'queue_depth': self._queue.qsize(),
+            'queue_size': self._queue.maxsize,
+            'rate_limited_recipients': limited,
+            'latency_p50': percentile(0.5),
+            'latency_p95': percentile(0.95),
+            'latency_max': round(latencies[-1], 3) if latencies else None,
+        }
@@ -0,0 +1,64 @@
+"""Куда доставляются уведомления. Sink - объект с методами send(notification) и close().
+
+send() вызывается из нескольких воркеров одновременно и сообщает об ошибке исключением -
+конвейер повторит отправку.
+"""
+import json
+import os
+import threading
+from collections import deque
+
+
+class MemorySink:
+    """Последние уведомления в памяти процесса - тесты и локальный запуск"""
+
+    def __init__(self, retention=10000):
+        self.failing = False  # True - все отправки завершаются ошибкой
+        self._notifications = deque(maxlen=retention)
+        self._lock = threading.Lock()
+
+    def send(self, notification):
+        if self.failing:
+            raise ConnectionError('memory sink is failing')
+        with self._lock:
+            self._notifications.append(notification)
+
+    def notifications(self, recipient_id=None):
+        with self._lock:
+            return [
+                notification for notification in self._notifications
+                if recipient_id is None or notification['recipient_id'] == recipient_id
+            ]
+
+    def close(self):
+        pass
+
+
+class FileSink:
+    """Уведомления в файл, по одному JSON в строке"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def send(self, notification):
+        line = json.dumps(notification, separators=(',', ':'), ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def sink_from_env():
+    """Sink по NOTIFICATIONS_SINK: memory (по умолчанию) или file:<путь>"""
+
+    spec = os.environ.get('NOTIFICATIONS_SINK', 'memory')
+    if spec.startswith('file:'):
+        return FileSink(spec[len('file:'):])
+    if spec == 'memory':
+        return MemorySink()
+    raise ValueError(f"Unknown notifications sink: {spec}")
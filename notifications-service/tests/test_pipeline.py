@@ -0,0 +1,193 @@
+import json
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from consumer import CommentEventConsumer
+from pipeline import NotificationPipeline, RateLimiter
+from sinks import FileSink, MemorySink
+
+NOW = 1_700_000_000
+
+
+def comment(comment_id, post_id=10, author_id=1, user_id=2):
+    return {
+        'type': 'comment.created',
+        'data': {'id': comment_id, 'post_id': post_id, 'user_id': user_id, 'post_author_id': author_id},
+    }
+
+
+@pytest.fixture
+def sink():
+    return MemorySink()
+
+
+@pytest.fixture
+def pipeline(sink):
+    pipeline = NotificationPipeline(sink, window=30, rate=1 / 60, burst=1, retry_backoff=0)
+    pipeline.start(tick_interval=60)
+    yield pipeline
+    pipeline.stop()
+
+
+class TestRateLimiter:
+    """Тесты для token bucket"""
+
+    def test_burst_then_rate(self):
+        limiter = RateLimiter(rate=1 / 60, burst=2)
+
+        assert limiter.allow(1, NOW) and limiter.allow(1, NOW)
+        assert not limiter.allow(1, NOW + 30)
+        assert limiter.allow(1, NOW + 60)
+        assert limiter.allow(2, NOW)
+
+        limiter.prune(NOW + 3600)
+        assert len(limiter) == 0
+
+
+class TestNotificationPipeline:
+    """Тесты для конвейера уведомлений"""
+
+    def test_burst_is_digested(self, pipeline, sink):
+        """Комментарии за окно - одно уведомление автору, дубли и свои комментарии не учитываются"""
+
+        for comment_id in range(5):
+            pipeline.submit(comment(comment_id, post_id=10 + comment_id % 2), now=NOW)
+        pipeline.submit(comment(0), now=NOW + 1)
+        pipeline.submit(comment(99, user_id=1), now=NOW + 1)
+
+        assert pipeline.flush_due(now=NOW + 29) == 0
+        assert pipeline.flush_due(now=NOW + 30) == 1
+        pipeline.drain()
+
+        [notification] = sink.notifications(recipient_id=1)
+        assert notification['count'] == 5
+        assert notification['posts'] == [{'post_id': 10, 'comments': 3}, {'post_id': 11, 'comments': 2}]
+        stats = pipeline.stats()
+        assert (stats['duplicates'], stats['skipped'], stats['delivered']) == (1, 1, 1)
+        assert stats['latency_p50'] is not None
+
+    def test_rate_limited_recipient_gets_bigger_digest(self, pipeline, sink):
+        """Сверх лимита дайджест откладывается и собирает следующие комментарии"""
+
+        pipeline.submit(comment(1), now=NOW)
+        pipeline.flush_due(now=NOW + 30)
+        pipeline.submit(comment(2), now=NOW + 31)
+        pipeline.flush_due(now=NOW + 61)  # лимит исчерпан - откладывается до NOW + 91
+        pipeline.submit(comment(3), now=NOW + 62)
+
+        assert pipeline.flush_due(now=NOW + 90) == 0
+        assert pipeline.flush_due(now=NOW + 91) == 1
+        pipeline.drain()
+
+        assert [n['count'] for n in sink.notifications(recipient_id=1)] == [1, 2]
+        assert pipeline.stats()['deferred'] == 1
+
+    def test_failed_delivery_is_retried(self, pipeline, sink):
+        sink.failing = True
+        pipeline.submit(comment(1), now=NOW)
+        pipeline.drain()
+
+        stats = pipeline.stats()
+        assert (stats['failed'], stats['retries']) == (1, 2)
+
+    def test_pending_limit(self, sink):
+        pipeline = NotificationPipeline(sink, max_pending=1)
+
+        assert pipeline.submit(comment(1, author_id=1), now=NOW)
+        assert not pipeline.submit(comment(2, author_id=3), now=NOW)
+        assert pipeline.stats()['dropped'] == 1
+
+    def test_malformed_events_are_invalid(self, sink):
+        """События другой формы отбрасываются и не мешают следующим"""
+
+        pipeline = NotificationPipeline(sink)
+        malformed = [
+            'comment.created',
+            {'type': 'comment.created', 'data': ['not', 'a', 'dict']},
+            {'type': 'comment.created', 'data': 'text'},
+            {**comment(1), 'data': {**comment(1)['data'], 'post_author_id': [1]}},
+            {**comment(2), 'data': {**comment(2)['data'], 'post_author_id': {'id': 1}}},
+            {**comment(3), 'data': {**comment(3)['data'], 'id': [3]}},
+            {**comment(4), 'data': {**comment(4)['data'], 'post_id': {'id': 10}}},
+        ]
+
+        assert not any(pipeline.submit(event, now=NOW) for event in malformed)
+        assert pipeline.submit(comment(5), now=NOW)
+        stats = pipeline.stats()
+        assert (stats['received'], stats['invalid'], stats['pending_recipients']) == (8, 7, 1)
+
+
+class TestConsumer:
+    """Тесты для чтения событий из Kafka"""
+
+    def test_failed_record_does_not_drop_batch(self):
+        pipeline = mock.Mock()
+        pipeline.submit.side_effect = [RuntimeError('boom'), True]
+        consumer = CommentEventConsumer(pipeline, [])
+        records = [SimpleNamespace(value=value) for value in (b'{', b'{"type": "x"}', b'{"type": "y"}')]
+
+        consumer.handle_batch({'comments': records})
+
+        stats = consumer.stats()
+        assert (stats['decode_errors'], stats['record_errors'], stats['records'], stats['batches']) == (1, 1, 1, 1)
+        assert 'boom' in stats['last_error']
+        assert pipeline.submit.call_args.args == ({'type': 'y'},)
+
+    def test_stopped_consumer_reports_error(self):
+        consumer = CommentEventConsumer(NotificationPipeline(MemorySink()), [])
+        with mock.patch.object(consumer, '_consume', side_effect=RuntimeError('no brokers')):
+            consumer.start()
+            consumer.stop()
+
+        stats = consumer.stats()
+        assert stats['alive'] is False
+        assert 'no brokers' in stats['last_error']
+
+    def test_health_reports_stopped_consumer(self, monkeypatch):
+        import app as notifications_app
+
+        monkeypatch.setattr(notifications_app, 'CONSUMER', CommentEventConsumer(notifications_app.PIPELINE, []))
+
+        response = notifications_app.app.test_client().get('/health/')
+        assert response.status_code == 503
+        assert response.get_json()['status'] == 'unhealthy'
+
+
+def test_file_sink(tmp_path):
+    path = tmp_path / 'notifications.jsonl'
+    sink = FileSink(path)
+    sink.send({'recipient_id': 1, 'count': 2})
+    sink.close()
+
+    assert json.loads(path.read_text()) == {'recipient_id': 1, 'count': 2}
+
+
+def test_ingest_and_metrics():
+    """События по HTTP и метрики конвейера"""
+
+    import app as notifications_app
+
+    client = notifications_app.app.test_client()
+    response = client.post('/internal/events/', json=[comment(1), comment(2, user_id=1)])
+    assert response.get_json() == {'accepted': 1}
+
+    metrics = client.get('/internal/metrics/').get_json()['pipeline']
+    assert (metrics['pending_recipients'], metrics['queue_depth']) == (1, 0)
+
+
+def test_ingest_malformed_events():
+    """Событие с данными не той формы не роняет приём по HTTP"""
+
+    import app as notifications_app
+
+    client = notifications_app.app.test_client()
+    bad_author = comment(102)
+    bad_author['data']['post_author_id'] = [1]
+    response = client.post('/internal/events/', json=[
+        {'type': 'comment.created', 'data': ['not', 'a', 'dict']}, bad_author, comment(101)
+    ])
+
+    assert response.status_code == 202
+    assert response.get_json() == {'accepted': 1}
@@ -0,0 +1,9 @@
+"""Профиль только для JSON API за gateway: DJANGO_SETTINGS_MODULE=main.api_settings"""
+from servicekit.profiles import api_apps, api_middleware
+
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE
+
+INSTALLED_APPS = api_apps(INSTALLED_APPS)
+MIDDLEWARE = api_middleware(MIDDLEWARE)
+TEMPLATES = []
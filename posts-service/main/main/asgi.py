@@ -1,7 +1,11 @@
 import os
 
 from django.core.asgi import get_asgi_application
+from servicekit.warmup import warm_up
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'main.settings')
 
 application = get_asgi_application()
+
+# Прогрев до приёма запросов (WARMUP=0 - отключить)
+warm_up()
@@ -1,6 +1,8 @@
 import os
 from pathlib import Path
 
+from servicekit.db import connection_settings
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = 'django-insecure-0(1bdu-nzf+%5xp960pac28f^a1^fez)mmxfj54_#lfe7v8ct4'
@@ -20,6 +22,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'servicekit.DeadlineMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -56,6 +59,8 @@ DATABASES = {
         'PASSWORD': os.environ.get('POSTGRES_PASSWORD', 'password'),
         'HOST': os.environ.get('POSTGRES_HOST', 'posts-db'),
         'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+        # Постоянные соединения или пул - по DB_CONNECTION_MODE
+        **connection_settings(),
     }
 }
 
@@ -97,3 +102,29 @@ REST_FRAMEWORK = {
 }
 
 APPEND_SLASH = False
+
+USERS_SERVICE_URL = os.environ.get('USERS_SERVICE_URL', 'http://users-service:8001')
+COMMENTS_SERVICE_URL = os.environ.get('COMMENTS_SERVICE_URL', 'http://comments-service:8003')
+
+# Кэш строк постов для просмотра деталей. По умолчанию свой у каждого процесса,
+# поэтому срок жизни короткий; для нескольких воркеров укажите общий Redis в POSTS_CACHE_URL
+if os.environ.get('POSTS_CACHE_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['POSTS_CACHE_URL'],
+        }
+    }
+
+POST_CACHE_TIMEOUT = int(os.environ.get('POST_CACHE_TIMEOUT', 30))
+
+# Пагинация ленты
+POSTS_PAGE_SIZE = int(os.environ.get('POSTS_PAGE_SIZE', 20))
+POSTS_MAX_PAGE_SIZE = int(os.environ.get('POSTS_MAX_PAGE_SIZE', 100))
+
+# Что прогревать до приёма запросов (servicekit.warmup)
+WARMUP_SERIALIZERS = [
+    'posts.serializers.PostSerializer',
+    'posts.serializers.PostUpdateSerializer',
+]
+WARMUP_PATHS = ['/health/']
@@ -45,4 +45,6 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
-DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
\ No newline at end of file
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+USERS_SERVICE_URL = 'http://users-service:8001'
+COMMENTS_SERVICE_URL = 'http://comments-service:8003'
@@ -1,8 +1,12 @@
 from django.urls import path
 from posts import views
+from servicekit.views import database_stats, event_stats, upstream_stats
 
 urlpatterns = [
     path('health/', views.health, name='health'),
+    path('internal/upstreams/', upstream_stats, name='upstream-stats'),
+    path('internal/events/', event_stats, name='event-stats'),
+    path('internal/database/', database_stats, name='database-stats'),
 
     # Просмотр постов
     path('', views.PostListView.as_view(), name='post-list'),
@@ -1,7 +1,11 @@
 import os
 
 from django.core.wsgi import get_wsgi_application
+from servicekit.warmup import warm_up
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'main.settings')
 
 application = get_wsgi_application()
+
+# Прогрев до приёма запросов (WARMUP=0 - отключить)
+warm_up()
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.cache import cache
+
+# Сколько секунд строка поста живёт в кэше
+POST_CACHE_TIMEOUT = getattr(settings, 'POST_CACHE_TIMEOUT', 30)
+
+
+def post_cache_key(pk):
+    return f'posts:post:{pk}'
+
+
+def get_cached_post(pk, loader):
+    """Строка поста из кэша; при промахе загружается через loader() и кэшируется"""
+
+    key = post_cache_key(pk)
+    row = cache.get(key)
+    if row is None:
+        row = loader()
+        if row is not None:
+            cache.set(key, row, POST_CACHE_TIMEOUT)
+    return row
+
+
+def invalidate_post(pk):
+    cache.delete(post_cache_key(pk))
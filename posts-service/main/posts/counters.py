@@ -0,0 +1,145 @@
+import json
+import logging
+from datetime import datetime, timezone
+
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .cache import invalidate_post
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+# Топик событий comments-service и их типы в терминах счётчиков
+COMMENTS_TOPIC = 'comments'
+COMMENT_EVENT_TYPES = {'comment.created': 'created', 'comment.deleted': 'deleted'}
+
+
+def parse_comment_events(events):
+    """Суммарные изменения по постам: {post_id: (изменение счётчика, время последнего нового комментария)}"""
+
+    changes = {}
+    for event in events:
+        post_id = int(event['post_id'])
+        delta, last_at = changes.get(post_id, (0, None))
+
+        if event['type'] == 'created':
+            delta += 1
+            created_at = event['created_at']
+            if isinstance(created_at, str):
+                created_at = datetime.fromisoformat(created_at)
+            last_at = created_at if last_at is None else max(last_at, created_at)
+        elif event['type'] == 'deleted':
+            delta -= 1
+        else:
+            raise ValueError(f"Unknown event type: {event['type']}")
+
+        changes[post_id] = (delta, last_at)
+    return changes
+
+
+def apply_comment_events(events):
+    """Применяет события комментариев одним UPDATE на пост.
+
+    Счётчик меняется через F(), без чтения строки - одновременные события
+    не теряются. Время последнего комментария при удалении не пересчитывается,
+    это делает сверка.
+    """
+
+    changes = parse_comment_events(events)
+    with transaction.atomic():
+        for post_id, (delta, last_at) in sorted(changes.items()):
+            fields = {'comments_count': Greatest(F('comments_count') + delta, Value(0))}
+            if last_at is not None:
+                fields['last_comment_at'] = Greatest(Coalesce(F('last_comment_at'), Value(last_at)), Value(last_at))
+            Post.objects.filter(pk=post_id).update(**fields)
+
+    for post_id in changes:
+        invalidate_post(post_id)
+    return len(changes)
+
+
+def parse_comment_message(value):
+    """Событие для счётчиков из сообщения топика comments; None - для чужих типов событий.
+
+    Время комментария берётся из данных события, без него - время публикации события.
+    """
+
+    message = json.loads(value)
+    event_type = COMMENT_EVENT_TYPES.get(message['type'])
+    if event_type is None:
+        return None
+
+    event = {'type': event_type, 'post_id': int(message['data']['post_id'])}
+    if event_type == 'created':
+        created_at = message['data'].get('created_at')
+        if created_at is None:
+            created_at = datetime.fromtimestamp(message['ts'] / 1000, tz=timezone.utc)
+        else:
+            created_at = datetime.fromisoformat(created_at)
+        if created_at.tzinfo is None:
+            raise ValueError(f"created_at without timezone: {created_at}")
+        event['created_at'] = created_at
+    return event
+
+
+def apply_comment_messages(values):
+    """Применяет пачку сообщений из топика comments; возвращает (обновлено постов, пропущено сообщений).
+
+    Нечитаемые сообщения пропускаются по одному, не роняя пачку; чужие типы событий
+    не считаются пропущенными. Доставка "хотя бы раз": повтор после сбоя может
+    сдвинуть счётчик, его исправит сверка.
+    """
+
+    events = []
+    skipped = 0
+    for value in values:
+        try:
+            event = parse_comment_message(value)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            skipped += 1
+            logger.error(f"Skipping malformed comment event: {e!r}")
+            continue
+        if event is not None:
+            events.append(event)
+
+    return (apply_comment_events(events) if events else 0), skipped
+
+
+def reconcile_comment_counts(counts_loader, batch_size=500):
+    """Сверяет счётчики всех постов с comments-service.
+
+    counts_loader(post_ids) -> {post_id: (count, last_comment_at)} или None, если сервис недоступен.
+    Строка перезаписывается, только если счётчик не изменился с момента чтения,
+    чтобы не затереть событие, пришедшее во время сверки. Возвращает (проверено, исправлено).
+    """
+
+    checked = fixed = 0
+    last_id = 0
+    while True:
+        rows = list(
+            Post.objects.filter(pk__gt=last_id).order_by('pk')
+            .values_list('pk', 'comments_count', 'last_comment_at')[:batch_size]
+        )
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        counts = counts_loader([pk for pk, _, _ in rows])
+        if counts is None:
+            continue
+
+        for pk, comments_count, last_comment_at in rows:
+            actual_count, actual_last_at = counts.get(pk, (0, None))
+            checked += 1
+            if (comments_count, last_comment_at) == (actual_count, actual_last_at):
+                continue
+            if Post.objects.filter(pk=pk, comments_count=comments_count).update(
+                comments_count=actual_count,
+                last_comment_at=actual_last_at
+            ):
+                invalidate_post(pk)
+                fixed += 1
+
+    return checked, fixed
@@ -0,0 +1,13 @@
+POSTS_TOPIC = 'posts'
+
+
+def post_event_data(post):
+    """Компактное содержимое события о посте"""
+
+    return {
+        'id': post.pk,
+        'author_id': post.author_id,
+        'status': post.status,
+        'title': post.title,
+        'updated_at': post.updated_at,
+    }
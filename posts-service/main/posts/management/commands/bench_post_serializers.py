@@ -0,0 +1,61 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts.models import Post
+from posts.serializers import PostSerializer, PostRowSerializer
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает скорость PostSerializer и PostRowSerializer на списке постов (строк в секунду)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--preview', type=int, default=None)
+
+    def handle(self, *args, **options):
+        rows_count = options['rows']
+        now = timezone.now()
+
+        # Строки строятся в памяти: сравниваем только сериализацию, без базы
+        rows = [
+            {
+                'id': index,
+                'title': f'Post {index}',
+                'content': 'Lorem ipsum dolor sit amet. ' * 40,
+                'image_url': f'https://example.com/{index}.jpg',
+                'author_id': index % 100,
+                'status': 'published',
+                'created_at': now,
+                'updated_at': now,
+                'comments_count': index % 50,
+                'last_comment_at': now,
+            }
+            for index in range(rows_count)
+        ]
+        posts = [Post(**row) for row in rows]
+
+        row_serializer = PostRowSerializer(preview_length=options['preview'])
+        results = {
+            'PostSerializer': self.measure(lambda: PostSerializer(posts, many=True).data, options['repeat']),
+            'PostRowSerializer': self.measure(lambda: row_serializer.serialize(rows), options['repeat']),
+        }
+
+        for name, seconds in results.items():
+            self.stdout.write(f"{name:<20} {rows_count / seconds:>12,.0f} rows/s")
+        speedup = results['PostSerializer'] / results['PostRowSerializer']
+        self.stdout.write(f"speedup: x{speedup:.1f}")
+
+    @staticmethod
+    def measure(func, repeat):
+        """Лучшее время из repeat запусков"""
+
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
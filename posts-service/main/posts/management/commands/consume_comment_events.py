@@ -0,0 +1,41 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.counters import COMMENTS_TOPIC, apply_comment_messages
+
+
+class Command(BaseCommand):
+    help = 'Обновляет счётчики комментариев постов по событиям comments-service из Kafka'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--group-id', default='posts-comment-counters')
+        parser.add_argument('--max-records', type=int, default=500, help='Сообщений за один опрос')
+
+    def handle(self, *args, **options):
+        servers = os.environ.get('KAFKA_BOOTSTRAP_SERVERS')
+        if not servers:
+            raise CommandError('Не задан KAFKA_BOOTSTRAP_SERVERS')
+
+        from kafka import KafkaConsumer
+
+        consumer = KafkaConsumer(
+            f"{os.environ.get('EVENTS_TOPIC_PREFIX', '')}{COMMENTS_TOPIC}",
+            bootstrap_servers=servers.split(','),
+            group_id=options['group_id'],
+            enable_auto_commit=False,
+            auto_offset_reset='earliest',
+            max_poll_records=options['max_records']
+        )
+        try:
+            while True:
+                batch = consumer.poll(timeout_ms=1000)
+                values = [record.value for records in batch.values() for record in records]
+                if not values:
+                    continue
+                # Смещения фиксируются после записи в базу: при ошибке пачка будет прочитана снова
+                updated, skipped = apply_comment_messages(values)
+                consumer.commit()
+                self.stdout.write(f"Событий: {len(values)}, пропущено: {skipped}, обновлено постов: {updated}")
+        finally:
+            consumer.close(autocommit=False)
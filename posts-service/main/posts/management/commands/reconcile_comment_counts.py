@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.counters import reconcile_comment_counts
+from posts.services import CommentServiceClient
+
+
+class Command(BaseCommand):
+    help = 'Сверяет comments_count и last_comment_at постов с comments-service'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--interval', type=float, default=None,
+            help='Повторять сверку каждые N секунд (для запуска фоновой задачей)'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            checked, fixed = reconcile_comment_counts(CommentServiceClient.get_counts, options['batch_size'])
+            self.stdout.write(
+                f"Проверено постов: {checked}, исправлено: {fixed} ({time.monotonic() - started:.1f} с)"
+            )
+
+            if options['interval'] is None:
+                break
+            time.sleep(options['interval'])
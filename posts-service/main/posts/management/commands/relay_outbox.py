@@ -0,0 +1,37 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from servicekit.events import get_publisher
+
+from posts.outbox import relay_outbox, purge_outbox
+
+
+class Command(BaseCommand):
+    help = 'Отправляет события из outbox постов в Kafka'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Пауза, когда outbox пуст, сек')
+        parser.add_argument('--timeout', type=float, default=10.0, help='Сколько ждать подтверждения пачки, сек')
+        parser.add_argument('--retention-hours', type=float, default=24, help='Сколько хранить отправленные события')
+        parser.add_argument('--once', action='store_true', help='Отправить то, что есть, и выйти')
+
+    def handle(self, *args, **options):
+        publisher = get_publisher()
+        if publisher.fallback:
+            # Иначе события пометятся отправленными, хотя ушли в брокер в памяти
+            raise CommandError('Не задан KAFKA_BOOTSTRAP_SERVERS: события outbox некуда отправлять')
+        retention = timedelta(hours=options['retention_hours'])
+
+        while True:
+            delivered, failed = relay_outbox(publisher, options['batch_size'], options['timeout'])
+            if delivered or failed:
+                self.stdout.write(f"Отправлено: {delivered}, ошибок: {failed}")
+
+            if delivered + failed < options['batch_size']:
+                purge_outbox(retention)
+                if options['once']:
+                    break
+                # Брокер недоступен или outbox пуст - не крутим цикл впустую
+                time.sleep(options['poll_interval'])
@@ -1,4 +1,9 @@
-from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.db.models import Q
+
+from .cache import invalidate_post
+from .events import POSTS_TOPIC, post_event_data
 
 
 class Post(models.Model):
@@ -18,10 +23,19 @@ class Post(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Счётчики комментариев из comments-service: обновляются событиями и сверяются командой reconcile_comment_counts
+    comments_count = models.PositiveIntegerField(default=0)
+    last_comment_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         db_table = 'posts'
         ordering = ['-created_at']
+        indexes = [
+            # Лента опубликованных постов с keyset-пагинацией
+            models.Index(fields=['status', '-created_at', '-id'], name='posts_status_created_id_idx'),
+            # Посты и черновики автора
+            models.Index(fields=['author_id', 'status', '-created_at', '-id'], name='posts_author_status_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.get_status_display()})"
@@ -31,7 +45,10 @@ class Post(models.Model):
 
         if self.status == 'draft':
             self.status = 'published'
-            self.save(update_fields=['status', 'updated_at'])
+            with transaction.atomic():
+                self.save(update_fields=['status', 'updated_at'])
+                self.emit('post.published')
+            invalidate_post(self.pk)
             return True
         return False
 
@@ -40,7 +57,10 @@ class Post(models.Model):
 
         if self.status == 'published':
             self.status = 'closed'
-            self.save(update_fields=['status', 'updated_at'])
+            with transaction.atomic():
+                self.save(update_fields=['status', 'updated_at'])
+                self.emit('post.closed')
+            invalidate_post(self.pk)
             return True
         return False
 
@@ -48,9 +68,48 @@ class Post(models.Model):
         """Мягкое удаление"""
 
         self.status = 'deleted'
-        self.save(update_fields=['status', 'updated_at'])
+        with transaction.atomic():
+            self.save(update_fields=['status', 'updated_at'])
+            self.emit('post.deleted')
+        invalidate_post(self.pk)
 
     def is_editable(self):
         """Можно ли редактировать пост"""
 
-        return self.status in ['draft', 'published']
\ No newline at end of file
+        return self.status in ['draft', 'published']
+
+    def emit(self, event_type):
+        """Событие о посте в outbox - вызывать в транзакции, изменившей пост"""
+
+        OutboxEvent.objects.create(
+            topic=POSTS_TOPIC,
+            event_type=event_type,
+            key=str(self.pk),
+            payload=post_event_data(self)
+        )
+
+
+class OutboxEvent(models.Model):
+    """Событие, ожидающее отправки в Kafka.
+
+    Пишется в одной транзакции с изменением поста, поэтому не теряется при падении
+    процесса и не ждёт брокер в запросе. Отправляет команда relay_outbox.
+    """
+
+    topic = models.CharField(max_length=100)
+    event_type = models.CharField(max_length=100)
+    key = models.CharField(max_length=100)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    published_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'posts_outbox'
+        indexes = [
+            # Выборка неотправленных событий по порядку
+            models.Index(fields=['id'], condition=Q(published_at__isnull=True), name='posts_outbox_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} {self.key} ({'отправлено' if self.published_at else 'ожидает'})"
\ No newline at end of file
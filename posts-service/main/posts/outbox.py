@@ -0,0 +1,60 @@
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboxEvent
+
+
+def relay_outbox(publisher, batch_size=100, timeout=10.0):
+    """Отправляет одну пачку событий из outbox; возвращает (доставлено, не доставлено).
+
+    Строки блокируются через SELECT ... FOR UPDATE SKIP LOCKED, поэтому несколько
+    relay-процессов разбирают разные пачки. Строка помечается отправленной только
+    после подтверждения брокера - доставка "хотя бы один раз": после падения между
+    отправкой и коммитом событие уйдёт повторно, получатели отсеивают дубли по id.
+    """
+
+    delivered = set()
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True)
+            .filter(published_at__isnull=True)
+            .order_by('id')[:batch_size]
+        )
+        if not events:
+            return 0, 0
+
+        for event in events:
+            publisher.publish(
+                event.topic,
+                event.event_type,
+                event.key,
+                event.payload,
+                event_id=event.pk,
+                timestamp=event.created_at.timestamp(),
+                on_delivery=lambda error, pk=event.pk: error is None and delivered.add(pk)
+            )
+        publisher.flush(timeout)
+
+        # Подтверждения, пришедшие после таймаута, не учитываем - такие события уйдут повторно
+        delivered = set(delivered)
+        failed = [event.pk for event in events if event.pk not in delivered]
+        if delivered:
+            OutboxEvent.objects.filter(pk__in=delivered).update(published_at=timezone.now())
+        if failed:
+            OutboxEvent.objects.filter(pk__in=failed).update(attempts=F('attempts') + 1)
+
+    return len(delivered), len(failed)
+
+
+def purge_outbox(older_than, batch_size=1000):
+    """Удаляет отправленные события старше older_than (timedelta); возвращает число удалённых"""
+
+    cutoff = timezone.now() - older_than
+    pks = list(
+        OutboxEvent.objects.filter(published_at__lt=cutoff).order_by('id').values_list('pk', flat=True)[:batch_size]
+    )
+    if not pks:
+        return 0
+    deleted, _ = OutboxEvent.objects.filter(pk__in=pks).delete()
+    return deleted
@@ -1,4 +1,7 @@
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
+from .cache import invalidate_post
 from .models import Post
 
 
@@ -9,6 +12,8 @@ class PostSerializer(serializers.ModelSerializer):
     status = serializers.CharField(read_only=True)
     created_at = serializers.DateTimeField(read_only=True)
     updated_at = serializers.DateTimeField(read_only=True)
+    comments_count = serializers.IntegerField(read_only=True)
+    last_comment_at = serializers.DateTimeField(read_only=True)
 
     class Meta:
         model = Post
@@ -20,7 +25,9 @@ class PostSerializer(serializers.ModelSerializer):
             'author_id',
             'status',
             'created_at',
-            'updated_at'
+            'updated_at',
+            'comments_count',
+            'last_comment_at'
         ]
 
     def validate_title(self, value):
@@ -48,7 +55,10 @@ class PostCreateSerializer(PostSerializer):
     def create(self, validated_data):
         request = self.context.get('request')
         validated_data['author_id'] = request.user.id
-        return Post.objects.create(**validated_data)
+        with transaction.atomic():
+            post = Post.objects.create(**validated_data)
+            post.emit('post.created')
+        return post
 
 
 class PostUpdateSerializer(serializers.ModelSerializer):
@@ -73,5 +83,55 @@ class PostUpdateSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.save()
+        with transaction.atomic():
+            instance.save()
+            instance.emit('post.updated')
+        invalidate_post(instance.pk)
         return instance
+
+
+class PostRowSerializer:
+    """Быстрый сериализатор для списков.
+
+    Работает со строками queryset.values() и собирает dict напрямую,
+    без создания моделей и полей DRF на каждую строку. Формат вывода
+    совпадает с PostSerializer.
+    """
+
+    datetime_fields = ('created_at', 'updated_at', 'last_comment_at')
+
+    def __init__(self, fields=None, preview_length=None):
+        self.fields = list(fields or PostSerializer.Meta.fields)
+        self.preview_length = preview_length  # обрезать content до стольких символов
+
+    @property
+    def columns(self):
+        """Колонки для .values(): запрошенные поля и всё, что нужно курсору"""
+
+        return list(dict.fromkeys(['id', 'created_at', *self.fields]))
+
+    @staticmethod
+    def format_datetime(value, tz):
+        value = value.astimezone(tz).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+
+    def to_representation(self, row, tz=None):
+        # Текущая зона ищется один раз на список, а не на каждое значение
+        tz = tz or timezone.get_current_timezone()
+        data = {name: row[name] for name in self.fields}
+
+        for name in self.datetime_fields:
+            if data.get(name) is not None:
+                data[name] = self.format_datetime(data[name], tz)
+
+        content = data.get('content')
+        if self.preview_length is not None and content and len(content) > self.preview_length:
+            data['content'] = content[:self.preview_length]
+
+        return data
+
+    def serialize(self, rows):
+        tz = timezone.get_current_timezone()
+        return [self.to_representation(row, tz) for row in rows]
@@ -1,19 +1,44 @@
-import requests
 import logging
+from datetime import datetime
 from django.conf import settings
+from servicekit import ServiceClient, ServiceUnavailable
 
 logger = logging.getLogger(__name__)
 
+users_service = ServiceClient('users', settings.USERS_SERVICE_URL)
+comments_service = ServiceClient('comments', settings.COMMENTS_SERVICE_URL)
+
 class UserServiceClient:
     @staticmethod
     def get_user(user_id):
         try:
-            response = requests.get(
-                f"{settings.USERS_SERVICE_URL}/api/users/{user_id}/",
-                timeout=5
-            )
+            response = users_service.get(f"/api/users/{user_id}/")
             if response.status_code == 200:
                 return response.json()
-        except requests.RequestException as e:
+        except (ServiceUnavailable, ValueError) as e:
             logger.error(f"Failed to fetch user {user_id}: {e}")
         return None
+
+
+class CommentServiceClient:
+    @staticmethod
+    def get_counts(post_ids):
+        """Число комментариев и время последнего: {post_id: (count, last_comment_at)} или None при ошибке"""
+
+        try:
+            response = comments_service.get(
+                "/internal/post-counts/",
+                params={'ids': ','.join(str(post_id) for post_id in post_ids)}
+            )
+            if response.status_code == 200:
+                return {
+                    row['post_id']: (
+                        row['count'],
+                        datetime.fromisoformat(row['last_comment_at']) if row['last_comment_at'] else None
+                    )
+                    for row in response.json()['results']
+                }
+            logger.error(f"Failed to fetch comment counts: HTTP {response.status_code}")
+        except (ServiceUnavailable, ValueError, KeyError) as e:
+            logger.error(f"Failed to fetch comment counts: {e}")
+        return None
@@ -10,11 +10,35 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'main.test_settings')
 django.setup()
 
 # Теперь импортируем всё остальное
+from django.core.cache import cache
 from model_bakery import baker
+from servicekit import EventPublisher, FakeBroker
+from servicekit.events import set_publisher
 from ..models import Post
 from rest_framework.test import APIClient
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Кэш постов не должен переживать тест"""
+
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def event_broker():
+    """События уходят в брокер в памяти"""
+
+    broker = FakeBroker()
+    publisher = EventPublisher(broker)
+    previous = set_publisher(publisher)
+    yield broker
+    set_publisher(previous)
+    publisher.close(timeout=1)
+
+
 @pytest.fixture
 def api_client():
     """Фикстура для API клиента"""
@@ -0,0 +1,143 @@
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from unittest import mock
+
+from ..counters import apply_comment_events, apply_comment_messages, reconcile_comment_counts
+from ..models import Post
+
+
+class TestApplyCommentEvents:
+    """Тесты для событий комментариев"""
+
+    def test_events_applied(self, published_post, draft_post):
+        """Счётчик растёт и уменьшается, время последнего комментария - максимум"""
+
+        now = timezone.now().replace(microsecond=0)
+        events = [
+            {'type': 'created', 'post_id': published_post.pk, 'created_at': (now - timedelta(minutes=1)).isoformat()},
+            {'type': 'created', 'post_id': published_post.pk, 'created_at': now.isoformat()},
+            {'type': 'created', 'post_id': published_post.pk, 'created_at': (now - timedelta(minutes=2)).isoformat()},
+            {'type': 'deleted', 'post_id': published_post.pk},
+            {'type': 'deleted', 'post_id': draft_post.pk},
+        ]
+
+        assert apply_comment_events(events) == 2
+        published_post.refresh_from_db()
+        draft_post.refresh_from_db()
+        assert published_post.comments_count == 2
+        assert published_post.last_comment_at == now
+        assert draft_post.comments_count == 0
+        assert draft_post.last_comment_at is None
+
+    def test_counts_in_feed(self, api_client, published_post):
+        """Счётчик попадает в ленту и в кэш деталей"""
+
+        url = reverse('post-detail', kwargs={'pk': published_post.pk})
+        assert api_client.get(url).data['comments_count'] == 0
+
+        message = {
+            'type': 'comment.created',
+            'data': {'id': 1, 'post_id': published_post.pk, 'created_at': timezone.now().isoformat()}
+        }
+        apply_comment_messages([json.dumps(message).encode()])
+
+        assert api_client.get(url).data['comments_count'] == 1
+        item = api_client.get(reverse('post-list')).data['results'][0]
+        assert item['comments_count'] == 1
+        assert item['last_comment_at'].endswith('Z')
+
+    def test_invalid_events(self, published_post):
+        """Некорректные события"""
+
+        with pytest.raises(ValueError):
+            apply_comment_events([{'type': 'edited', 'post_id': published_post.pk}])
+
+
+def test_comment_messages_from_bus(published_post):
+    """Сообщения топика comments; чужие типы и нечитаемые сообщения пропускаются"""
+
+    now = timezone.now().replace(microsecond=0)
+    messages = [
+        {'type': 'comment.created', 'data': {'id': 1, 'post_id': published_post.pk, 'created_at': now.isoformat()}},
+        {'type': 'comment.created', 'data': {'id': 2, 'post_id': published_post.pk, 'created_at': now.isoformat()}},
+        {'type': 'comment.deleted', 'data': {'id': 1, 'post_id': published_post.pk, 'created_at': now.isoformat()}},
+        {'type': 'comment.edited', 'data': {'id': 2, 'post_id': published_post.pk}},
+    ]
+    values = [json.dumps(message).encode() for message in messages] + [b'not json', b'{"type": "comment.created"}']
+
+    assert apply_comment_messages(values) == (1, 2)
+    published_post.refresh_from_db()
+    assert (published_post.comments_count, published_post.last_comment_at) == (1, now)
+
+
+def test_malformed_message_does_not_drop_batch(published_post):
+    """Сообщение без нужных полей пропускается, следующие за ним применяются"""
+
+    now = timezone.now().replace(microsecond=0)
+    malformed = [
+        {'type': 'comment.created', 'data': {'id': 1, 'post_id': published_post.pk}},
+        {'type': 'comment.created', 'data': {'id': 2, 'post_id': published_post.pk, 'created_at': 'yesterday'}},
+        {'type': 'comment.created', 'data': {'id': 3, 'post_id': published_post.pk, 'created_at': '2025-01-01T00:00:00'}},
+        {'type': 'comment.created', 'data': ['not', 'a', 'dict']},
+        {'type': 'comment.deleted', 'data': {'id': 4, 'post_id': 'abc'}},
+        {'type': ['comment.created'], 'data': {}},
+    ]
+    valid = {'type': 'comment.created', 'data': {'id': 5, 'post_id': published_post.pk, 'created_at': now.isoformat()}}
+    values = [json.dumps(message).encode() for message in malformed + [valid]]
+
+    assert apply_comment_messages(values) == (1, len(malformed))
+    published_post.refresh_from_db()
+    assert (published_post.comments_count, published_post.last_comment_at) == (1, now)
+
+
+def test_created_at_falls_back_to_event_time(published_post):
+    """Без created_at временем комментария считается время публикации события"""
+
+    now = timezone.now().replace(microsecond=0)
+    message = {'type': 'comment.created', 'ts': int(now.timestamp() * 1000), 'data': {'id': 1, 'post_id': published_post.pk}}
+
+    assert apply_comment_messages([json.dumps(message).encode()]) == (1, 0)
+    published_post.refresh_from_db()
+    assert (published_post.comments_count, published_post.last_comment_at) == (1, now)
+
+
+class TestReconcileCommentCounts:
+    """Тесты для сверки счётчиков"""
+
+    def test_fixes_drift(self, published_post, draft_post):
+        """Расхождения исправляются, посты без комментариев обнуляются"""
+
+        now = timezone.now()
+        Post.objects.filter(pk=draft_post.pk).update(comments_count=7, last_comment_at=now)
+        loader = mock.Mock(return_value={published_post.pk: (3, now)})
+
+        assert reconcile_comment_counts(loader, batch_size=1) == (2, 2)
+        assert loader.call_count == 2
+
+        published_post.refresh_from_db()
+        draft_post.refresh_from_db()
+        assert (published_post.comments_count, published_post.last_comment_at) == (3, now)
+        assert (draft_post.comments_count, draft_post.last_comment_at) == (0, None)
+
+    def test_service_unavailable(self, published_post):
+        """Если comments-service недоступен, счётчики не трогаются"""
+
+        Post.objects.filter(pk=published_post.pk).update(comments_count=5)
+
+        assert reconcile_comment_counts(lambda post_ids: None) == (0, 0)
+        published_post.refresh_from_db()
+        assert published_post.comments_count == 5
+
+    def test_command(self, published_post):
+        """Команда берёт счётчики из comments-service"""
+
+        with mock.patch('posts.services.CommentServiceClient.get_counts', return_value={published_post.pk: (4, None)}):
+            call_command('reconcile_comment_counts')
+
+        published_post.refresh_from_db()
+        assert published_post.comments_count == 4
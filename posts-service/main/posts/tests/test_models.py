@@ -1,5 +1,8 @@
 import pytest
-from ..models import Post
+from django.db import transaction
+from django.urls import reverse
+
+from ..models import OutboxEvent, Post
 
 
 class TestPostModel:
@@ -108,3 +111,44 @@ class TestPostModel:
 
         assert posts[0] == post2
         assert posts[1] == post1
+
+
+class TestPostEvents:
+    """Тесты для событий о постах"""
+
+    def test_status_changes_write_outbox(self, draft_post):
+        """Публикация, закрытие и удаление пишут события в outbox"""
+
+        draft_post.publish()
+        draft_post.close()
+        draft_post.close()  # не сработало - события нет
+        draft_post.soft_delete()
+
+        events = list(OutboxEvent.objects.order_by('id'))
+        assert [event.event_type for event in events] == ['post.published', 'post.closed', 'post.deleted']
+        assert all(event.key == str(draft_post.pk) and event.published_at is None for event in events)
+        assert events[0].payload['status'] == 'published'
+
+    def test_rolled_back_change_leaves_no_event(self, draft_post):
+        """Событие и изменение поста в одной транзакции"""
+
+        with pytest.raises(RuntimeError), transaction.atomic():
+            draft_post.publish()
+            raise RuntimeError
+
+        assert not OutboxEvent.objects.exists()
+
+    def test_create_and_update_write_outbox(self, db, api_client, post_data):
+        """Создание и редактирование через API пишут события"""
+
+        api_client.post(reverse('post-create'), post_data, format='json', HTTP_X_USER_ID='1')
+        api_client.patch(
+            reverse('post-update', kwargs={'pk': Post.objects.get().pk}),
+            {'title': 'Changed title'},
+            format='json',
+            HTTP_X_USER_ID='1'
+        )
+
+        events = list(OutboxEvent.objects.order_by('id'))
+        assert [event.event_type for event in events] == ['post.created', 'post.updated']
+        assert events[1].payload['title'] == 'Changed title'
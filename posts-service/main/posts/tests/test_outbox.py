@@ -0,0 +1,97 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+from servicekit import EventPublisher
+from servicekit.events import get_publisher, set_publisher
+
+from ..models import OutboxEvent
+from ..outbox import relay_outbox, purge_outbox
+
+
+class TestRelayOutbox:
+    """Тесты для отправки событий из outbox"""
+
+    def test_delivered_events_marked(self, draft_post, event_broker):
+        """Доставленные события помечаются, повторно не отправляются"""
+
+        draft_post.publish()
+        draft_post.close()
+
+        assert relay_outbox(get_publisher()) == (2, 0)
+        assert relay_outbox(get_publisher()) == (0, 0)
+
+        messages = event_broker.messages('posts')
+        events = list(OutboxEvent.objects.order_by('id'))
+        assert [message['type'] for message in messages] == ['post.published', 'post.closed']
+        assert [message['id'] for message in messages] == [event.pk for event in events]
+        assert all(event.published_at is not None for event in events)
+
+    def test_failed_events_retried(self, draft_post, event_broker):
+        """Недоставленные события остаются в outbox"""
+
+        draft_post.publish()
+        event_broker.failing = True
+
+        assert relay_outbox(get_publisher()) == (0, 1)
+        assert OutboxEvent.objects.get().attempts == 1
+
+        event_broker.failing = False
+        assert relay_outbox(get_publisher()) == (1, 0)
+        assert len(event_broker.messages('posts')) == 1
+
+    def test_batches(self, draft_post, event_broker):
+        """Пачка не больше batch_size"""
+
+        draft_post.publish()
+        draft_post.close()
+        draft_post.soft_delete()
+
+        assert relay_outbox(get_publisher(), batch_size=2) == (2, 0)
+        assert relay_outbox(get_publisher(), batch_size=2) == (1, 0)
+
+    def test_dropped_events_stay_pending(self, draft_post, event_broker):
+        """Если буфер публикатора переполнен, событие остаётся в outbox"""
+
+        draft_post.publish()
+        publisher = EventPublisher(event_broker, buffer_size=1, block_timeout=0)
+        publisher.publish = lambda *args, **kwargs: False
+
+        assert relay_outbox(publisher) == (0, 1)
+        assert OutboxEvent.objects.get().published_at is None
+
+    def test_purge(self, draft_post):
+        """Удаляются только старые отправленные события"""
+
+        draft_post.publish()
+        draft_post.close()
+        old, recent = OutboxEvent.objects.order_by('id')
+        OutboxEvent.objects.filter(pk=old.pk).update(published_at=timezone.now() - timedelta(days=2))
+
+        assert purge_outbox(timedelta(hours=24)) == 1
+        assert list(OutboxEvent.objects.values_list('pk', flat=True)) == [recent.pk]
+
+    def test_command_once(self, draft_post, event_broker):
+        """Команда отправляет всё и выходит"""
+
+        draft_post.publish()
+
+        call_command('relay_outbox', '--once')
+
+        assert OutboxEvent.objects.get().published_at is not None
+        assert event_broker.messages('posts')[0]['type'] == 'post.published'
+
+    def test_command_refuses_without_kafka(self, draft_post, monkeypatch):
+        """Без Kafka события не помечаются отправленными"""
+
+        monkeypatch.delenv('KAFKA_BOOTSTRAP_SERVERS', raising=False)
+        previous = set_publisher(None)
+        try:
+            draft_post.publish()
+            with pytest.raises(CommandError):
+                call_command('relay_outbox', '--once')
+        finally:
+            set_publisher(previous)
+
+        assert OutboxEvent.objects.get().published_at is None
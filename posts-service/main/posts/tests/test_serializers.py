@@ -0,0 +1,30 @@
+from ..serializers import PostSerializer, PostRowSerializer
+from ..models import Post
+
+
+class TestPostRowSerializer:
+    """Тесты для быстрого сериализатора списков"""
+
+    def test_same_output_as_post_serializer(self, published_post):
+        """Вывод совпадает с PostSerializer"""
+
+        serializer = PostRowSerializer()
+        row = Post.objects.values(*serializer.columns).get(pk=published_post.pk)
+
+        assert serializer.to_representation(row) == PostSerializer(published_post).data
+
+    def test_fields_projection(self, published_post):
+        """Только запрошенные поля"""
+
+        serializer = PostRowSerializer(fields=['title'])
+        row = Post.objects.values(*serializer.columns).get(pk=published_post.pk)
+
+        assert serializer.to_representation(row) == {'title': published_post.title}
+
+    def test_content_preview(self, published_post):
+        """Обрезка content до длины превью"""
+
+        serializer = PostRowSerializer(preview_length=9)
+        row = Post.objects.values(*serializer.columns).get(pk=published_post.pk)
+
+        assert serializer.to_representation(row)['content'] == 'Published'
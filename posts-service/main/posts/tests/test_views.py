@@ -0,0 +1,185 @@
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework import status
+
+from ..models import Post
+
+
+@pytest.fixture
+def feed_posts(db):
+    """30 опубликованных постов, по два с одинаковым created_at"""
+
+    now = timezone.now()
+    posts = baker.make(Post, author_id=1, status='published', _quantity=30)
+    for index, post in enumerate(posts):
+        post.created_at = now - timedelta(minutes=index // 2)
+    Post.objects.bulk_update(posts, ['created_at'])
+    return posts
+
+
+@pytest.fixture
+def author_client(api_client):
+    """Клиент автора с user_id=1"""
+
+    api_client.force_authenticate(user=SimpleNamespace(id=1, user_id=1, is_authenticated=True))
+    return api_client
+
+
+class TestPostListAPI:
+    """Тесты для ленты опубликованных постов"""
+
+    def test_first_page(self, api_client, feed_posts):
+        """Первая страница и курсор на следующую"""
+
+        response = api_client.get(reverse('post-list'), {'page_size': 10})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == 10
+        assert response.data['next'] is not None
+
+    def test_walk_all_pages(self, api_client, feed_posts, draft_post):
+        """Обход всех страниц без пропусков и повторов, черновики не попадают"""
+
+        seen = []
+        params = {'page_size': 7}
+        while True:
+            response = api_client.get(reverse('post-list'), params)
+            seen.extend(item['id'] for item in response.data['results'])
+            if not response.data['next']:
+                break
+            params['cursor'] = response.data['next']
+
+        expected = list(
+            Post.objects.filter(status='published').order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+        assert seen == expected
+        assert draft_post.id not in seen
+
+    def test_page_size_is_capped(self, api_client, feed_posts):
+        """Размер страницы не больше максимального"""
+
+        response = api_client.get(reverse('post-list'), {'page_size': 100000})
+
+        assert len(response.data['results']) == 30
+        assert response.data['next'] is None
+
+    def test_invalid_cursor(self, api_client, feed_posts):
+        """Некорректный курсор"""
+
+        response = api_client.get(reverse('post-list'), {'cursor': 'not-a-cursor'})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestMyPostsAPI:
+    """Тесты для постов и черновиков автора"""
+
+    def test_my_posts_paginated(self, author_client, feed_posts, draft_post, other_user_post):
+        """Все посты автора постранично, чужие не попадают"""
+
+        response = author_client.get(reverse('my-posts'), {'page_size': 25})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == 25
+        assert response.data['next'] is not None
+        assert 'private' in response['Cache-Control']
+        ids = {item['id'] for item in response.data['results']}
+
+        response = author_client.get(reverse('my-posts'), {'page_size': 25, 'cursor': response.data['next']})
+
+        assert len(response.data['results']) == 6
+        ids |= {item['id'] for item in response.data['results']}
+        assert len(ids) == 31
+        assert draft_post.id in ids
+        assert other_user_post.id not in ids
+        assert response.data['next'] is None
+
+    def test_my_drafts(self, author_client, feed_posts, draft_post):
+        """Только черновики автора"""
+
+        response = author_client.get(reverse('my-drafts'))
+
+        assert [item['id'] for item in response.data['results']] == [draft_post.id]
+
+    def test_fields_projection(self, author_client, draft_post):
+        """Проекция полей через ?fields="""
+
+        response = author_client.get(reverse('my-drafts'), {'fields': 'id,title,unknown'})
+
+        assert response.data['results'] == [{'id': draft_post.id, 'title': draft_post.title}]
+
+    def test_unauthenticated(self, api_client):
+        """Без аутентификации"""
+
+        response = api_client.get(reverse('my-posts'))
+
+        assert response.status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN)
+
+
+class TestPostDetailAPI:
+    """Тесты для просмотра поста"""
+
+    def test_published_visible_to_anyone(self, api_client, published_post):
+        """Опубликованный пост виден всем"""
+
+        response = api_client.get(reverse('post-detail', kwargs={'pk': published_post.pk}))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['title'] == published_post.title
+        assert 'private' not in response.get('Cache-Control', '')
+
+    @pytest.mark.parametrize('post_fixture', ['draft_post', 'closed_post'])
+    def test_unpublished_visible_to_author_only(self, request, api_client, post_fixture):
+        """Черновик и закрытый пост видит только автор"""
+
+        post = request.getfixturevalue(post_fixture)
+        url = reverse('post-detail', kwargs={'pk': post.pk})
+
+        assert api_client.get(url).status_code == status.HTTP_404_NOT_FOUND
+        assert api_client.get(url, HTTP_X_USER_ID='2').status_code == status.HTTP_404_NOT_FOUND
+
+        response = api_client.get(url, HTTP_X_USER_ID='1')
+        assert response.status_code == status.HTTP_200_OK
+        assert 'private' in response['Cache-Control']
+
+    def test_deleted_not_visible(self, api_client, deleted_post):
+        """Удалённый пост не виден даже автору"""
+
+        response = api_client.get(reverse('post-detail', kwargs={'pk': deleted_post.pk}), HTTP_X_USER_ID='1')
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_cache_invalidated_on_status_change(self, api_client, draft_post, django_assert_num_queries):
+        """Кэш сбрасывается при публикации и удалении"""
+
+        url = reverse('post-detail', kwargs={'pk': draft_post.pk})
+        assert api_client.get(url).status_code == status.HTTP_404_NOT_FOUND
+
+        draft_post.publish()
+        assert api_client.get(url).status_code == status.HTTP_200_OK
+        with django_assert_num_queries(0):
+            assert api_client.get(url).status_code == status.HTTP_200_OK
+
+        draft_post.soft_delete()
+        assert api_client.get(url).status_code == status.HTTP_404_NOT_FOUND
+
+    def test_cache_invalidated_on_update(self, draft_post, api_client):
+        """Кэш сбрасывается при редактировании"""
+
+        url = reverse('post-detail', kwargs={'pk': draft_post.pk})
+        assert api_client.get(url, HTTP_X_USER_ID='1').data['title'] == 'Draft Post'
+
+        response = api_client.patch(
+            reverse('post-update', kwargs={'pk': draft_post.pk}),
+            {'title': 'New title'},
+            format='json',
+            HTTP_X_USER_ID='1'
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        assert api_client.get(url, HTTP_X_USER_ID='1').data['title'] == 'New title'
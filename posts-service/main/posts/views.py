@@ -1,9 +1,35 @@
+from django.utils.cache import patch_cache_control
 from rest_framework import generics, permissions, status
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from .authentication import HeaderJWTAuthentication
+from .cache import get_cached_post
 from .models import Post
-from .serializers import PostSerializer, PostCreateSerializer, PostUpdateSerializer
+from .pagination import KeysetPagination
+from .serializers import PostSerializer, PostCreateSerializer, PostUpdateSerializer, PostRowSerializer
+
+
+def requested_fields(request):
+    """Поля из параметра ?fields=id,title (неизвестные отбрасываются)"""
+
+    raw = request.query_params.get('fields')
+    if not raw:
+        return None
+
+    fields = [name for name in raw.split(',') if name in PostSerializer.Meta.fields]
+    return fields or None
+
+
+def row_serializer(request):
+    """Быстрый сериализатор списка с учётом ?fields= и ?preview="""
+
+    try:
+        preview_length = max(int(request.query_params['preview']), 0)
+    except (KeyError, ValueError):
+        preview_length = None
+
+    return PostRowSerializer(fields=requested_fields(request), preview_length=preview_length)
 
 
 class PostListView(generics.ListAPIView):
@@ -12,9 +38,15 @@ class PostListView(generics.ListAPIView):
     authentication_classes = [HeaderJWTAuthentication]
     serializer_class = PostSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
-        return Post.objects.filter(status='published').order_by('-created_at')
+        return Post.objects.filter(status='published').order_by('-created_at', '-id')
+
+    def list(self, request, *args, **kwargs):
+        serializer = row_serializer(request)
+        page = self.paginate_queryset(self.get_queryset().values(*serializer.columns))
+        return self.get_paginated_response(serializer.serialize(page))
 
 
 class PostCreateView(generics.CreateAPIView):
@@ -35,21 +67,27 @@ class PostDetailView(generics.RetrieveAPIView):
     serializer_class = PostSerializer
     permission_classes = [permissions.AllowAny]
 
-    def get_queryset(self):
-        # Показываем только опубликованные посты всем
-        # и черновики/закрытые - только автору
-        request = self.request
-        queryset = Post.objects.all()
+    def retrieve(self, request, *args, **kwargs):
+        serializer = PostRowSerializer()
+        pk = kwargs['pk']
+        row = get_cached_post(pk, lambda: Post.objects.filter(pk=pk).values(*serializer.columns).first())
 
-        if not request.user or not hasattr(request.user, 'user_id'):
-            return queryset.filter(status='published')
+        user_id = getattr(request.user, 'user_id', None)
+        if row is None or not self.is_visible(row, user_id):
+            raise NotFound()
 
-        user_id = request.user.user_id
-        return queryset.filter(
-            status='published'
-        ) | queryset.filter(
-            author_id=user_id,
-            status__in=['draft', 'closed', 'published']
+        response = Response(serializer.to_representation(row))
+        if row['status'] != 'published':
+            # Черновики и закрытые посты видит только автор - общим кэшам их хранить нельзя
+            patch_cache_control(response, private=True)
+        return response
+
+    @staticmethod
+    def is_visible(row, user_id):
+        # Показываем только опубликованные посты всем
+        # и черновики/закрытые - только автору
+        return row['status'] == 'published' or (
+            row['author_id'] == user_id and row['status'] in ('draft', 'closed')
         )
 
 
@@ -147,15 +185,24 @@ def delete_post(request, pk):
     return Response({'status': 'deleted', 'post_id': post.id}, status=status.HTTP_200_OK)
 
 
+def paginated_author_posts(request, queryset):
+    """Страница постов автора"""
+
+    serializer = row_serializer(request)
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(queryset.values(*serializer.columns), request)
+    response = paginator.get_paginated_response(serializer.serialize(page))
+    patch_cache_control(response, private=True)
+    return response
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def my_posts(request):
     """Мои посты (все статусы)"""
 
     user_id = request.user.user_id
-    posts = Post.objects.filter(author_id=user_id).order_by('-created_at')
-    serializer = PostSerializer(posts, many=True)
-    return Response(serializer.data)
+    return paginated_author_posts(request, Post.objects.filter(author_id=user_id))
 
 
 @api_view(['GET'])
@@ -164,9 +211,7 @@ def my_drafts(request):
     """Мои черновики"""
 
     user_id = request.user.user_id
-    posts = Post.objects.filter(author_id=user_id, status='draft').order_by('-created_at')
-    serializer = PostSerializer(posts, many=True)
-    return Response(serializer.data)
+    return paginated_author_posts(request, Post.objects.filter(author_id=user_id, status='draft'))
 
 
 @api_view(['GET'])
@@ -2,8 +2,10 @@
 
 cd /app/main
 
-echo "Applying database migrations..."
-python manage.py migrate
+# Быстрая проверка применённых миграций; migrate - только если есть новые, под advisory lock
+echo "Applying database migrations (${MIGRATE_MODE:-auto})..."
+python -m servicekit.migrate || exit 1
 
-echo "Starting server..."
-python manage.py runserver 0.0.0.0:8001
\ No newline at end of file
+# SERVER_MODE: wsgi (по умолчанию), asgi или dev - см. servicekit/serve.py
+echo "Starting server (${SERVER_MODE:-wsgi})..."
+exec python -m servicekit.serve --port 8001
\ No newline at end of file
@@ -1,6 +1,8 @@
 import os
 from pathlib import Path
 
+from servicekit.db import connection_settings
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = 'django-insecure-0(1bdu-nzf+%5xp960pac28f^a1^fez)mmxfj54_#lfe7v8ct4'
@@ -56,6 +58,8 @@ DATABASES = {
         'PASSWORD': os.environ.get('POSTGRES_PASSWORD', 'password'),
         'HOST': os.environ.get('POSTGRES_HOST', 'users-db'),
         'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+        # Постоянные соединения или пул - по DB_CONNECTION_MODE
+        **connection_settings(),
     }
 }
 
@@ -96,4 +100,42 @@ REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
     ]
-}
\ No newline at end of file
+}
+
+# Общий секрет для вызовов от других сервисов (servicekit.ServiceClient); пустой - только JWT
+SERVICE_TOKEN = os.environ.get('SERVICE_TOKEN', '')
+
+USERS_BATCH_MAX_SIZE = int(os.environ.get('USERS_BATCH_MAX_SIZE', 100))
+
+# Вход: попытки с одного IP и на один email до проверки пароля, пул для хэширования паролей
+LOGIN_IP_PER_MINUTE = int(os.environ.get('LOGIN_IP_PER_MINUTE', 60))
+LOGIN_IP_BURST = int(os.environ.get('LOGIN_IP_BURST', 20))
+LOGIN_ACCOUNT_PER_MINUTE = int(os.environ.get('LOGIN_ACCOUNT_PER_MINUTE', 10))
+LOGIN_ACCOUNT_BURST = int(os.environ.get('LOGIN_ACCOUNT_BURST', 5))
+LOGIN_HASH_WORKERS = int(os.environ.get('LOGIN_HASH_WORKERS', 2))
+LOGIN_HASH_QUEUE_LIMIT = int(os.environ.get('LOGIN_HASH_QUEUE_LIMIT', 16))
+LOGIN_HASH_TIMEOUT = float(os.environ.get('LOGIN_HASH_TIMEOUT', 10))
+
+# profile отвечает из claims access-токена без запроса к базе, пока версия профиля в токене текущая
+PROFILE_FROM_CLAIMS = os.environ.get('PROFILE_FROM_CLAIMS', 'false').lower() == 'true'
+
+# Текущие версии профилей. По умолчанию (LocMemCache) кэш свой у каждого процесса, и проверка
+# версии точна только в пределах одного воркера: изменение, сделанное в другом воркере,
+# видно не позже чем через PROFILE_VERSION_CACHE_TIMEOUT, до этого profile может ответить
+# устаревшими claims. Для нескольких воркеров с PROFILE_FROM_CLAIMS укажите общий Redis в USERS_CACHE_URL
+if os.environ.get('USERS_CACHE_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['USERS_CACHE_URL'],
+        }
+    }
+
+PROFILE_VERSION_CACHE_TIMEOUT = int(os.environ.get('PROFILE_VERSION_CACHE_TIMEOUT', 30))
+
+# Что прогревать до приёма запросов (servicekit.warmup)
+WARMUP_SERIALIZERS = [
+    'users.serializers.UserSerializer',
+    'users.serializers.UserCreateSerializer',
+]
+WARMUP_PATHS = ['/health/']
@@ -1,3 +1,5 @@
+from main.settings import *  # noqa: F401,F403
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
@@ -1,10 +1,16 @@
 from django.urls import path
 from users import views
+from servicekit.views import database_stats, event_stats
 
 urlpatterns = [
     path('register/', views.register, name='register'),
     path('login/', views.login, name='login'),
     path('profile/', views.profile, name='profile'),
+    path('batch/', views.users_batch, name='users-batch'),
     path('<int:user_id>/', views.user_by_id, name='user-by-id'),
+    path('<int:user_id>/ban/', views.ban_user, name='user-ban'),
     path('health/', views.health, name='health'),
+    path('internal/events/', event_stats, name='event-stats'),
+    path('internal/database/', database_stats, name='database-stats'),
+    path('internal/login/', views.login_stats, name='login-stats'),
 ]
@@ -0,0 +1,36 @@
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .claims import PROFILE_CLAIM, PROFILE_VERSION_CLAIM, current_profile_version, remember_profile_version
+
+
+class ClaimsUser(TokenUser):
+    """Пользователь из access-токена: профиль берётся из claims, без запроса к базе"""
+
+    @property
+    def profile(self):
+        return self.token[PROFILE_CLAIM]
+
+
+class ProfileClaimsAuthentication(JWTAuthentication):
+    """JWTAuthentication без чтения пользователя из базы, если версия профиля в токене текущая.
+
+    Работает при PROFILE_FROM_CLAIMS. Текущая версия берётся из кэша; если её там нет
+    или она другая, пользователь загружается из базы как обычно, а его версия
+    запоминается для следующих запросов.
+    """
+
+    def get_user(self, validated_token):
+        if not getattr(settings, 'PROFILE_FROM_CLAIMS', False):
+            return super().get_user(validated_token)
+
+        version = validated_token.get(PROFILE_VERSION_CLAIM)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if PROFILE_CLAIM in validated_token and version is not None and current_profile_version(user_id) == version:
+            return ClaimsUser(validated_token)
+
+        user = super().get_user(validated_token)
+        remember_profile_version(user.pk, user.profile_version)
+        return user
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# Claims access-токена: данные профиля и версия, с которой они выданы
+PROFILE_CLAIM = 'profile'
+PROFILE_VERSION_CLAIM = 'profile_version'
+
+
+def profile_version_key(user_id):
+    return f"users:profile-version:{user_id}"
+
+
+def remember_profile_version(user_id, version):
+    """Запоминает текущую версию профиля; после изменения - только после коммита"""
+
+    timeout = getattr(settings, 'PROFILE_VERSION_CACHE_TIMEOUT', 30)
+    transaction.on_commit(lambda: cache.set(profile_version_key(user_id), version, timeout))
+
+
+def current_profile_version(user_id):
+    """Версия профиля из кэша; None, если её там нет"""
+
+    return cache.get(profile_version_key(user_id))
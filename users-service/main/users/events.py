@@ -0,0 +1,24 @@
+from django.db import transaction
+from servicekit import publish
+
+USERS_TOPIC = 'users'
+
+
+def user_event_data(user):
+    """Компактное содержимое события о пользователе"""
+
+    return {
+        'id': user.pk,
+        'role': user.role,
+        'is_banned': user.is_banned,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'avatar_url': user.avatar_url,
+    }
+
+
+def emit_user_event(event_type, user):
+    """Публикует событие о пользователе после коммита транзакции"""
+
+    data = user_event_data(user)
+    transaction.on_commit(lambda: publish(USERS_TOPIC, event_type, user.pk, data))
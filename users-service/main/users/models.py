@@ -2,6 +2,14 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
 
+from .claims import remember_profile_version
+from .events import emit_user_event
+
+# Поля, при изменении которых меняется версия профиля и выданные в токенах claims устаревают
+PROFILE_VERSION_FIELDS = {
+    'email', 'first_name', 'last_name', 'avatar_url', 'role', 'is_banned', 'is_active', 'password',
+}
+
 
 class UserManager(BaseUserManager):
     """Кастомный менеджер для модели User без username"""
@@ -51,6 +59,7 @@ class User(AbstractUser):
     avatar_url = models.URLField(max_length=500, blank=True, null=True)
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='user')
     is_banned = models.BooleanField(default=False)
+    profile_version = models.PositiveIntegerField(default=1)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -65,4 +74,32 @@ class User(AbstractUser):
         db_table = 'users'
 
     def __str__(self):
-        return self.email
\ No newline at end of file
+        return self.email
+
+    def save(self, *args, **kwargs):
+        """Сохранение с новой версией профиля, если могли измениться его поля.
+
+        QuerySet.update() версию не меняет - профиль меняется только через save().
+        """
+
+        update_fields = kwargs.get('update_fields')
+        bump = not self._state.adding and (update_fields is None or PROFILE_VERSION_FIELDS & set(update_fields))
+        if bump:
+            self.profile_version += 1
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'profile_version'}
+
+        super().save(*args, **kwargs)
+        if bump:
+            remember_profile_version(self.pk, self.profile_version)
+
+    def ban(self):
+        """Заблокировать пользователя"""
+
+        if self.is_banned:
+            return False
+
+        self.is_banned = True
+        self.save(update_fields=['is_banned', 'updated_at'])
+        emit_user_event('user.banned', self)
+        return True
\ No newline at end of file
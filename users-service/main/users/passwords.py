@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+from .models import User
+
+
+class PoolOverloaded(Exception):
+    """В пуле хэширования нет места или проверка не уложилась в таймаут"""
+
+
+class HashingPool:
+    """Ограниченный пул потоков для хэширования паролей.
+
+    PBKDF2 из hashlib отпускает GIL, поэтому хэши считаются параллельно с другими
+    запросами, но не больше workers одновременно: всплеск попыток входа занимает
+    не больше workers ядер. Задачи сверх workers + queue_limit отклоняются сразу.
+    """
+
+    def __init__(self, workers=2, queue_limit=16, timeout=10):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self.counters = {'submitted': 0, 'completed': 0, 'rejected': 0, 'timeouts': 0}
+        self.hash_times = deque(maxlen=1000)  # время хэширования, сек
+        self.wait_times = deque(maxlen=1000)  # ожидание в очереди, сек
+        self._running = 0
+        self._in_flight = 0
+        self._slots = threading.BoundedSemaphore(workers + queue_limit)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+
+    def run(self, func, *args):
+        """Результат func(*args) из пула; PoolOverloaded, если пул переполнен или не успел"""
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.counters['rejected'] += 1
+            raise PoolOverloaded()
+
+        with self._lock:
+            self.counters['submitted'] += 1
+            self._in_flight += 1
+        future = self._executor.submit(self._call, func, args, time.perf_counter())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # Задача доработает в пуле и освободит место сама
+            with self._lock:
+                self.counters['timeouts'] += 1
+            raise PoolOverloaded()
+
+    def _call(self, func, args, submitted_at):
+        started = time.perf_counter()
+        with self._lock:
+            self._running += 1
+            self.wait_times.append(started - submitted_at)
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._in_flight -= 1
+                self.counters['completed'] += 1
+                self.hash_times.append(time.perf_counter() - started)
+            self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            hash_times = sorted(self.hash_times)
+            wait_times = sorted(self.wait_times)
+            running, in_flight = self._running, self._in_flight
+            counters = dict(self.counters)
+
+        def percentile_ms(values, q):
+            return round(values[min(int(len(values) * q), len(values) - 1)] * 1000, 1) if values else None
+
+        return {
+            'workers': self.workers,
+            'queue_limit': self.queue_limit,
+            'running': running,
+            'queued': in_flight - running,
+            **counters,
+            'hash_ms_p50': percentile_ms(hash_times, 0.5),
+            'hash_ms_p95': percentile_ms(hash_times, 0.95),
+            'wait_ms_p50': percentile_ms(wait_times, 0.5),
+            'wait_ms_p95': percentile_ms(wait_times, 0.95),
+        }
+
+
+hashing_pool = HashingPool(
+    workers=getattr(settings, 'LOGIN_HASH_WORKERS', 2),
+    queue_limit=getattr(settings, 'LOGIN_HASH_QUEUE_LIMIT', 16),
+    timeout=getattr(settings, 'LOGIN_HASH_TIMEOUT', 10)
+)
+
+
+def verify_credentials(email, password):
+    """Активный пользователь с таким email и паролем или None.
+
+    То же, что authenticate() с ModelBackend, но хэш считается в hashing_pool;
+    запросы к базе остаются в потоке запроса.
+    """
+
+    if not email or not password:
+        return None
+
+    try:
+        user = User._default_manager.get_by_natural_key(email)
+    except User.DoesNotExist:
+        # Хэш считается и для несуществующего email - по времени ответа не понять, есть ли такой пользователь
+        hashing_pool.run(make_password, password)
+        return None
+
+    needs_rehash = []
+    if not hashing_pool.run(check_password, password, user.password, lambda raw_password: needs_rehash.append(True)):
+        return None
+    if not user.is_active:
+        return None
+
+    if needs_rehash:
+        # Параметры хэшера изменились - сохраняем пароль с новыми
+        user.password = hashing_pool.run(make_password, password)
+        user.save(update_fields=['password'])
+    return user
@@ -0,0 +1,22 @@
+import hmac
+
+from django.conf import settings
+from rest_framework import permissions
+from servicekit import SERVICE_TOKEN_HEADER
+
+SERVICE_TOKEN_META = 'HTTP_' + SERVICE_TOKEN_HEADER.upper().replace('-', '_')
+
+
+def is_service_request(request):
+    """Запрос от другого сервиса с общим SERVICE_TOKEN; без настроенного токена - всегда False"""
+
+    expected = getattr(settings, 'SERVICE_TOKEN', '')
+    provided = request.META.get(SERVICE_TOKEN_META, '')
+    return bool(expected) and hmac.compare_digest(provided.encode(), expected.encode())
+
+
+class IsAuthenticatedOrService(permissions.IsAuthenticated):
+    """Пользователь с JWT или другой сервис с X-Service-Token"""
+
+    def has_permission(self, request, view):
+        return is_service_request(request) or super().has_permission(request, view)
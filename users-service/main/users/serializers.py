@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
+from django.utils import timezone
 from .models import User
 
 
@@ -11,6 +12,21 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'role', 'is_banned', 'created_at')
 
 
+def serialize_user_rows(rows):
+    """Быстрая сериализация строк .values() в формат UserSerializer"""
+
+    tz = timezone.get_current_timezone()
+    results = []
+    for row in rows:
+        data = {name: row[name] for name in UserSerializer.Meta.fields}
+        created_at = data['created_at'].astimezone(tz).isoformat()
+        if created_at.endswith('+00:00'):
+            created_at = created_at[:-6] + 'Z'
+        data['created_at'] = created_at
+        results.append(data)
+    return results
+
+
 class UserCreateSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, validators=[validate_password])
     password_confirm = serializers.CharField(write_only=True)
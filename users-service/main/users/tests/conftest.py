@@ -11,9 +11,31 @@ django.setup()
 import pytest
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
+from servicekit import EventPublisher, FakeBroker
+from servicekit.events import set_publisher
+from users.throttling import login_account_limiter, login_ip_limiter
 
 User = get_user_model()
 
+@pytest.fixture(autouse=True)
+def event_broker():
+    """События уходят в брокер в памяти"""
+
+    broker = FakeBroker()
+    publisher = EventPublisher(broker)
+    previous = set_publisher(publisher)
+    yield broker
+    set_publisher(previous)
+    publisher.close(timeout=1)
+
+@pytest.fixture(autouse=True)
+def login_limiters():
+    """Попытки входа не переходят из теста в тест"""
+
+    yield
+    login_ip_limiter.clear()
+    login_account_limiter.clear()
+
 @pytest.fixture
 def api_client():
     return APIClient()
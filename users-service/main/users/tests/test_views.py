@@ -1,7 +1,15 @@
+import threading
+
 import pytest
 from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework.reverse import reverse
+from django.core.cache import cache
+from servicekit.events import get_publisher
+from users import passwords
+from users.passwords import HashingPool
+from users.serializers import UserSerializer
+from users.throttling import login_account_limiter, login_ip_limiter
 
 User = get_user_model()
 
@@ -117,6 +125,51 @@ class TestLoginAPI:
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
         assert 'error' in response.data
 
+    def test_login_account_throttled(self, api_client, url, user):
+        """Сверх лимита попыток на email - 429 до проверки пароля, даже с верным паролем"""
+
+        for _ in range(login_account_limiter.burst):
+            api_client.post(url, {'email': 'Test@example.com', 'password': 'wrongpass'})
+
+        response = api_client.post(url, {'email': 'test@example.com', 'password': 'testpass123'})
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert int(response['Retry-After']) >= 1
+        assert login_account_limiter.stats()['rejected'] == 1
+
+    def test_login_ip_throttled(self, api_client, url, db, monkeypatch):
+        """Лимит на IP из X-Real-IP общий для всех email"""
+
+        monkeypatch.setattr(login_ip_limiter, 'burst', 2)
+        for number in range(2):
+            api_client.post(url, {'email': f'user{number}@example.com', 'password': 'x'}, HTTP_X_REAL_IP='10.0.0.1')
+
+        response = api_client.post(url, {'email': 'other@example.com', 'password': 'x'}, HTTP_X_REAL_IP='10.0.0.1')
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+        response = api_client.post(url, {'email': 'other@example.com', 'password': 'x'}, HTTP_X_REAL_IP='10.0.0.2')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_login_hashing_pool_overloaded(self, api_client, url, user, monkeypatch):
+        """Нет места в пуле хэширования - 503 с Retry-After"""
+
+        pool = HashingPool(workers=1, queue_limit=0)
+        monkeypatch.setattr(passwords, 'hashing_pool', pool)
+        started, release = threading.Event(), threading.Event()
+        blocker = threading.Thread(target=pool.run, args=(lambda: started.set() or release.wait(5),))
+        blocker.start()
+        started.wait(5)
+        try:
+            response = api_client.post(url, {'email': 'test@example.com', 'password': 'testpass123'})
+        finally:
+            release.set()
+            blocker.join()
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response['Retry-After'] == '1'
+        stats = pool.stats()
+        assert (stats['rejected'], stats['completed']) == (1, 1)
+
 
 class TestProfileAPI:
     """Тесты для профиля пользователя"""
@@ -141,6 +194,54 @@ class TestProfileAPI:
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
 
+class TestProfileFromClaims:
+    """Тесты профиля из claims access-токена (PROFILE_FROM_CLAIMS)"""
+
+    @pytest.fixture(autouse=True)
+    def claims_mode(self, settings):
+        settings.PROFILE_FROM_CLAIMS = True
+        cache.clear()
+        yield
+        cache.clear()
+
+    @pytest.fixture
+    def token(self, api_client, user, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            response = api_client.post(reverse('login'), {'email': 'test@example.com', 'password': 'testpass123'})
+        return response.data['access']
+
+    def test_profile_without_database(self, api_client, token, django_assert_num_queries):
+        """Версия в токене текущая - ответ из claims без запросов к базе"""
+
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        with django_assert_num_queries(0):
+            response = api_client.get(reverse('profile'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['email'] == 'test@example.com'
+        assert set(response.data) == set(UserSerializer.Meta.fields)
+
+    def test_changed_profile_falls_back_to_database(self, api_client, user, token, django_capture_on_commit_callbacks):
+        """После изменения профиля старый токен отвечает данными из базы"""
+
+        with django_capture_on_commit_callbacks(execute=True):
+            user.first_name = 'Changed'
+            user.save()
+
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = api_client.get(reverse('profile'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['first_name'] == 'Changed'
+
+    def test_ban_invalidates_claims(self, api_client, user, token, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            user.ban()
+
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        assert api_client.get(reverse('profile')).data['is_banned'] is True
+
+
 class TestUserByIdAPI:
     """Тесты для получения пользователя по ID"""
 
@@ -166,4 +267,114 @@ class TestUserByIdAPI:
         url = reverse('user-by-id', kwargs={'user_id': user.id})
         response = api_client.get(url)
 
-        assert response.status_code == status.HTTP_401_UNAUTHORIZED
\ No newline at end of file
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+class TestUsersBatchAPI:
+    """Тесты для пакетного получения пользователей"""
+
+    @pytest.fixture
+    def url(self):
+        return reverse('users-batch')
+
+    def test_batch_get_keeps_requested_order(self, authenticated_client, url, user, another_user):
+        """Порядок ответа совпадает с порядком id, повторы убираются"""
+        ids = f'{another_user.id},{user.id},999,{another_user.id}'
+        response = authenticated_client.get(url, {'ids': ids})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [item['id'] for item in response.data['results']] == [another_user.id, user.id]
+        assert response.data['missing'] == [999]
+
+    def test_batch_matches_user_by_id(self, authenticated_client, url, another_user):
+        """Формат пользователя совпадает с user_by_id"""
+        response = authenticated_client.post(url, {'ids': [another_user.id]}, format='json')
+        single = authenticated_client.get(reverse('user-by-id', kwargs={'user_id': another_user.id}))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results'] == [single.data]
+
+    def test_batch_invalid_ids(self, authenticated_client, url):
+        """Некорректные id"""
+        response = authenticated_client.get(url, {'ids': '1,abc'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_batch_too_large(self, authenticated_client, url):
+        """Слишком большой пакет"""
+        response = authenticated_client.post(url, {'ids': list(range(1, 1000))}, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_batch_unauthenticated(self, api_client, url, user):
+        """Без аутентификации"""
+        response = api_client.get(url, {'ids': str(user.id)})
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_batch_list_body(self, authenticated_client, url):
+        """Тело - список, а не объект"""
+        response = authenticated_client.post(url, [1, 2], format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_batch_with_service_token(self, api_client, url, user, settings):
+        """Другой сервис с X-Service-Token - без токена пользователя"""
+        settings.SERVICE_TOKEN = 'secret'
+
+        response = api_client.get(url, {'ids': str(user.id)}, HTTP_X_SERVICE_TOKEN='secret')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results'][0]['id'] == user.id
+
+        single = api_client.get(reverse('user-by-id', kwargs={'user_id': user.id}), HTTP_X_SERVICE_TOKEN='secret')
+        assert single.status_code == status.HTTP_200_OK
+
+        response = api_client.get(url, {'ids': str(user.id)}, HTTP_X_SERVICE_TOKEN='wrong')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+class TestUserEvents:
+    """Тесты для событий о пользователях"""
+
+    def test_register_emits_event(self, api_client, event_broker, db, django_capture_on_commit_callbacks):
+        """Регистрация публикует user.registered"""
+
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post(reverse('register'), {
+                'email': 'events@example.com',
+                'password': 'TestPass123',
+                'password_confirm': 'TestPass123',
+                'first_name': 'Event',
+                'last_name': 'User'
+            }, format='json')
+
+        assert get_publisher().flush(timeout=1)
+        messages = event_broker.messages('users')
+        assert [message['type'] for message in messages] == ['user.registered']
+        assert messages[0]['data']['id'] == User.objects.get(email='events@example.com').id
+        assert 'email' not in messages[0]['data']
+
+    def test_ban_by_moderator(self, api_client, user, another_user, event_broker, django_capture_on_commit_callbacks):
+        """Модератор блокирует пользователя, событие user.banned публикуется один раз"""
+
+        user.role = 'moderator'
+        user.save()
+        api_client.force_authenticate(user=user)
+        url = reverse('user-ban', kwargs={'user_id': another_user.id})
+
+        with django_capture_on_commit_callbacks(execute=True):
+            assert api_client.post(url).status_code == status.HTTP_200_OK
+            assert api_client.post(url).status_code == status.HTTP_400_BAD_REQUEST
+
+        another_user.refresh_from_db()
+        assert another_user.is_banned
+        assert get_publisher().flush(timeout=1)
+        assert [message['type'] for message in event_broker.messages('users')] == ['user.banned']
+
+    def test_ban_requires_moderator(self, authenticated_client, another_user):
+        """Обычный пользователь блокировать не может"""
+
+        response = authenticated_client.post(reverse('user-ban', kwargs={'user_id': another_user.id}))
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        another_user.refresh_from_db()
+        assert not another_user.is_banned
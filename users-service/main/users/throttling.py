@@ -0,0 +1,64 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class TokenBucketLimiter:
+    """Token bucket на ключ (IP, email): burst попыток сразу, дальше rate в секунду.
+
+    Ведра хранятся в памяти процесса; давно не использованные вытесняются после maxsize ключей.
+    """
+
+    def __init__(self, rate, burst, maxsize=100000):
+        self.rate = rate
+        self.burst = burst
+        self.maxsize = maxsize
+        self.rejected = 0
+        self._buckets = OrderedDict()  # ключ -> (токены, время пополнения)
+        self._lock = threading.Lock()
+
+    def allow(self, key):
+        """(разрешено, через сколько секунд появится токен)"""
+
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            else:
+                self.rejected += 1
+
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+
+        return allowed, 0.0 if allowed else (1 - tokens) / self.rate
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+            self.rejected = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'rate_per_minute': round(self.rate * 60, 2),
+                'burst': self.burst,
+                'keys': len(self._buckets),
+                'rejected': self.rejected,
+            }
+
+
+# Ведра на процесс: при N воркерах gunicorn фактический лимит до N раз выше
+login_ip_limiter = TokenBucketLimiter(
+    rate=getattr(settings, 'LOGIN_IP_PER_MINUTE', 60) / 60,
+    burst=getattr(settings, 'LOGIN_IP_BURST', 20)
+)
+login_account_limiter = TokenBucketLimiter(
+    rate=getattr(settings, 'LOGIN_ACCOUNT_PER_MINUTE', 10) / 60,
+    burst=getattr(settings, 'LOGIN_ACCOUNT_BURST', 5)
+)
@@ -1,10 +1,33 @@
+import math
+
 from rest_framework import permissions, status
 from rest_framework.response import Response
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework_simplejwt.tokens import RefreshToken
-from django.contrib.auth import authenticate
+from django.conf import settings
+from .authentication import ClaimsUser, ProfileClaimsAuthentication
+from .claims import PROFILE_CLAIM, PROFILE_VERSION_CLAIM, remember_profile_version
+from .events import emit_user_event
 from .models import User
-from .serializers import UserSerializer, UserCreateSerializer
+from .passwords import PoolOverloaded, hashing_pool, verify_credentials
+from .permissions import IsAuthenticatedOrService
+from .serializers import UserSerializer, UserCreateSerializer, serialize_user_rows
+from .throttling import login_account_limiter, login_ip_limiter
+
+# Сколько пользователей можно запросить за один вызов users_batch
+USERS_BATCH_MAX_SIZE = getattr(settings, 'USERS_BATCH_MAX_SIZE', 100)
+
+
+def issue_tokens(user, user_data):
+    """Пара токенов; при PROFILE_FROM_CLAIMS в access-токене ещё профиль и его версия"""
+
+    refresh = RefreshToken.for_user(user)
+    access = refresh.access_token
+    if getattr(settings, 'PROFILE_FROM_CLAIMS', False):
+        access[PROFILE_CLAIM] = user_data
+        access[PROFILE_VERSION_CLAIM] = user.profile_version
+        remember_profile_version(user.pk, user.profile_version)
+    return {'refresh': str(refresh), 'access': str(access)}
 
 
 @api_view(['POST'])
@@ -13,13 +36,12 @@ def register(request):
     serializer = UserCreateSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     user = serializer.save()
+    emit_user_event('user.registered', user)
 
-    refresh = RefreshToken.for_user(user)
-
+    user_data = UserSerializer(user).data
     return Response({
-        'user': UserSerializer(user).data,
-        'refresh': str(refresh),
-        'access': str(refresh.access_token),
+        'user': user_data,
+        **issue_tokens(user, user_data),
     }, status=status.HTTP_201_CREATED)
 
 
@@ -29,7 +51,27 @@ def login(request):
     email = request.data.get('email')
     password = request.data.get('password')
 
-    user = authenticate(email=email, password=password)
+    # Лимиты проверяются до хэширования: перебор не расходует CPU на PBKDF2
+    # X-Real-IP выставляет gateway, иначе видно только адрес gateway
+    client_ip = request.META.get('HTTP_X_REAL_IP') or request.META.get('REMOTE_ADDR', '')
+    allowed, retry_after = login_ip_limiter.allow(client_ip)
+    if allowed and isinstance(email, str):
+        allowed, retry_after = login_account_limiter.allow(email.strip().lower())
+    if not allowed:
+        return Response(
+            {'error': 'Слишком много попыток входа, повторите позже'},
+            status=status.HTTP_429_TOO_MANY_REQUESTS,
+            headers={'Retry-After': str(max(1, math.ceil(retry_after)))}
+        )
+
+    try:
+        user = verify_credentials(email, password)
+    except PoolOverloaded:
+        return Response(
+            {'error': 'Сервис перегружен, повторите позже'},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={'Retry-After': '1'}
+        )
 
     if user:
         if user.is_banned:
@@ -38,12 +80,10 @@ def login(request):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        refresh = RefreshToken.for_user(user)
-
+        user_data = UserSerializer(user).data
         return Response({
-            'user': UserSerializer(user).data,
-            'refresh': str(refresh),
-            'access': str(refresh.access_token),
+            'user': user_data,
+            **issue_tokens(user, user_data),
         })
 
     return Response(
@@ -53,14 +93,18 @@ def login(request):
 
 
 @api_view(['GET'])
+@authentication_classes([ProfileClaimsAuthentication])
 @permission_classes([permissions.IsAuthenticated])
 def profile(request):
+    if isinstance(request.user, ClaimsUser):
+        return Response(request.user.profile)
+
     serializer = UserSerializer(request.user)
     return Response(serializer.data)
 
 
 @api_view(['GET'])
-@permission_classes([permissions.IsAuthenticated])
+@permission_classes([IsAuthenticatedOrService])
 def user_by_id(request, user_id):
     try:
         user = User.objects.get(id=user_id)
@@ -72,6 +116,94 @@ def user_by_id(request, user_id):
             status=status.HTTP_404_NOT_FOUND
         )
 
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def ban_user(request, user_id):
+    """Заблокировать пользователя (модераторы и администраторы)"""
+
+    if request.user.role not in ('moderator', 'admin'):
+        return Response(
+            {'error': 'Недостаточно прав'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    try:
+        user = User.objects.get(id=user_id)
+    except User.DoesNotExist:
+        return Response(
+            {'error': 'Пользователь не найден'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    if not user.ban():
+        return Response(
+            {'error': 'Пользователь уже заблокирован'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    return Response({'status': 'banned', 'user_id': user.id})
+
+
+def parse_ids(raw):
+    """Список id без повторов с сохранением порядка; None, если есть не-числа"""
+
+    if isinstance(raw, str):
+        raw = [item for item in raw.split(',') if item.strip()]
+    if not isinstance(raw, list):
+        return None
+
+    try:
+        return list(dict.fromkeys(int(item) for item in raw))
+    except (TypeError, ValueError):
+        return None
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticatedOrService])
+def users_batch(request):
+    """Несколько пользователей за один запрос: GET ?ids=1,2,3 или POST {"ids": [1, 2, 3]}"""
+
+    if request.method == 'GET':
+        ids = parse_ids(request.query_params.get('ids', ''))
+    elif isinstance(request.data, dict):
+        ids = parse_ids(request.data.get('ids', []))
+    else:
+        ids = None
+
+    if ids is None:
+        return Response(
+            {'error': 'ids должен быть списком целых чисел'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if len(ids) > USERS_BATCH_MAX_SIZE:
+        return Response(
+            {'error': f'Не больше {USERS_BATCH_MAX_SIZE} id за запрос'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    rows = {row['id']: row for row in User.objects.filter(id__in=ids).values(*UserSerializer.Meta.fields)}
+
+    # Порядок ответа совпадает с порядком запрошенных id
+    return Response({
+        'results': serialize_user_rows(rows[user_id] for user_id in ids if user_id in rows),
+        'missing': [user_id for user_id in ids if user_id not in rows],
+    })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def login_stats(request):
+    """Пул хэширования паролей (время хэша, очередь) и отказы лимитов входа"""
+
+    return Response({
+        'hashing': hashing_pool.stats(),
+        'ip_limiter': login_ip_limiter.stats(),
+        'account_limiter': login_account_limiter.stats(),
+    })
+
+
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def health(request):